@@ -4,6 +4,8 @@ Django settings for SDA Admin Panel.
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +45,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add WhiteNoise
+    'sda_backend.middleware.QueryInstrumentationMiddleware',  # Query counts / SQL time per admin request
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -57,7 +60,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -65,12 +67,22 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compile each template once per process instead of on every render
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'admin_panel.wsgi.application'
 
+# Also creates the tables of the unmanaged models in the test database
+TEST_RUNNER = 'sda_backend.tests.runner.ContentTablesRunner'
+
 
 # Database
 # Use the same PostgreSQL database as the FastAPI backend
@@ -82,9 +94,89 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.environ.get('POSTGRES_SERVER', 'localhost'),
         'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        # Check a reused connection before the first query of each request
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '10')),
+        },
     }
 }
 
+# Connection strategy (see DEPLOYMENT.md, "Database Connections"):
+#   persistent  - keep each worker's connection open for DB_CONN_MAX_AGE seconds (default)
+#   per_request - open and close a connection for every request
+#   pgbouncer   - POSTGRES_SERVER points at PgBouncer in transaction pooling mode
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'persistent')
+if DB_CONNECTION_MODE == 'per_request':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+elif DB_CONNECTION_MODE == 'pgbouncer':
+    # Named server-side cursors do not survive PgBouncer handing the next
+    # transaction to another server connection
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+elif DB_CONNECTION_MODE != 'persistent':
+    raise ImproperlyConfigured(f'Unknown DB_CONNECTION_MODE: {DB_CONNECTION_MODE}')
+
+# asgi or wsgi; set by gunicorn.conf.py (which defaults to wsgi) for its workers
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+if SERVER_MODE == 'asgi' and DB_CONNECTION_MODE == 'persistent':
+    # Under ASGI every request runs its sync view in a fresh thread, so a
+    # persistent connection would never be reused and only linger until
+    # garbage collection
+    raise ImproperlyConfigured(
+        'SERVER_MODE=asgi needs DB_CONNECTION_MODE=pgbouncer (or per_request): '
+        'persistent connections are not reused under ASGI'
+    )
+
+# DB_ENGINE=sqlite swaps in a local SQLite file, e.g. to run `bench_admin`
+# without a PostgreSQL server (models with PostgreSQL-only fields are skipped)
+if os.environ.get('DB_ENGINE') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+
+# Cache
+# Local memory (per worker process) by default; set CACHE_URL (or REDIS_URL) to any
+# Redis-protocol server, e.g. redis://localhost:6379/1, to share it between workers
+CACHE_URL = os.environ.get('CACHE_URL', os.environ.get('REDIS_URL', ''))
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'sda_backend.cache.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'sda_admin',
+            'TIMEOUT': 300,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'sda_backend.cache.LocMemCache',
+            'LOCATION': 'sda-admin',
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+# Cached dropdown choices are invalidated on save; a local-memory cache only sees
+# saves made by its own worker, so other workers refresh after this many seconds
+CHOICES_CACHE_TIMEOUT = 3600 if CACHE_URL else 30
+# Per-process hit/miss counters read by `manage.py cache_stats`
+CACHE_STATS_DIR = os.environ.get('CACHE_STATS_DIR', os.path.join(BASE_DIR, 'cache_stats'))
+# Files of processes that exited (on this host) or wrote nothing for this long are removed
+CACHE_STATS_TTL_SECONDS = int(os.environ.get('CACHE_STATS_TTL_SECONDS', 86400))
+
+# Sessions are read on every request; with a shared cache they are served from it
+# and written through to the database.  A per-process local-memory cache would
+# keep serving a session another worker has already logged out, so it is not used.
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.cached_db' if CACHE_URL
+    else 'django.contrib.sessions.backends.db'
+)
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -125,8 +217,111 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR.parent.parent, 'sda', 'uploads'))
 
 # File upload settings - match backend limits
-DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB in bytes
-FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB in bytes
+# Non-file form data only; uploaded files are streamed to disk by the handler below
+DATA_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get('DATA_UPLOAD_MAX_MEMORY_SIZE', 5242880))  # 5MB in bytes
+# Larger uploads are spooled to a temp file instead of being held in memory;
+# under ASGI this also bounds the buffer of a request body still being received
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get('FILE_UPLOAD_MAX_MEMORY_SIZE', 2621440))  # 2.5MB in bytes
+# Stream uploads to MEDIA_ROOT/.incoming (hashed, image headers checked) and rename into place
+FILE_UPLOAD_HANDLERS = ['sda_backend.uploadhandlers.StreamingUploadHandler']
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 52428800))  # 50MB in bytes
+# Per form field (formset prefixes ignored), overriding UPLOAD_MAX_SIZE
+UPLOAD_FIELD_MAX_SIZES = {
+    'icon': 5242880,  # 5MB
+}
+# Resumable uploads (sda_backend/resumable.py) are sent in chunks of this size, well
+# below proxy body limits; sessions untouched for UPLOAD_SESSION_MAX_AGE seconds are
+# removed by `manage.py cleanup_uploads`
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 4194304))  # 4MB in bytes
+UPLOAD_SESSION_MAX_AGE = int(os.environ.get('UPLOAD_SESSION_MAX_AGE', 86400))  # 24 hours
+
+# Change notifications for the public backend: with OUTBOX_ENABLED, saves write to
+# the content_outbox table and `manage.py relay_outbox` POSTs them to OUTBOX_ENDPOINT
+# (only the relay needs it) in batches, once an entity has had no change for
+# OUTBOX_COALESCE_SECONDS (or has waited OUTBOX_MAX_DELAY_SECONDS)
+OUTBOX_ENABLED = os.environ.get('OUTBOX_ENABLED', 'False') == 'True'
+OUTBOX_ENDPOINT = os.environ.get('OUTBOX_ENDPOINT', '')
+OUTBOX_TOKEN = os.environ.get('OUTBOX_TOKEN', '')  # sent as "Authorization: Bearer <token>"
+OUTBOX_COALESCE_SECONDS = float(os.environ.get('OUTBOX_COALESCE_SECONDS', '2'))
+OUTBOX_MAX_DELAY_SECONDS = float(os.environ.get('OUTBOX_MAX_DELAY_SECONDS', '30'))
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '500'))
+OUTBOX_RETENTION_HOURS = int(os.environ.get('OUTBOX_RETENTION_HOURS', '24'))
+# An entity rejected with a 4xx status (not 408/429) after this many attempts is moved aside (failed_at)
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '10'))
+
+# Background jobs (sda_backend/jobs.py) live in the admin_jobs table and are run by
+# `manage.py run_workers`; with JOBS_ENABLED, image renditions and admin actions on more
+# than JOB_ACTION_THRESHOLD rows are queued there instead of running in the web process
+JOBS_ENABLED = os.environ.get('JOBS_ENABLED', 'False') == 'True'
+JOB_ACTION_THRESHOLD = int(os.environ.get('JOB_ACTION_THRESHOLD', '1000'))
+JOB_RETRY_DELAY_SECONDS = int(os.environ.get('JOB_RETRY_DELAY_SECONDS', '10'))  # doubled after each failed attempt
+JOB_MAX_RETRY_DELAY_SECONDS = int(os.environ.get('JOB_MAX_RETRY_DELAY_SECONDS', '3600'))
+JOB_TIMEOUT_SECONDS = int(os.environ.get('JOB_TIMEOUT_SECONDS', '600'))  # running jobs without a heartbeat for this long are retried
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', '7'))
+# Files written by jobs (exports); served to staff through the job admin, never publicly
+JOB_FILES_DIR = os.environ.get('JOB_FILES_DIR', os.path.join(BASE_DIR, 'job_files'))
+
+# Admin search: 'fulltext' uses the tsvector/pg_trgm indexes from
+# `manage.py create_admin_indexes`, 'default' keeps Django's ILIKE search
+ADMIN_SEARCH_BACKEND = os.environ.get('ADMIN_SEARCH_BACKEND', 'fulltext')
+
+# Changelists with keyset pagination show the planner's row estimate instead of COUNT(*) above this size
+ADMIN_COUNT_ESTIMATE_THRESHOLD = int(os.environ.get('ADMIN_COUNT_ESTIMATE_THRESHOLD', '10000'))
+
+# Store admin uploads by content hash under MEDIA_ROOT/blobs/ (deduplicated, immutable URLs)
+MEDIA_CONTENT_ADDRESSED = os.environ.get('MEDIA_CONTENT_ADDRESSED', 'True') == 'True'
+
+# Image renditions (thumbnail, preview, 1x/2x web sizes, WebP/AVIF),
+# generated in background worker processes after each upload
+IMAGE_RENDITIONS_ENABLED = os.environ.get('IMAGE_RENDITIONS_ENABLED', 'True') == 'True'
+IMAGE_RENDITION_WORKERS = int(os.environ.get('IMAGE_RENDITION_WORKERS', '2'))
+IMAGE_RENDITION_FORMATS = tuple(os.environ.get('IMAGE_RENDITION_FORMATS', 'webp,avif').split(','))
+IMAGE_RENDITION_QUALITY = int(os.environ.get('IMAGE_RENDITION_QUALITY', '82'))
+
+# Disk cache for admin preview thumbnails (LRU-evicted above the size cap)
+THUMBNAIL_CACHE_DIR = os.environ.get('THUMBNAIL_CACHE_DIR', os.path.join(BASE_DIR, 'thumbnail_cache'))
+THUMBNAIL_CACHE_MAX_BYTES = int(os.environ.get('THUMBNAIL_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# Per-request query instrumentation of admin views (Server-Timing header for staff, JSON log per request)
+ADMIN_PROFILING = os.environ.get('ADMIN_PROFILING', 'False') == 'True'
+ADMIN_PROFILE_PATH_PREFIX = os.environ.get('ADMIN_PROFILE_PATH_PREFIX', '/admin/')
+ADMIN_PROFILE_LOG = os.environ.get('ADMIN_PROFILE_LOG', os.path.join(BASE_DIR, 'logs', 'admin_profile.jsonl'))
+ADMIN_PROFILE_LOG_MAX_BYTES = int(os.environ.get('ADMIN_PROFILE_LOG_MAX_BYTES', 50 * 1024 * 1024))
+ADMIN_PROFILE_LOG_BACKUPS = int(os.environ.get('ADMIN_PROFILE_LOG_BACKUPS', '5'))
+ADMIN_PROFILE_TOP_QUERIES = int(os.environ.get('ADMIN_PROFILE_TOP_QUERIES', '5'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        # Size-rotated log shared by the gunicorn workers (the file and its directory are created on first use)
+        'admin_profile': {
+            'class': 'sda_backend.middleware.SharedRotatingFileHandler',
+            'filename': ADMIN_PROFILE_LOG,
+            'maxBytes': ADMIN_PROFILE_LOG_MAX_BYTES,
+            'backupCount': ADMIN_PROFILE_LOG_BACKUPS,
+            'formatter': 'message',
+            'delay': True,
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'sda_backend.profile': {
+            'handlers': ['admin_profile'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
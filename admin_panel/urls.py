@@ -5,6 +5,7 @@ from django.contrib import admin
 from django.urls import path
 from django.conf import settings
 from django.conf.urls.static import static
+from sda_backend import views as sda_views
 
 # Customize admin site
 admin.site.site_header = settings.ADMIN_SITE_HEADER
@@ -12,6 +13,10 @@ admin.site.site_title = settings.ADMIN_SITE_TITLE
 admin.site.index_title = settings.ADMIN_INDEX_TITLE
 
 urlpatterns = [
+    # Must come before admin.site.urls, whose catch-all view would swallow it
+    path('admin/thumbnail/', sda_views.thumbnail, name='admin_thumbnail'),
+    path('admin/uploads/', sda_views.upload_sessions, name='admin_upload_sessions'),
+    path('admin/uploads/<str:upload_id>/', sda_views.upload_session, name='admin_upload_session'),
     path('admin/', admin.site.urls),
 ]
 
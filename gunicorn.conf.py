@@ -0,0 +1,72 @@
+"""
+Gunicorn configuration for the admin panel.
+
+    gunicorn -c gunicorn.conf.py
+
+SERVER_MODE selects how requests are served:
+
+- ``wsgi`` (default): threaded sync workers (``gthread``) running
+  ``admin_panel.wsgi``.  nginx buffers request bodies, so slow uploads do
+  not hold a thread, and streamed responses (exports, file downloads) are
+  sent as they are produced.
+- ``asgi``: uvicorn workers running ``admin_panel.asgi``.  The request body
+  is read by the event loop before the view runs, so a slow client uploading
+  50 MB holds a socket, not a worker or a thread.  That is the only part
+  that is asynchronous: admin views, including the resumable upload
+  endpoint, are synchronous and run in a thread per request (no more
+  concurrency than wsgi once the body is in), and backend notifications are
+  sent by ``relay_outbox``, not by the web workers.  With a thread per
+  request a persistent database connection is never reused: this mode
+  requires DB_CONNECTION_MODE=pgbouncer (or per_request).  Django 4.2 reads synchronous streaming responses into
+  memory before sending them; exports stream asynchronously, but
+  ``FileResponse`` downloads are buffered.
+
+Worker counts are derived from the CPUs available to the process and can be
+overridden with GUNICORN_WORKERS / GUNICORN_THREADS.
+"""
+import os
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        return os.cpu_count() or 1
+
+
+# Exported so the settings of the workers see the same mode
+SERVER_MODE = os.environ.setdefault('SERVER_MODE', 'wsgi')
+CPUS = available_cpus()
+# Every worker (and, in wsgi mode, every thread) may hold a database connection
+MAX_WORKERS = int(os.environ.get('GUNICORN_MAX_WORKERS', '8'))
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8001')
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'admin_panel.asgi:application'
+    worker_class = 'admin_panel.workers.DjangoUvicornWorker'
+    # The event loop handles slow clients; the CPU-bound part is rendering
+    workers = int(os.environ.get('GUNICORN_WORKERS', min(CPUS + 1, MAX_WORKERS)))
+    # Concurrent requests per worker before uvicorn answers 503
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '100'))
+elif SERVER_MODE == 'wsgi':
+    wsgi_app = 'admin_panel.wsgi:application'
+    worker_class = 'gthread'
+    workers = int(os.environ.get('GUNICORN_WORKERS', min(2 * CPUS + 1, MAX_WORKERS)))
+    threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+else:
+    raise RuntimeError(f'Unknown SERVER_MODE: {SERVER_MODE} (expected asgi or wsgi)')
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so a leak in an image library cannot grow forever
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+
+# nginx sets X-Forwarded-For / X-Forwarded-Proto
+forwarded_allow_ips = os.environ.get('FORWARDED_ALLOW_IPS', '*')
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
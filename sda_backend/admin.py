@@ -2,8 +2,27 @@
 Django Admin configuration for SDA Backend models.
 Provides comprehensive admin interface with inline editing, filters, and search.
 """
+import os
+
+from django.conf import settings
 from django.contrib import admin
+from django.core.cache import cache
+from django.http import FileResponse, Http404
+from django.urls import path, reverse
+from django.utils import timezone
 from django.utils.html import format_html
+from .bulk import BulkSaveMixin
+from .cache import APP_LIST_CACHE_TIMEOUT, app_list_cache_key
+from .changelist import AnnotatedChangeListMixin, DeleteConfirmationMixin
+from .choices import CachedChoicesMixin
+from .exports import CONTACT_EXPORT_FIELDS, EXPORT_FORMATS, streaming_export_response
+from .gallery import GalleryUploadMixin
+from .ordering import DragOrderMixin
+from .jobs import enqueue, job_file, queue_stats
+from .pagination import KeysetPaginationMixin
+from .search import FullTextSearchMixin
+from .thumbnails import thumbnail_html
+from .widgets import ResumableUploadAdminMixin
 from .models import (
     Project, ProjectPhoto, ProjectService, ProjectSolution, PropertySector, PropertySectorProcess,
     News, NewsSection,
@@ -11,18 +30,19 @@ from .models import (
     Service, ServiceBenefit, ServiceProcess, ServiceWorkProcess,
     About,
     ContactMessage,
-    Partner, PartnerLogo
+    Partner, PartnerLogo,
+    Job,
 )
 from .forms import (
     ProjectAdminForm, ProjectPhotoAdminForm, NewsAdminForm, NewsSectionAdminForm,
     TeamMemberAdminForm, ServiceAdminForm, PartnerLogoAdminForm,
-    ServiceProcessAdminForm
+    ServiceProcessAdminForm, PropertySectorAdminForm
 )
 
 
 # ==================== Inline Admins ====================
 
-class ProjectPhotoInline(admin.TabularInline):
+class ProjectPhotoInline(ResumableUploadAdminMixin, admin.TabularInline):
     model = ProjectPhoto
     form = ProjectPhotoAdminForm
     extra = 0
@@ -32,7 +52,7 @@ class ProjectPhotoInline(admin.TabularInline):
     
     def image_preview(self, obj):
         if obj.image_url:
-            return format_html('<img src="{}" style="max-height: 100px; max-width: 200px;" />', obj.image_url)
+            return thumbnail_html(obj.image_url, 200, 100)
         return "No image"
     image_preview.short_description = 'Preview'
 
@@ -63,7 +83,7 @@ class PropertySectorProcessInline(admin.TabularInline):
     verbose_name_plural = 'Services'
 
 
-class NewsSectionInline(admin.StackedInline):
+class NewsSectionInline(ResumableUploadAdminMixin, admin.StackedInline):
     model = NewsSection
     form = NewsSectionAdminForm
     extra = 1
@@ -76,7 +96,7 @@ class NewsSectionInline(admin.StackedInline):
     )
 
 
-class PartnerLogoInline(admin.TabularInline):
+class PartnerLogoInline(ResumableUploadAdminMixin, admin.TabularInline):
     model = PartnerLogo
     form = PartnerLogoAdminForm
     extra = 1
@@ -85,7 +105,7 @@ class PartnerLogoInline(admin.TabularInline):
     
     def logo_preview(self, obj):
         if obj.image_url:
-            return format_html('<img src="{}" style="max-height: 50px;" />', obj.image_url)
+            return thumbnail_html(obj.image_url, 100, 50)
         return "No logo"
     logo_preview.short_description = 'Preview'
 
@@ -99,7 +119,7 @@ class ServiceBenefitInline(admin.TabularInline):
     verbose_name_plural = 'Benefits'
 
 
-class ServiceProcessInline(admin.TabularInline):
+class ServiceProcessInline(ResumableUploadAdminMixin, admin.TabularInline):
     model = ServiceProcess
     form = ServiceProcessAdminForm
     extra = 1
@@ -122,9 +142,12 @@ class ServiceWorkProcessInline(admin.TabularInline):
 # ==================== Model Admins ====================
 
 @admin.register(PropertySector)
-class PropertySectorAdmin(admin.ModelAdmin):
+class PropertySectorAdmin(FullTextSearchMixin, AnnotatedChangeListMixin, CachedChoicesMixin, DragOrderMixin, BulkSaveMixin, admin.ModelAdmin):
+    form = PropertySectorAdminForm
     list_display = ('id', 'title_display', 'order', 'featured_projects_display', 'processes_count', 'projects_count')
     list_editable = ('order',)
+    list_select_related = ('featured_project_1', 'featured_project_2', 'featured_project_3')
+    list_counts = {'process_steps_total': 'process_steps', 'projects_total': 'projects'}
     search_fields = ('title_en', 'title_az', 'title_ru', 'title')
     ordering = ('order',)
     inlines = [PropertySectorProcessInline]
@@ -144,8 +167,12 @@ class PropertySectorAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Featured Projects', {
-            'fields': ('featured_project_1', 'featured_project_2', 'featured_project_3'),
-            'description': 'Select up to 3 featured projects for this property sector'
+            'fields': (
+                ('featured_project_1', 'featured_project_1_slug'),
+                ('featured_project_2', 'featured_project_2_slug'),
+                ('featured_project_3', 'featured_project_3_slug'),
+            ),
+            'description': 'Select up to 3 featured projects for this property sector, from the list or by slug'
         }),
         ('Settings', {
             'fields': ('order',)
@@ -165,20 +192,23 @@ class PropertySectorAdmin(admin.ModelAdmin):
     featured_projects_display.short_description = 'Featured Projects'
     
     def processes_count(self, obj):
-        return obj.process_steps.count() if hasattr(obj, 'process_steps') else 0
+        return obj.process_steps_total
     processes_count.short_description = 'Process Steps'
+    processes_count.admin_order_field = 'process_steps_total'
     
     def projects_count(self, obj):
-        return obj.projects.count()
+        return obj.projects_total
     projects_count.short_description = 'Projects'
+    projects_count.admin_order_field = 'projects_total'
 
 
 @admin.register(PropertySectorProcess)
-class PropertySectorProcessAdmin(admin.ModelAdmin):
+class PropertySectorProcessAdmin(FullTextSearchMixin, DragOrderMixin, BulkSaveMixin, admin.ModelAdmin):
     list_display = ('id', 'property_sector_name', 'title_display', 'order')
     list_filter = ('property_sector__title_en',)
     search_fields = ('title_en', 'title_az', 'title_ru', 'title', 'description_en', 'description_az', 'description_ru')
     list_editable = ('order',)
+    list_select_related = ('property_sector',)
     ordering = ('property_sector__id', 'order',)
     
     fieldsets = (
@@ -220,12 +250,18 @@ class PropertySectorProcessAdmin(admin.ModelAdmin):
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(GalleryUploadMixin, FullTextSearchMixin, AnnotatedChangeListMixin, DeleteConfirmationMixin, DragOrderMixin, BulkSaveMixin, ResumableUploadAdminMixin, admin.ModelAdmin):
     form = ProjectAdminForm
+    gallery_model = ProjectPhoto
+    gallery_fk = 'project'
+    gallery_upload_to = 'projects/photos'
     list_display = ('id', 'title_display', 'property_sector', 'client', 'year', 'photos_count', 'cover_preview')
     list_filter = ('property_sector', 'year')
     search_fields = ('title_en', 'title_az', 'title_ru', 'title', 'client', 'slug')
+    trigram_search_fields = ('slug',)
     list_editable = ('property_sector',)
+    list_select_related = ('property_sector',)
+    list_counts = {'photos_total': 'photos'}
     ordering = ('-year', '-created_at')
     inlines = [ProjectPhotoInline, ProjectServiceInline, ProjectSolutionInline]
     
@@ -257,22 +293,24 @@ class ProjectAdmin(admin.ModelAdmin):
     title_display.short_description = 'Title'
     
     def photos_count(self, obj):
-        return obj.photos.count()
+        return obj.photos_total
     photos_count.short_description = 'Photos'
+    photos_count.admin_order_field = 'photos_total'
     
     def cover_preview(self, obj):
         if obj.cover_photo_url:
-            return format_html('<img src="{}" style="max-height: 50px;" />', obj.cover_photo_url)
+            return thumbnail_html(obj.cover_photo_url, 80, 50)
         return "No cover"
     cover_preview.short_description = 'Cover'
 
 
 @admin.register(ProjectSolution)
-class ProjectSolutionAdmin(admin.ModelAdmin):
+class ProjectSolutionAdmin(FullTextSearchMixin, CachedChoicesMixin, DragOrderMixin, BulkSaveMixin, admin.ModelAdmin):
     list_display = ('id', 'project_name', 'title_display', 'order')
     list_filter = ('project__title_en',)
     search_fields = ('title_en', 'title_az', 'title_ru', 'description_en', 'description_az', 'description_ru')
     list_editable = ('order',)
+    list_select_related = ('project',)
     ordering = ('project__id', 'order',)
     
     fieldsets = (
@@ -317,13 +355,14 @@ class ProjectSolutionAdmin(admin.ModelAdmin):
 
 
 @admin.register(News)
-class NewsAdmin(admin.ModelAdmin):
+class NewsAdmin(KeysetPaginationMixin, FullTextSearchMixin, AnnotatedChangeListMixin, DragOrderMixin, BulkSaveMixin, ResumableUploadAdminMixin, admin.ModelAdmin):
     form = NewsAdminForm
     list_display = ('id', 'title_display', 'tags_display', 'sections_count', 'created_at', 'photo_preview')
     search_fields = ('title', 'title_en', 'title_az', 'title_ru', 'summary')
     list_filter = ('created_at',)
     ordering = ('-created_at',)
     inlines = [NewsSectionInline]
+    list_counts = {'sections_total': 'sections'}
     
     fieldsets = (
         ('Photo & Tags', {
@@ -354,12 +393,13 @@ class NewsAdmin(admin.ModelAdmin):
     tags_display.short_description = 'Tags'
     
     def sections_count(self, obj):
-        return obj.sections.count()
+        return obj.sections_total
     sections_count.short_description = 'Sections'
+    sections_count.admin_order_field = 'sections_total'
     
     def photo_preview(self, obj):
         if obj.photo_url:
-            return format_html('<img src="{}" style="max-height: 50px;" />', obj.photo_url)
+            return thumbnail_html(obj.photo_url, 80, 50)
         return "No photo"
     photo_preview.short_description = 'Photo'
 
@@ -378,7 +418,7 @@ class NewsAdmin(admin.ModelAdmin):
 
 
 @admin.register(TeamMember)
-class TeamMemberAdmin(admin.ModelAdmin):
+class TeamMemberAdmin(FullTextSearchMixin, ResumableUploadAdminMixin, admin.ModelAdmin):
     form = TeamMemberAdminForm
     list_display = ('id', 'name_display', 'role_display', 'linkedin_url', 'photo_preview')
     search_fields = ('full_name_en', 'full_name_az', 'full_name_ru', 'full_name', 'role_en', 'role_az', 'role_ru')
@@ -417,17 +457,19 @@ class TeamMemberAdmin(admin.ModelAdmin):
     
     def photo_preview(self, obj):
         if obj.photo_url:
-            return format_html('<img src="{}" style="max-height: 50px;" />', obj.photo_url)
+            return thumbnail_html(obj.photo_url, 50, 50)
         return "No photo"
     photo_preview.short_description = 'Photo'
 
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(FullTextSearchMixin, AnnotatedChangeListMixin, DeleteConfirmationMixin, CachedChoicesMixin, DragOrderMixin, BulkSaveMixin, ResumableUploadAdminMixin, admin.ModelAdmin):
     form = ServiceAdminForm
     list_display = ('id', 'name_display', 'slug', 'order', 'benefits_count', 'processes_count')
     search_fields = ('name_en', 'name_az', 'name_ru', 'name', 'slug')
+    trigram_search_fields = ('slug',)
     list_editable = ('order',)
+    list_counts = {'benefits_total': 'benefits', 'process_steps_total': 'process_steps'}
     ordering = ('order',)
     inlines = [ServiceBenefitInline, ServiceProcessInline, ServiceWorkProcessInline]
     
@@ -440,8 +482,11 @@ class ServiceAdmin(admin.ModelAdmin):
             'description': 'Upload a new image or enter URL directly'
         }),
         ('Featured Projects', {
-            'fields': ('featured_project_1', 'featured_project_2'),
-            'description': 'Select two projects to feature on this service page'
+            'fields': (
+                ('featured_project_1', 'featured_project_1_slug'),
+                ('featured_project_2', 'featured_project_2_slug'),
+            ),
+            'description': 'Select two projects to feature on this service page, from the list or by slug'
         }),
         ('English', {
             'fields': ('name_en', 'description_en', 'meta_title_en', 'meta_description_en')
@@ -463,20 +508,23 @@ class ServiceAdmin(admin.ModelAdmin):
     name_display.short_description = 'Name'
     
     def benefits_count(self, obj):
-        return obj.benefits.count() if hasattr(obj, 'benefits') else 0
+        return obj.benefits_total
     benefits_count.short_description = 'Benefits'
+    benefits_count.admin_order_field = 'benefits_total'
     
     def processes_count(self, obj):
-        return obj.process_steps.count() if hasattr(obj, 'process_steps') else 0
+        return obj.process_steps_total
     processes_count.short_description = 'Process Steps'
+    processes_count.admin_order_field = 'process_steps_total'
 
 
 @admin.register(ServiceBenefit)
-class ServiceBenefitAdmin(admin.ModelAdmin):
+class ServiceBenefitAdmin(FullTextSearchMixin, DragOrderMixin, BulkSaveMixin, admin.ModelAdmin):
     list_display = ('id', 'service_name', 'title_display', 'order')
     list_filter = ('service__name_en',)
     search_fields = ('title_en', 'title_az', 'title_ru', 'title', 'description_en', 'description_az', 'description_ru')
     list_editable = ('order',)
+    list_select_related = ('service',)
     ordering = ('service__id', 'order',)
     
     fieldsets = (
@@ -508,12 +556,13 @@ class ServiceBenefitAdmin(admin.ModelAdmin):
 
 
 @admin.register(ServiceProcess)
-class ServiceProcessAdmin(admin.ModelAdmin):
+class ServiceProcessAdmin(FullTextSearchMixin, DragOrderMixin, BulkSaveMixin, ResumableUploadAdminMixin, admin.ModelAdmin):
     form = ServiceProcessAdminForm
     list_display = ('id', 'service_name', 'title_display', 'order', 'icon_preview')
     list_filter = ('service__name_en',)
     search_fields = ('title_en', 'title_az', 'title_ru', 'title', 'description_en', 'description_az', 'description_ru')
     list_editable = ('order',)
+    list_select_related = ('service',)
     ordering = ('service__id', 'order',)
     
     fieldsets = (
@@ -549,17 +598,18 @@ class ServiceProcessAdmin(admin.ModelAdmin):
     
     def icon_preview(self, obj):
         if obj.icon_url:
-            return format_html('<img src="{}" style="max-height: 30px;" />', obj.icon_url)
+            return thumbnail_html(obj.icon_url, 30, 30)
         return "No icon"
     icon_preview.short_description = 'Icon'
 
 
 @admin.register(ServiceWorkProcess)
-class ServiceWorkProcessAdmin(admin.ModelAdmin):
+class ServiceWorkProcessAdmin(FullTextSearchMixin, DragOrderMixin, BulkSaveMixin, admin.ModelAdmin):
     list_display = ('id', 'service_name', 'title_display', 'order')
     list_filter = ('service__name_en',)
     search_fields = ('title_en', 'title_az', 'title_ru', 'title', 'description_en', 'description_az', 'description_ru')
     list_editable = ('order',)
+    list_select_related = ('service',)
     ordering = ('service__id', 'order',)
     
     fieldsets = (
@@ -591,7 +641,7 @@ class ServiceWorkProcessAdmin(admin.ModelAdmin):
 
 
 @admin.register(About)
-class AboutAdmin(admin.ModelAdmin):
+class AboutAdmin(BulkSaveMixin, admin.ModelAdmin):
     list_display = ('id', 'years_experience', 'ongoing_projects', 'team_members')
     list_editable = ('years_experience', 'ongoing_projects', 'team_members')
     
@@ -619,10 +669,11 @@ class AboutAdmin(admin.ModelAdmin):
 
 
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(KeysetPaginationMixin, FullTextSearchMixin, BulkSaveMixin, admin.ModelAdmin):
     list_display = ('id', 'name_display', 'email', 'phone_number', 'status', 'is_read', 'created_at', 'message_type')
     list_filter = ('status', 'is_read', 'created_at', 'property_type')
     search_fields = ('name', 'first_name', 'last_name', 'email', 'phone_number', 'company', 'message')
+    trigram_search_fields = ('email', 'phone_number')
     list_editable = ('status', 'is_read')
     ordering = ('-created_at',)
     readonly_fields = ('created_at', 'updated_at')
@@ -656,33 +707,97 @@ class ContactMessageAdmin(admin.ModelAdmin):
         return format_html('<span style="color: green;">Contact</span>')
     message_type.short_description = 'Type'
     
-    actions = ['mark_as_read', 'mark_as_unread', 'mark_as_new', 'mark_as_in_progress', 'mark_as_resolved']
+    actions = [
+        'mark_as_read', 'mark_as_unread', 'mark_as_new', 'mark_as_in_progress', 'mark_as_resolved',
+        'export_csv', 'export_xlsx', 'export_jsonl', 'export_csv_job', 'export_xlsx_job',
+    ]
+    
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if not settings.JOBS_ENABLED:
+            actions.pop('export_csv_job', None)
+            actions.pop('export_xlsx_job', None)
+        return actions
+    
+    def get_urls(self):
+        urls = [
+            path(
+                'export/<str:fmt>/',
+                self.admin_site.admin_view(self.export_view),
+                name='sda_backend_contactmessage_export',
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def export_view(self, request, fmt):
+        """Export every row matching the current changelist filters and search"""
+        if fmt not in EXPORT_FORMATS or not self.has_view_permission(request):
+            raise Http404
+        queryset = self.get_changelist_instance(request).get_queryset(request)
+        return streaming_export_response(queryset, CONTACT_EXPORT_FIELDS, fmt, 'contact-messages')
+    
+    def queue_job(self, request, name, description, **kwargs):
+        job = enqueue(name, user=request.user, priority=5, **kwargs)
+        url = reverse('admin:sda_backend_job_change', args=[job.pk])
+        self.message_user(request, format_html('{} in the background: <a href="{}">follow its progress</a>.', description, url))
+    
+    def update_selected(self, request, queryset, **values):
+        """Update in this request, or as a background job when the selection is large"""
+        if settings.JOBS_ENABLED:
+            pks = list(queryset.values_list('pk', flat=True))
+            if len(pks) > settings.JOB_ACTION_THRESHOLD:
+                self.queue_job(request, 'contacts.update', f'Updating {len(pks)} messages', pks=pks, values=values)
+                return
+        queryset.update(**values)
     
     def mark_as_read(self, request, queryset):
-        queryset.update(is_read=True)
+        self.update_selected(request, queryset, is_read=True)
     mark_as_read.short_description = "Mark as read"
     
     def mark_as_unread(self, request, queryset):
-        queryset.update(is_read=False)
+        self.update_selected(request, queryset, is_read=False)
     mark_as_unread.short_description = "Mark as unread"
     
     def mark_as_new(self, request, queryset):
-        queryset.update(status='new')
+        self.update_selected(request, queryset, status='new')
     mark_as_new.short_description = "Mark as new"
     
     def mark_as_in_progress(self, request, queryset):
-        queryset.update(status='in_progress')
+        self.update_selected(request, queryset, status='in_progress')
     mark_as_in_progress.short_description = "Mark as in progress"
     
     def mark_as_resolved(self, request, queryset):
-        queryset.update(status='resolved')
+        self.update_selected(request, queryset, status='resolved')
     mark_as_resolved.short_description = "Mark as resolved"
+    
+    def export_csv(self, request, queryset):
+        return streaming_export_response(queryset, CONTACT_EXPORT_FIELDS, 'csv', 'contact-messages')
+    export_csv.short_description = "Export selected as CSV"
+    
+    def export_xlsx(self, request, queryset):
+        return streaming_export_response(queryset, CONTACT_EXPORT_FIELDS, 'xlsx', 'contact-messages')
+    export_xlsx.short_description = "Export selected as Excel (XLSX)"
+    
+    def export_jsonl(self, request, queryset):
+        return streaming_export_response(queryset, CONTACT_EXPORT_FIELDS, 'jsonl', 'contact-messages')
+    export_jsonl.short_description = "Export selected as JSON Lines"
+    
+    def export_csv_job(self, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
+        self.queue_job(request, 'contacts.export', f'Exporting {len(pks)} messages', pks=pks, fmt='csv')
+    export_csv_job.short_description = "Export selected as CSV in the background"
+    
+    def export_xlsx_job(self, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
+        self.queue_job(request, 'contacts.export', f'Exporting {len(pks)} messages', pks=pks, fmt='xlsx')
+    export_xlsx_job.short_description = "Export selected as Excel (XLSX) in the background"
 
 
 @admin.register(Partner)
-class PartnerAdmin(admin.ModelAdmin):
+class PartnerAdmin(FullTextSearchMixin, AnnotatedChangeListMixin, DragOrderMixin, BulkSaveMixin, admin.ModelAdmin):
     list_display = ('id', 'title_display', 'logos_count')
     search_fields = ('title',)
+    list_counts = {'logos_total': 'logos'}
     inlines = [PartnerLogoInline]
     
     fieldsets = (
@@ -696,8 +811,90 @@ class PartnerAdmin(admin.ModelAdmin):
     title_display.short_description = 'Title'
     
     def logos_count(self, obj):
-        return obj.logos.count()
+        return obj.logos_total
     logos_count.short_description = 'Logos'
+    logos_count.admin_order_field = 'logos_total'
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Read-only view of the background job queue (see jobs.py), with queue depth and throughput"""
+    list_display = ('id', 'name', 'status', 'priority', 'progress_display', 'attempts', 'created_by', 'created_at', 'duration')
+    list_filter = ('status', 'name')
+    list_select_related = ('created_by',)
+    ordering = ('-created_at',)
+    fields = (
+        'name', 'status', 'priority', 'progress_display', 'message', 'result_display', 'last_error',
+        'attempts', 'max_attempts', 'kwargs', 'worker', 'created_by',
+        'created_at', 'run_at', 'started_at', 'heartbeat_at', 'finished_at',
+    )
+    readonly_fields = fields
+    actions = ['retry_jobs', 'cancel_jobs']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_urls(self):
+        urls = [
+            path(
+                '<path:object_id>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='sda_backend_job_download',
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {'job_stats': queue_stats(), **(extra_context or {})}
+        return super().changelist_view(request, extra_context)
+    
+    def download_view(self, request, object_id):
+        """Serve a file written by a job (e.g. an export) to its owner or a superuser"""
+        job = self.get_object(request, object_id)
+        if job is None or not self.has_view_permission(request, job):
+            raise Http404
+        if not request.user.is_superuser and job.created_by_id != request.user.pk:
+            raise Http404
+        path = job_file(job)
+        if not path or not os.path.exists(path):
+            raise Http404
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=os.path.basename(path))
+    
+    def progress_display(self, obj):
+        if obj.total:
+            return format_html(
+                '<progress value="{}" max="{}"></progress> {} / {}', obj.progress, obj.total, obj.progress, obj.total,
+            )
+        return obj.progress or '-'
+    progress_display.short_description = 'Progress'
+    
+    def result_display(self, obj):
+        if job_file(obj):
+            url = reverse('admin:sda_backend_job_download', args=[obj.pk])
+            return format_html('<a href="{}">Download {}</a>', url, obj.result['file'])
+        return obj.result
+    result_display.short_description = 'Result'
+    
+    def duration(self, obj):
+        if obj.started_at and obj.finished_at:
+            return f"{(obj.finished_at - obj.started_at).total_seconds():.1f}s"
+        return '-'
+    duration.short_description = 'Duration'
+    
+    def retry_jobs(self, request, queryset):
+        count = queryset.filter(status__in=(Job.FAILED, Job.CANCELLED)).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now(), finished_at=None,
+        )
+        self.message_user(request, f'{count} job(s) queued again.')
+    retry_jobs.short_description = "Retry selected failed/cancelled jobs"
+    
+    def cancel_jobs(self, request, queryset):
+        count = queryset.filter(status=Job.QUEUED).update(status=Job.CANCELLED, finished_at=timezone.now())
+        self.message_user(request, f'{count} queued job(s) cancelled.')
+    cancel_jobs.short_description = "Cancel selected queued jobs"
 
 
 # PartnerLogo is managed via Partner inline
@@ -726,6 +923,13 @@ def get_app_list(self, request, app_label=None):
     Return a sorted list of all the installed apps that have been
     registered in this site.
     """
+    # Built for the sidebar of every admin page, so it is cached per user
+    cache_key = app_list_cache_key(request, app_label)
+    if cache_key:
+        app_list = cache.get(cache_key)
+        if app_list is not None:
+            return app_list
+
     app_dict = self._build_app_dict(request, app_label)
     
     # Sort the apps alphabetically.
@@ -757,6 +961,13 @@ def get_app_list(self, request, app_label=None):
                 x['name'].lower()
             ))
     
+    if cache_key:
+        # Names are lazy translations, which cannot be pickled
+        for app in app_list:
+            app['name'] = str(app['name'])
+            for model in app['models']:
+                model['name'] = str(model['name'])
+        cache.set(cache_key, app_list, APP_LIST_CACHE_TIMEOUT)
     return app_list
 
 # Override the get_app_list method
@@ -5,3 +5,7 @@ class SdaBackendConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sda_backend'
     verbose_name = 'SDA Backend Management'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
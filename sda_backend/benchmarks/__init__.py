@@ -0,0 +1,8 @@
+"""
+Admin page benchmarks against a synthetic dataset.
+
+Run with ``python manage.py bench_admin``: the harness creates a throwaway
+test database, builds the tables of the ``managed=False`` models in it,
+loads a generated dataset (``dataset.py``) and measures every registered
+ModelAdmin (``scenarios.py``) against the budgets in ``budgets.json``.
+"""
@@ -0,0 +1,148 @@
+"""
+Synthetic dataset for the admin benchmarks.
+
+Rows are generated from the model definitions, so new columns are filled
+without touching this module: text columns get words (emails, phones and
+slugs get plausible unique values), integers a spread of values, foreign
+keys a random existing row.  Everything is inserted with ``bulk_create``
+in batches and seeded, so two runs load the same data.
+"""
+import random
+import time
+
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+
+from sda_backend.schema import load_order, sda_models, supported
+
+
+BATCH_SIZE = 5000
+
+# Rows per model; models not listed get the preset's 'default'
+DATASETS = {
+    'small': {
+        'default': 20,
+        'Project': 500,
+        'ProjectPhoto': 10_000,
+        'ProjectSolution': 1_000,
+        'ProjectService': 1_000,
+        'ContactMessage': 5_000,
+        'News': 500,
+        'NewsSection': 2_000,
+    },
+    'medium': {
+        'default': 50,
+        'Project': 5_000,
+        'ProjectPhoto': 100_000,
+        'ProjectSolution': 10_000,
+        'ProjectService': 10_000,
+        'ContactMessage': 50_000,
+        'News': 5_000,
+        'NewsSection': 20_000,
+    },
+    'large': {
+        'default': 100,
+        'Project': 50_000,
+        'ProjectPhoto': 1_000_000,
+        'ProjectSolution': 100_000,
+        'ProjectService': 100_000,
+        'ContactMessage': 500_000,
+        'News': 50_000,
+        'NewsSection': 200_000,
+    },
+}
+
+WORDS = (
+    'baku office residential tower commercial retail hotel design build interior '
+    'facade consulting property sector solution service project modern green park '
+    'villa mall plaza heritage renovation logistics warehouse campus clinic school'
+).split()
+STATUSES = ('new', 'in_progress', 'resolved')
+
+
+class DatasetBuilder:
+    def __init__(self, preset='small', overrides=None, seed=42, stdout=None):
+        self.rows = dict(DATASETS[preset], **(overrides or {}))
+        self.random = random.Random(seed)
+        self.stdout = stdout
+        self.pks = {}  # model -> list of primary keys
+        self.deferred = {}  # model -> nullable foreign keys whose target was not loaded yet
+
+    def rows_for(self, model):
+        return self.rows.get(model.__name__, self.rows['default'])
+
+    def words(self, count):
+        return ' '.join(self.random.choice(WORDS) for _ in range(count))
+
+    def value(self, model, field, index):
+        name = field.name
+        if field.is_relation:
+            targets = self.pks.get(field.related_model)
+            if not targets:
+                return None  # filled in by link_deferred() once the target is loaded
+            return self.random.choice(targets)
+        if isinstance(field, ArrayField):
+            return [self.random.choice(WORDS) for _ in range(3)]
+        if isinstance(field, models.BooleanField):
+            return self.random.random() < 0.3
+        if isinstance(field, models.IntegerField):
+            if name.startswith('year'):
+                return 2000 + index % 25
+            return index
+        if name.endswith('_url'):
+            return None if field.null else ''
+        if name == 'email':
+            return f'user{index}@example.az'
+        if name == 'phone_number':
+            return f'+994 50 {index // 10000 % 1000:03d} {index % 10000:04d}'
+        if name == 'status':
+            return self.random.choice(STATUSES)
+        if field.unique or name == 'slug':
+            return f'{model._meta.db_table}-{index}'
+        if isinstance(field, (models.TextField, models.CharField)):
+            length = 40 if 'description' in name or name in ('message', 'content') else 3
+            text = self.words(length)
+            return text[:field.max_length] if field.max_length else text
+        return None
+
+    def build(self):
+        to_load = [model for model in sda_models() if supported(model)]
+        for model in load_order(to_load):
+            self.load(model)
+        self.link_deferred(to_load)
+        return {model.__name__: len(pks) for model, pks in self.pks.items()}
+
+    def load(self, model):
+        total = self.rows_for(model)
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key and not getattr(field, 'auto_now', False)
+            and not getattr(field, 'auto_now_add', False)
+        ]
+        self.deferred[model] = [
+            field for field in fields if field.is_relation and field.related_model not in self.pks
+        ]
+        started = time.monotonic()
+        for offset in range(0, total, BATCH_SIZE):
+            batch = [
+                model(**{field.attname: self.value(model, field, index) for field in fields})
+                for index in range(offset, min(offset + BATCH_SIZE, total))
+            ]
+            model.objects.bulk_create(batch)
+        self.pks[model] = list(model.objects.values_list('pk', flat=True))
+        if self.stdout:
+            self.stdout.write(f'  {model.__name__}: {total} rows in {time.monotonic() - started:.1f}s')
+
+    def link_deferred(self, loaded):
+        """Fill nullable foreign keys whose target was loaded later (e.g. featured projects)."""
+        for model in loaded:
+            fields = [field for field in self.deferred.get(model, ()) if self.pks.get(field.related_model)]
+            if not fields:
+                continue
+            pks = self.pks[model]
+            for offset in range(0, len(pks), BATCH_SIZE):
+                objects = list(model.objects.filter(pk__in=pks[offset:offset + BATCH_SIZE]).only('pk'))
+                for obj in objects:
+                    for field in fields:
+                        setattr(obj, field.attname, self.random.choice(self.pks[field.related_model]))
+                model.objects.bulk_update(objects, [field.name for field in fields])
@@ -0,0 +1,166 @@
+"""
+Admin page scenarios measured by ``bench_admin``.
+
+For every ModelAdmin registered for ``sda_backend`` the runner requests:
+
+- ``changelist`` - the first changelist page;
+- ``search``     - the changelist with ``?q=`` (admins with search_fields);
+- ``change``     - the change form of a row in the middle of the table;
+- ``action``     - the ``delete_selected`` confirmation page for 100 rows,
+  which runs the deletion collector over every cascade without deleting.
+
+Each scenario is requested once to warm caches, then ``repeat`` times for
+the median wall time, and once more under ``CaptureQueriesContext`` and
+``tracemalloc`` for the query count and peak Python memory.
+"""
+import io
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+
+from sda_backend.schema import sda_models, supported
+
+
+ACTION_ROWS = 100
+SEARCH_TERM = 'tower'
+
+
+@contextmanager
+def benchmark_database(keepdb=False, verbosity=1):
+    """
+    Create a throwaway test database with tables for the unmanaged models.
+
+    Yields True when the tables were created (i.e. the dataset still needs
+    loading) and False when ``keepdb`` reused a database from a previous run.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, keepdb=keepdb, serialize=False)
+    try:
+        yield create_content_tables()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity, keepdb=keepdb)
+
+
+def create_content_tables():
+    """Create the missing tables of the unmanaged models (and their indexes); True if any were created."""
+    existing = set(connection.introspection.table_names())
+    created = False
+    with connection.schema_editor() as editor:
+        for model in sda_models():
+            if not model._meta.managed and supported(model) and model._meta.db_table not in existing:
+                editor.create_model(model)
+                created = True
+    if created and connection.vendor == 'postgresql':
+        call_command('create_admin_indexes', no_concurrently=True, verbosity=0, stdout=io.StringIO())
+    return created
+
+
+def benchmark_user():
+    User = get_user_model()
+    user, _ = User.objects.get_or_create(
+        username='bench-admin',
+        defaults={'is_staff': True, 'is_superuser': True, 'email': 'bench@example.az'},
+    )
+    return user
+
+
+def registered_admins(names=None):
+    for model, model_admin in admin.site._registry.items():
+        if model._meta.app_label != 'sda_backend' or not supported(model):
+            continue
+        if names and model.__name__ not in names:
+            continue
+        yield model, model_admin
+
+
+def scenarios_for(model, model_admin, user):
+    """Yield ``(scenario, method, url, data)`` for one registered admin."""
+    info = model._meta.app_label, model._meta.model_name
+    changelist_url = reverse('admin:%s_%s_changelist' % info)
+    pks = list(model.objects.order_by('pk').values_list('pk', flat=True))
+
+    yield 'changelist', 'get', changelist_url, {}
+    if model_admin.search_fields:
+        yield 'search', 'get', changelist_url, {'q': SEARCH_TERM}
+    if pks:
+        yield 'change', 'get', reverse('admin:%s_%s_change' % info, args=[pks[len(pks) // 2]]), {}
+
+    request = RequestFactory().get(changelist_url)
+    request.user = user
+    if pks and 'delete_selected' in model_admin.get_actions(request):
+        yield 'action', 'post', changelist_url, {
+            'action': 'delete_selected',
+            'index': 0,
+            '_selected_action': pks[:ACTION_ROWS],
+        }
+
+
+def measure(client, method, url, data, repeat):
+    request = getattr(client, method)
+    # Entries cached by earlier scenarios could expire between the warm-up and the
+    # counted request (choice lists live 30 s with LocMem) and add a query
+    cache.clear()
+    response = request(url, data)  # warm-up: template loading, caches, connection
+    if response.status_code != 200:
+        raise RuntimeError(f'{method.upper()} {url} returned {response.status_code}')
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        request(url, data)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            request(url, data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'queries': len(queries),
+        'ms': round(statistics.median(timings) * 1000, 1),
+        'peak_kb': round(peak / 1024),
+    }
+
+
+def run(names=None, repeat=5, stdout=None):
+    """Measure every scenario; returns ``{'<url name>:<scenario>': result}``."""
+    setup_test_environment()  # allows the test client's 'testserver' host
+    try:
+        # The profiling middleware's own bookkeeping would be measured too
+        with override_settings(ADMIN_PROFILING=False):
+            return _run(names, repeat, stdout)
+    finally:
+        teardown_test_environment()
+
+
+def _run(names, repeat, stdout):
+    user = benchmark_user()
+    client = Client()
+    client.force_login(user)
+    results = {}
+    for model, model_admin in registered_admins(names):
+        for scenario, method, url, data in scenarios_for(model, model_admin, user):
+            key = f'{model._meta.app_label}_{model._meta.model_name}:{scenario}'
+            results[key] = measure(client, method, url, data, repeat)
+            if stdout:
+                result = results[key]
+                stdout.write(
+                    f"  {key:<48} {result['queries']:>4} queries {result['ms']:>9.1f} ms "
+                    f"{result['peak_kb']:>8} KiB"
+                )
+    return results
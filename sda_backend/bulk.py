@@ -0,0 +1,194 @@
+"""
+Set-based saving for editable changelists and inline formsets.
+
+Django saves every changed row of a ``list_editable`` changelist with its
+own ``UPDATE`` and its own ``LogEntry`` insert, and every inline row of a
+change form with its own ``INSERT``/``UPDATE``/``DELETE``, so reordering
+200 rows costs 400 round trips.  ``BulkSaveMixin`` collects the rows
+instead and writes them per model with:
+
+- one ``UPDATE ... FROM (VALUES ...)`` on PostgreSQL (``bulk_update``
+  elsewhere) for the changed rows;
+- one ``bulk_create`` for new inline rows and one ``DELETE`` for removed ones;
+- one ``bulk_create`` for all the changelist's ``LogEntry`` rows.
+
+Each form's hidden primary key is also checked against the rows the
+formset has already loaded, instead of with one ``SELECT`` per form.
+
+Rows written this way send no ``post_save``; ``bulk_saved`` is sent
+instead, so read models and the change outbox still see them.
+"""
+import json
+
+from django import forms
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.options import get_content_type_for_model
+from django.core.exceptions import ValidationError
+from django.db import connection, router, transaction
+
+from .signals import bulk_saved
+
+
+UPDATE_BATCH_SIZE = 1000
+
+
+def update_rows(model, objs, field_names):
+    """
+    Write ``field_names`` (plus ``auto_now`` fields) of the saved ``objs`` with
+    one statement per UPDATE_BATCH_SIZE rows; returns the number of rows updated.
+    """
+    if not objs:
+        return 0
+    opts = model._meta
+    fields = [opts.get_field(name) for name in field_names]
+    for field in opts.concrete_fields:
+        if getattr(field, 'auto_now', False) and field not in fields:
+            for obj in objs:
+                field.pre_save(obj, add=False)
+            fields.append(field)
+    if not fields:
+        return 0
+
+    if connection.vendor != 'postgresql':
+        return model._base_manager.bulk_update(objs, [field.name for field in fields], batch_size=UPDATE_BATCH_SIZE)
+
+    quote = connection.ops.quote_name
+    columns = [opts.pk, *fields]
+    assignments = ', '.join(f'{quote(field.column)} = v.{quote(field.column)}' for field in fields)
+    # Casts give the VALUES columns the table's types (the parameters arrive untyped)
+    placeholder = '({})'.format(', '.join(f'%s::{field.cast_db_type(connection)}' for field in columns))
+    updated = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), UPDATE_BATCH_SIZE):
+            batch = objs[start:start + UPDATE_BATCH_SIZE]
+            cursor.execute(
+                f'UPDATE {quote(opts.db_table)} AS t SET {assignments} '
+                f'FROM (VALUES {", ".join([placeholder] * len(batch))}) '
+                f'AS v({", ".join(quote(field.column) for field in columns)}) '
+                f'WHERE t.{quote(opts.pk.column)} = v.{quote(opts.pk.column)}',
+                [
+                    field.get_db_prep_save(getattr(obj, field.attname), connection)
+                    for obj in batch for field in columns
+                ],
+            )
+            updated += cursor.rowcount
+    return updated
+
+
+def log_changes(request, changes):
+    """Write the CHANGE log entries of ``changes`` [(obj, message), ...] in one INSERT."""
+    LogEntry.objects.bulk_create([
+        LogEntry(
+            user_id=request.user.pk,
+            content_type_id=get_content_type_for_model(obj).pk,
+            object_id=str(obj.pk),
+            object_repr=str(obj)[:200],
+            action_flag=CHANGE,
+            change_message=json.dumps(message) if isinstance(message, list) else message,
+        )
+        for obj, message in changes
+    ])
+
+
+class LoadedObjectField(forms.ModelChoiceField):
+    """A formset's primary key field, resolved among the objects the formset already loaded."""
+
+    def __init__(self, formset, *args, **kwargs):
+        self.formset = formset
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            obj = self.formset._existing_object(self.formset._pk_field.to_python(value))
+        except ValidationError:
+            obj = None
+        if obj is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+        return obj
+
+
+class LoadedObjectsFormSetMixin:
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        name = self._pk_field.name
+        field = form.fields.get(name)
+        if type(field) is forms.ModelChoiceField:
+            form.fields[name] = LoadedObjectField(
+                self, field.queryset, initial=field.initial, required=False, widget=field.widget,
+            )
+
+
+def loaded_objects_formset(formset_class):
+    return type(formset_class.__name__, (LoadedObjectsFormSetMixin, formset_class), {})
+
+
+class ChangelistChanges:
+    """Rows and log entries collected while Django processes a list_editable POST."""
+
+    def __init__(self):
+        self.objects = []
+        self.fields = set()
+        self.log = []
+
+    def save(self, request, model):
+        update_rows(model, self.objects, sorted(self.fields))
+        log_changes(request, self.log)
+        if self.objects:
+            bulk_saved.send(sender=model, objs=self.objects)
+
+
+class BulkSaveMixin:
+    """
+    ModelAdmin mixin saving ``list_editable`` changes and inline formsets
+    in bulk (see the module docstring).
+    """
+
+    def changelist_view(self, request, extra_context=None):
+        if not (request.method == 'POST' and self.list_editable and '_save' in request.POST):
+            return super().changelist_view(request, extra_context)
+        # save_model() and log_change() only collect; everything is written once the forms are processed
+        request.changelist_changes = ChangelistChanges()
+        try:
+            with transaction.atomic(using=router.db_for_write(self.model)):
+                response = super().changelist_view(request, extra_context)
+                request.changelist_changes.save(request, self.model)
+        finally:
+            del request.changelist_changes
+        return response
+
+    def get_changelist_formset(self, request, **kwargs):
+        return loaded_objects_formset(super().get_changelist_formset(request, **kwargs))
+
+    def get_formsets_with_inlines(self, request, obj=None):
+        for formset_class, inline in super().get_formsets_with_inlines(request, obj):
+            yield loaded_objects_formset(formset_class), inline
+
+    def save_model(self, request, obj, form, change):
+        changes = getattr(request, 'changelist_changes', None)
+        if changes is None or not change:
+            return super().save_model(request, obj, form, change)
+        concrete = {field.name for field in obj._meta.concrete_fields if not field.primary_key}
+        changes.fields.update(name for name in form.changed_data if name in concrete)
+        changes.objects.append(obj)
+
+    def log_change(self, request, obj, message):
+        changes = getattr(request, 'changelist_changes', None)
+        if changes is None:
+            return super().log_change(request, obj, message)
+        changes.log.append((obj, message))
+
+    def save_formset(self, request, form, formset, change):
+        formset.save(commit=False)  # runs the forms' save() (uploads included) without writing
+        model = formset.model
+        if formset.deleted_objects:
+            model._base_manager.filter(pk__in=[obj.pk for obj in formset.deleted_objects]).delete()
+        if formset.new_objects:
+            model._base_manager.bulk_create(formset.new_objects)
+        changed = [obj for obj, _changed_fields in formset.changed_objects]
+        # Every column, as Model.save() would: form.save() may set fields that are not in the form
+        update_rows(model, changed, [field.name for field in model._meta.concrete_fields if not field.primary_key])
+        formset.save_m2m()
+        if formset.new_objects or changed:
+            bulk_saved.send(sender=model, objs=[*formset.new_objects, *changed])
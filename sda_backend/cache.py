@@ -0,0 +1,231 @@
+"""
+Cache backends with hit/miss accounting, and the admin's cached values.
+
+``LocMemCache`` and ``RedisCache`` are the Django backends with every
+``get``/``get_many`` counted per key namespace (``sessions``,
+``admin_app_list``, ...).  Counters are kept per process and written to
+``CACHE_STATS_DIR/<host>-<pid>-<start>.json`` every few seconds, each
+process owning its file, so ``manage.py cache_stats`` can add up all
+gunicorn workers without extra round trips to the cache server.  Files of
+exited processes on this host, and files not written for
+``CACHE_STATS_TTL_SECONDS``, are removed by the next flush.
+"""
+import atexit
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends import locmem, redis
+from django.utils.translation import get_language
+
+
+# How long a cached admin sidebar / index app list may be served
+APP_LIST_CACHE_TIMEOUT = 300
+APP_LIST_VERSION_KEY = 'admin_app_list:version'
+
+STATS_FLUSH_SECONDS = 5
+STATS_PRUNE_SECONDS = 60
+RESET_MARKER = 'reset'
+# Raw key prefixes Django uses without a ':' separator
+NAMESPACE_PREFIXES = {
+    'django.contrib.sessions': 'sessions',
+    'template.cache.': 'template_fragments',
+}
+
+_MISSING = object()
+_counts = Counter()
+_counts_lock = threading.Lock()
+_last_flush = time.monotonic()
+_last_prune = None
+_counting_since = time.time()
+_host = socket.gethostname().replace('-', '_')
+_stats_file = f'{_host}-{os.getpid()}-{int(time.time())}.json'
+
+
+def cache_namespace(key):
+    for prefix, namespace in NAMESPACE_PREFIXES.items():
+        if key.startswith(prefix):
+            return namespace
+    return key.split(':', 1)[0]
+
+
+def record(key, hit):
+    global _last_flush
+    with _counts_lock:
+        _counts[cache_namespace(key), 'hits' if hit else 'misses'] += 1
+        due = time.monotonic() - _last_flush >= STATS_FLUSH_SECONDS
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        flush_stats()
+
+
+def flush_stats():
+    """Write this process's counters to its own stats file (atomic replace)."""
+    global _counting_since
+    try:
+        reset_at = os.path.getmtime(os.path.join(settings.CACHE_STATS_DIR, RESET_MARKER))
+    except OSError:
+        reset_at = 0
+    with _counts_lock:
+        if reset_at > _counting_since:
+            # `cache_stats --reset` ran in another process since we started counting
+            _counts.clear()
+            _counting_since = time.time()
+        snapshot = {}
+        for (namespace, kind), count in _counts.items():
+            snapshot.setdefault(namespace, {'hits': 0, 'misses': 0})[kind] = count
+    if not snapshot:
+        return
+    try:
+        os.makedirs(settings.CACHE_STATS_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=settings.CACHE_STATS_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w') as tmp:
+            json.dump(snapshot, tmp)
+        os.replace(tmp_path, os.path.join(settings.CACHE_STATS_DIR, _stats_file))
+    except OSError:
+        pass  # statistics must never break a request
+    global _last_prune
+    if _last_prune is None or time.monotonic() - _last_prune >= STATS_PRUNE_SECONDS:
+        _last_prune = time.monotonic()
+        prune_stats()
+
+
+atexit.register(flush_stats)
+
+
+def discard_stats():
+    """Forget this process's counters without writing them (benchmarks, tests)."""
+    with _counts_lock:
+        _counts.clear()
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def stale(name, mtime, now):
+    """True for the file of an exited process on this host, or one not written within the TTL."""
+    if now - mtime > settings.CACHE_STATS_TTL_SECONDS:
+        return True
+    host, _, rest = name.partition('-')
+    pid = rest.split('-', 1)[0]
+    # Pids of other hosts sharing the directory cannot be checked from here
+    return host == _host and pid.isdigit() and int(pid) != os.getpid() and not pid_alive(int(pid))
+
+
+def prune_stats():
+    """Remove the stats (and leftover temp) files of exited or long-idle processes."""
+    now = time.time()
+    try:
+        entries = list(os.scandir(settings.CACHE_STATS_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        if not entry.name.endswith(('.json', '.tmp')) or entry.name == _stats_file:
+            continue
+        try:
+            if stale(entry.name, entry.stat().st_mtime, now):
+                os.unlink(entry.path)
+        except OSError:
+            pass  # already pruned by another worker
+
+
+def read_stats():
+    """Sum the stats files of every process: namespace -> {'hits': n, 'misses': n}."""
+    totals = {}
+    if not os.path.isdir(settings.CACHE_STATS_DIR):
+        return totals
+    prune_stats()
+    for entry in os.scandir(settings.CACHE_STATS_DIR):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            with open(entry.path) as stats_file:
+                snapshot = json.load(stats_file)
+        except (OSError, ValueError):
+            continue
+        for namespace, counts in snapshot.items():
+            total = totals.setdefault(namespace, {'hits': 0, 'misses': 0})
+            total['hits'] += counts.get('hits', 0)
+            total['misses'] += counts.get('misses', 0)
+    return totals
+
+
+def reset_stats():
+    """Zero the counters of every process (each one clears itself on its next flush)."""
+    os.makedirs(settings.CACHE_STATS_DIR, exist_ok=True)
+    marker = os.path.join(settings.CACHE_STATS_DIR, RESET_MARKER)
+    with open(marker, 'a'):
+        os.utime(marker)
+    for entry in os.scandir(settings.CACHE_STATS_DIR):
+        if entry.name.endswith(('.json', '.tmp')):
+            os.unlink(entry.path)
+
+
+class CacheStatsMixin:
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        record(key, value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        for key in keys:
+            record(key, key in found)
+        return found
+
+
+class LocMemCache(CacheStatsMixin, locmem.LocMemCache):
+    def get_many(self, keys, version=None):
+        # BaseCache.get_many goes through self.get, which already counts each key
+        return locmem.LocMemCache.get_many(self, keys, version)
+
+
+class RedisCache(CacheStatsMixin, redis.RedisCache):
+    pass
+
+
+def new_version():
+    # Time based, so a version key lost to eviction never comes back as an old value
+    return time.time_ns()
+
+
+def get_version(version_key):
+    """Current value of a version counter that is part of the keys it invalidates."""
+    return cache.get_or_set(version_key, new_version, timeout=None)
+
+
+def bump_version(version_key):
+    """Invalidate every key built with ``get_version(version_key)``."""
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, new_version(), timeout=None)
+
+
+def app_list_cache_key(request, app_label=None):
+    """Per-user key for AdminSite.get_app_list, or None for anonymous requests."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    version = get_version(APP_LIST_VERSION_KEY)
+    return f'admin_app_list:{version}:{user.pk}:{app_label or "-"}:{get_language()}'
+
+
+def invalidate_app_lists():
+    """Drop every cached app list (permissions, groups or staff flags changed)."""
+    bump_version(APP_LIST_VERSION_KEY)
@@ -0,0 +1,72 @@
+"""
+Cached choice lists for foreign key dropdowns.
+
+Every ``featured_project_*`` select (three on a property sector, two on a
+service) used to run its own ``SELECT * FROM projects`` and build model
+instances just to print their titles.  The choices are now built once
+from ``id``, ``title_en`` and ``slug``, kept in the cache under a version
+key, and shared by every select on every form until a ``Project`` is
+saved or deleted (see ``signals.py``).
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import bump_version, get_version
+from .models import Project
+
+
+PROJECT_CHOICES_VERSION_KEY = 'choices:projects:version'
+
+
+def project_label(pk, title_en, slug):
+    if title_en and slug:
+        return f'{title_en} ({slug})'
+    return title_en or slug or f'Project {pk}'
+
+
+def project_choices():
+    """[(id, label), ...] for every project, in the model's default ordering."""
+    key = f'choices:projects:{get_version(PROJECT_CHOICES_VERSION_KEY)}'
+    choices = cache.get(key)
+    if choices is None:
+        choices = [
+            (pk, project_label(pk, title_en, slug))
+            for pk, title_en, slug in Project.objects.values_list('id', 'title_en', 'slug')
+        ]
+        cache.set(key, choices, settings.CHOICES_CACHE_TIMEOUT)
+    return choices
+
+
+def invalidate_project_choices():
+    bump_version(PROJECT_CHOICES_VERSION_KEY)
+
+
+# Related model -> function returning its cached choices
+CHOICE_PROVIDERS = {
+    Project: project_choices,
+}
+
+
+class CachedChoicesMixin:
+    """
+    Render foreign key selects to models in ``CHOICE_PROVIDERS`` from the cache.
+
+    Only the rendered options come from the cache; a submitted value is
+    still validated against the database by ``ModelChoiceField``.
+    """
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        provider = CHOICE_PROVIDERS.get(db_field.related_model)
+        if (
+            formfield is None
+            or provider is None
+            or db_field.name in self.raw_id_fields
+            or db_field.name in self.get_autocomplete_fields(request)
+        ):
+            return formfield
+        choices = list(provider())
+        if formfield.empty_label is not None:
+            choices.insert(0, ('', formfield.empty_label))
+        formfield.choices = choices
+        return formfield
@@ -3,27 +3,34 @@ Custom forms for file uploads in Django Admin.
 Handles image uploads and saves them via the FastAPI backend.
 """
 from django import forms
+from django.core.exceptions import ValidationError
+from django.core.files.move import file_move_safe
 from django.core.files.storage import default_storage
 from django.conf import settings
 import os
 import requests
+from .images import schedule_renditions
+from .resolvers import ProjectResolver
+from .storage import media_storage
+from .widgets import ResumableFileInput
 from .models import (
     Project, ProjectPhoto, News, NewsSection, TeamMember,
     Service, ServiceProcess, About, Partner, PartnerLogo, WorkProcess, PropertySector
 )
 
 
-class ImageUploadMixin:
-    """Mixin to handle image uploads via FastAPI backend"""
-    
-    def save_uploaded_file(self, uploaded_file, path_prefix=''):
-        """
-        Save uploaded file via FastAPI backend upload endpoint
-        Returns the URL of the uploaded file
-        """
-        if not uploaded_file:
-            return None
-        
+def save_uploaded_file(uploaded_file, path_prefix=''):
+    """
+    Save uploaded file via FastAPI backend upload endpoint
+    Returns the URL of the uploaded file
+    """
+    if not uploaded_file:
+        return None
+    
+    if settings.MEDIA_CONTENT_ADDRESSED:
+        # Stored by content hash: identical files are kept once, URLs never change meaning
+        url = media_storage.url(media_storage.save(uploaded_file.name, uploaded_file))
+    else:
         # For now, save locally and return the path
         # In production, you'd upload to FastAPI backend
         upload_dir = os.path.join(settings.MEDIA_ROOT, path_prefix)
@@ -31,16 +38,106 @@ class ImageUploadMixin:
         
         file_path = os.path.join(upload_dir, uploaded_file.name)
         
-        with open(file_path, 'wb+') as destination:
-            for chunk in uploaded_file.chunks():
-                destination.write(chunk)
+        if hasattr(uploaded_file, 'temporary_file_path'):
+            # Already on disk (MEDIA_ROOT/.incoming when streamed): rename instead of copying
+            file_move_safe(uploaded_file.temporary_file_path(), file_path, allow_overwrite=True)
+        else:
+            with open(file_path, 'wb+') as destination:
+                for chunk in uploaded_file.chunks():
+                    destination.write(chunk)
         
-        # Return the URL path
-        return f"/uploads/{path_prefix}/{uploaded_file.name}" if path_prefix else f"/uploads/{uploaded_file.name}"
+        url = f"/uploads/{path_prefix}/{uploaded_file.name}" if path_prefix else f"/uploads/{uploaded_file.name}"
+    
+    # Thumbnails and web sizes are built in worker processes, not in this request
+    schedule_renditions(url)
+    
+    # Return the URL path
+    return url
+
+
+class ImageUploadMixin:
+    """Mixin to handle image uploads via FastAPI backend"""
+    
+    def save_uploaded_file(self, uploaded_file, path_prefix=''):
+        return save_uploaded_file(uploaded_file, path_prefix)
+
+
+class UploadImageField(forms.ImageField):
+    """ImageField uploaded in resumable chunks that reports files rejected while streaming (see uploadhandlers.py)"""
+    widget = ResumableFileInput
+    
+    def to_python(self, data):
+        error = getattr(data, 'upload_error', None)
+        if error:
+            raise ValidationError(error, code='upload_rejected')
+        return super().to_python(data)
+
+
+def featured_project_slug_field(number):
+    return forms.CharField(
+        required=False,
+        label=f'Featured Project {number} (Slug)',
+        help_text='Enter project slug (e.g., "project-name"). Leave blank to use the dropdown instead.',
+        widget=forms.TextInput(attrs={'placeholder': 'e.g., project-name'})
+    )
+
+
+class FeaturedProjectSlugMixin:
+    """
+    Mixin to pick featured projects by slug as well as from the dropdown.
+
+    Forms declare a ``<field>_slug`` field (see ``featured_project_slug_field``)
+    for every name in ``featured_project_fields``.  All IDs and slugs of a
+    form are resolved together through one ``ProjectResolver``.
+    """
+    featured_project_fields = ()
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.project_resolver = ProjectResolver()
+        self.featured_project_ids = {}
+        
+        # Show the slugs of the current featured projects
+        current = {name: getattr(self.instance, f'{name}_id') for name in self.featured_project_fields}
+        if self.instance.pk and any(current.values()):
+            slug_by_id, _ = self.project_resolver.resolve(ids=current.values())
+            for name, project_id in current.items():
+                if project_id in slug_by_id and f'{name}_slug' in self.fields:
+                    self.fields[f'{name}_slug'].initial = slug_by_id[project_id]
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        
+        # Only a slug that was edited overrides the dropdown
+        slugs = {
+            name: cleaned_data.get(f'{name}_slug')
+            for name in self.featured_project_fields
+            if f'{name}_slug' in self.changed_data and cleaned_data.get(f'{name}_slug')
+        }
+        if slugs:
+            _, id_by_slug = self.project_resolver.resolve(slugs=slugs.values(), fresh=True)
+            for name, slug in slugs.items():
+                if slug in id_by_slug:
+                    self.featured_project_ids[name] = id_by_slug[slug]
+                else:
+                    self.add_error(f'{name}_slug', f'Project with slug "{slug}" not found.')
+        
+        return cleaned_data
+    
+    def save(self, commit=True):
+        instance = super().save(commit=False)
+        
+        for name, project_id in self.featured_project_ids.items():
+            setattr(instance, f'{name}_id', project_id)
+        
+        if commit:
+            instance.save()
+            self._save_m2m()
+        return instance
 
 
 class ProjectAdminForm(forms.ModelForm, ImageUploadMixin):
-    cover_photo = forms.ImageField(required=False, label='Cover Photo Upload')
+    cover_photo = UploadImageField(required=False, label='Cover Photo Upload')
     
     class Meta:
         model = Project
@@ -68,7 +165,7 @@ class ProjectAdminForm(forms.ModelForm, ImageUploadMixin):
 
 
 class ProjectPhotoAdminForm(forms.ModelForm, ImageUploadMixin):
-    image = forms.ImageField(required=False, label='Photo Upload')
+    image = UploadImageField(required=False, label='Photo Upload')
     
     class Meta:
         model = ProjectPhoto
@@ -100,7 +197,7 @@ class ProjectPhotoAdminForm(forms.ModelForm, ImageUploadMixin):
 
 
 class NewsAdminForm(forms.ModelForm, ImageUploadMixin):
-    photo = forms.ImageField(required=False, label='Photo Upload')
+    photo = UploadImageField(required=False, label='Photo Upload')
     
     class Meta:
         model = News
@@ -128,7 +225,7 @@ class NewsAdminForm(forms.ModelForm, ImageUploadMixin):
 
 
 class NewsSectionAdminForm(forms.ModelForm, ImageUploadMixin):
-    image = forms.ImageField(required=False, label='Image Upload')
+    image = UploadImageField(required=False, label='Image Upload')
     
     class Meta:
         model = NewsSection
@@ -156,7 +253,7 @@ class NewsSectionAdminForm(forms.ModelForm, ImageUploadMixin):
 
 
 class TeamMemberAdminForm(forms.ModelForm, ImageUploadMixin):
-    photo = forms.ImageField(required=False, label='Photo Upload')
+    photo = UploadImageField(required=False, label='Photo Upload')
     
     class Meta:
         model = TeamMember
@@ -183,8 +280,11 @@ class TeamMemberAdminForm(forms.ModelForm, ImageUploadMixin):
         return instance
 
 
-class ServiceAdminForm(forms.ModelForm, ImageUploadMixin):
-    image = forms.ImageField(required=False, label='Image Upload')
+class ServiceAdminForm(FeaturedProjectSlugMixin, forms.ModelForm, ImageUploadMixin):
+    image = UploadImageField(required=False, label='Image Upload')
+    featured_project_1_slug = featured_project_slug_field(1)
+    featured_project_2_slug = featured_project_slug_field(2)
+    featured_project_fields = ('featured_project_1', 'featured_project_2')
     
     class Meta:
         model = Service
@@ -212,7 +312,7 @@ class ServiceAdminForm(forms.ModelForm, ImageUploadMixin):
 
 
 class PartnerLogoAdminForm(forms.ModelForm, ImageUploadMixin):
-    image = forms.ImageField(required=False, label='Logo Upload')
+    image = UploadImageField(required=False, label='Logo Upload')
     
     class Meta:
         model = PartnerLogo
@@ -240,7 +340,7 @@ class PartnerLogoAdminForm(forms.ModelForm, ImageUploadMixin):
 
 
 class WorkProcessAdminForm(forms.ModelForm, ImageUploadMixin):
-    image = forms.ImageField(required=False, label='Image Upload')
+    image = UploadImageField(required=False, label='Image Upload')
     
     class Meta:
         model = WorkProcess
@@ -268,7 +368,7 @@ class WorkProcessAdminForm(forms.ModelForm, ImageUploadMixin):
 
 
 class ServiceProcessAdminForm(forms.ModelForm, ImageUploadMixin):
-    icon = forms.ImageField(required=False, label='Icon Upload')
+    icon = UploadImageField(required=False, label='Icon Upload')
     
     class Meta:
         model = ServiceProcess
@@ -295,87 +395,13 @@ class ServiceProcessAdminForm(forms.ModelForm, ImageUploadMixin):
         return instance
 
 
-class PropertySectorAdminForm(forms.ModelForm):
+class PropertySectorAdminForm(FeaturedProjectSlugMixin, forms.ModelForm):
     """Custom form for PropertySector to allow selecting projects by slug"""
-    featured_project_1_slug = forms.CharField(
-        required=False,
-        label='Featured Project 1 (Slug)',
-        help_text='Enter project slug (e.g., "project-name"). Leave blank to use ID field instead.',
-        widget=forms.TextInput(attrs={'placeholder': 'e.g., project-name'})
-    )
-    featured_project_2_slug = forms.CharField(
-        required=False,
-        label='Featured Project 2 (Slug)',
-        help_text='Enter project slug. Leave blank to use ID field instead.',
-        widget=forms.TextInput(attrs={'placeholder': 'e.g., project-name'})
-    )
-    featured_project_3_slug = forms.CharField(
-        required=False,
-        label='Featured Project 3 (Slug)',
-        help_text='Enter project slug. Leave blank to use ID field instead.',
-        widget=forms.TextInput(attrs={'placeholder': 'e.g., project-name'})
-    )
+    featured_project_1_slug = featured_project_slug_field(1)
+    featured_project_2_slug = featured_project_slug_field(2)
+    featured_project_3_slug = featured_project_slug_field(3)
+    featured_project_fields = ('featured_project_1', 'featured_project_2', 'featured_project_3')
     
     class Meta:
         model = PropertySector
         fields = '__all__'
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        
-        # Populate slug fields from existing IDs if editing
-        if self.instance.pk:
-            if self.instance.featured_project_1_id:
-                try:
-                    project = Project.objects.get(id=self.instance.featured_project_1_id)
-                    self.fields['featured_project_1_slug'].initial = project.slug
-                except Project.DoesNotExist:
-                    pass
-            
-            if self.instance.featured_project_2_id:
-                try:
-                    project = Project.objects.get(id=self.instance.featured_project_2_id)
-                    self.fields['featured_project_2_slug'].initial = project.slug
-                except Project.DoesNotExist:
-                    pass
-            
-            if self.instance.featured_project_3_id:
-                try:
-                    project = Project.objects.get(id=self.instance.featured_project_3_id)
-                    self.fields['featured_project_3_slug'].initial = project.slug
-                except Project.DoesNotExist:
-                    pass
-    
-    def clean(self):
-        cleaned_data = super().clean()
-        
-        # Convert slugs to IDs
-        for i in range(1, 4):
-            slug_field = f'featured_project_{i}_slug'
-            id_field = f'featured_project_{i}_id'
-            
-            slug = cleaned_data.get(slug_field)
-            project_id = cleaned_data.get(id_field)
-            
-            # If slug is provided, use it to find the project ID
-            if slug:
-                try:
-                    project = Project.objects.get(slug=slug)
-                    cleaned_data[id_field] = project.id
-                except Project.DoesNotExist:
-                    self.add_error(slug_field, f'Project with slug "{slug}" not found.')
-            # If no slug but ID is provided, keep the ID
-            elif project_id:
-                cleaned_data[id_field] = project_id
-            else:
-                cleaned_data[id_field] = None
-        
-        return cleaned_data
-    
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        
-        # The IDs are already set in clean()
-        if commit:
-            instance.save()
-        return instance
@@ -0,0 +1,133 @@
+"""
+Bulk gallery uploads on a change page.
+
+``GalleryUploadMixin`` adds ``<object_id>/gallery/`` to a ModelAdmin: a
+drag-and-drop page where any number of photos are uploaded in parallel
+through the resumable upload endpoint (``resumable.py``).  The page then
+posts the finished upload tokens (or, without JavaScript, the files
+themselves) and the view:
+
+1. decodes every image in the image worker pool (``images.get_executor``);
+2. moves the valid files into media storage;
+3. creates all photo rows with one ``bulk_create`` in a transaction,
+   numbering ``order`` after the highest existing value while the parent
+   row is locked, so two imports into the same gallery cannot interleave;
+4. queues their renditions.
+"""
+from concurrent.futures import wait
+
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Max
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+
+from .forms import save_uploaded_file
+from .images import get_executor, verify_image
+from .resumable import UploadError, UploadSession
+from .signals import bulk_saved
+from .thumbnails import thumbnail_html
+
+
+class GalleryUploadMixin:
+    """
+    ModelAdmin mixin; set ``gallery_model`` (the photo model),
+    ``gallery_fk`` (its foreign key to this admin's model),
+    ``gallery_url_field`` and ``gallery_upload_to``.
+    """
+    gallery_model = None
+    gallery_fk = None
+    gallery_url_field = 'image_url'
+    gallery_upload_to = ''
+    gallery_template = 'admin/sda_backend/gallery.html'
+    # Upload endpoint field name; selects the size limit in UPLOAD_FIELD_MAX_SIZES
+    gallery_field_name = 'image'
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        urls = [
+            path(
+                '<path:object_id>/gallery/',
+                self.admin_site.admin_view(self.gallery_view),
+                name='%s_%s_gallery' % info,
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def gallery_view(self, request, object_id):
+        obj = self.get_object(request, object_id)
+        if obj is None:
+            raise Http404
+        if not self.has_change_permission(request, obj):
+            raise PermissionDenied
+
+        if request.method == 'POST':
+            created, errors = self.import_gallery(request, obj)
+            if request.headers.get('Accept') == 'application/json':
+                return JsonResponse({'created': created, 'errors': errors})
+            if created:
+                messages.success(request, f'Added {created} photo(s).')
+            for error in errors:
+                messages.error(request, error)
+            return HttpResponseRedirect(request.path)
+        return TemplateResponse(request, self.gallery_template, self.gallery_context(request, obj))
+
+    def gallery_context(self, request, obj):
+        opts = self.model._meta
+        photos = self.gallery_model.objects.filter(**{self.gallery_fk: obj}).order_by('order', 'pk')
+        return {
+            **self.admin_site.each_context(request),
+            'title': f'Gallery: {obj}',
+            'opts': opts,
+            'original': obj,
+            'photos': [thumbnail_html(getattr(photo, self.gallery_url_field), 160, 120) for photo in photos],
+            'upload_url': reverse('admin_upload_sessions'),
+            'field_name': self.gallery_field_name,
+            'change_url': reverse(f'admin:{opts.app_label}_{opts.model_name}_change', args=[obj.pk]),
+        }
+
+    def gallery_files(self, request):
+        """Files posted directly plus finished resumable uploads; returns (files, errors)."""
+        files = list(request.FILES.getlist('photos'))
+        errors = []
+        for token in request.POST.getlist('upload'):
+            try:
+                files.append(UploadSession.from_token(token, request.user, self.gallery_field_name).uploaded_file())
+            except UploadError as error:
+                errors.append(str(error))
+        errors.extend(f'{upload.name}: {upload.upload_error}' for upload in files if getattr(upload, 'upload_error', None))
+        return [upload for upload in files if not getattr(upload, 'upload_error', None)], errors
+
+    def import_gallery(self, request, obj):
+        files, errors = self.gallery_files(request)
+        if not files:
+            return 0, errors or ['No photos were uploaded.']
+
+        # Decode every image in parallel in the worker processes
+        executor = get_executor()
+        futures = {executor.submit(verify_image, upload.temporary_file_path()): upload for upload in files}
+        wait(futures)
+        valid = []
+        for future, upload in futures.items():
+            if future.exception() is None:
+                valid.append(upload)
+            else:
+                errors.append(f'{upload.name}: not a valid image ({future.exception()})')
+        # Keep the order the files were chosen in
+        valid.sort(key=files.index)
+
+        urls = [save_uploaded_file(upload, self.gallery_upload_to) for upload in valid]
+        with transaction.atomic():
+            type(obj).objects.select_for_update().filter(pk=obj.pk).exists()
+            photos = self.gallery_model.objects.filter(**{self.gallery_fk: obj})
+            start = (photos.aggregate(highest=Max('order'))['highest'] or 0) + 1
+            photos = self.gallery_model.objects.bulk_create([
+                self.gallery_model(**{self.gallery_fk: obj, self.gallery_url_field: url, 'order': start + index})
+                for index, url in enumerate(urls)
+            ])
+            bulk_saved.send(sender=self.gallery_model, objs=photos)
+        if urls:
+            self.log_change(request, obj, f'Added {len(urls)} photo(s) with the gallery uploader.')
+        return len(urls), errors
@@ -0,0 +1,292 @@
+"""
+Image rendition pipeline for uploaded media.
+
+Uploads are written once by the admin request; resized renditions
+(thumbnail, list preview, 1x/2x web sizes) and WebP/AVIF variants are
+generated afterwards in a pool of worker processes, so a large upload
+does not hold the request open while Pillow resamples it.
+
+Renditions live next to the original so no columns are needed on the
+shared tables:
+
+    /uploads/projects/covers/cover.jpg
+    /uploads/projects/covers/_renditions/cover.jpg/manifest.json
+    /uploads/projects/covers/_renditions/cover.jpg/thumb.webp
+    ...
+
+``manifest.json`` records the size of every rendition and its file per format.
+"""
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+# URL prefix the FastAPI backend serves MEDIA_ROOT under
+UPLOADS_URL = '/uploads/'
+
+RENDITIONS_DIR = '_renditions'
+MANIFEST_NAME = 'manifest.json'
+
+# Rendition name -> bounding box (width, height); images are never upscaled
+RENDITIONS = {
+    'thumb': (160, 160),
+    'preview': (480, 480),
+    'web_1x': (1280, 1280),
+    'web_2x': (2560, 2560),
+}
+
+# Source formats Pillow can save back for the same-format rendition
+SAVE_FORMATS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'GIF': 'gif',
+    'WEBP': 'webp',
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def media_path(url):
+    """Return the absolute MEDIA_ROOT path for an ``/uploads/...`` URL, or None."""
+    if not url or not url.startswith(UPLOADS_URL):
+        return None
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    path = os.path.realpath(os.path.join(media_root, url[len(UPLOADS_URL):]))
+    if not path.startswith(media_root + os.sep):
+        return None
+    return path
+
+
+def media_url(path):
+    """Inverse of ``media_path``."""
+    relative = os.path.relpath(path, settings.MEDIA_ROOT)
+    return UPLOADS_URL + relative.replace(os.sep, '/')
+
+
+def renditions_dir(path):
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, RENDITIONS_DIR, filename)
+
+
+def rendition_manifest(url):
+    """Load the rendition manifest for an uploaded image URL, or None if not built yet."""
+    path = media_path(url)
+    if not path:
+        return None
+    try:
+        with open(os.path.join(renditions_dir(path), MANIFEST_NAME)) as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return None
+
+
+def rendition_url(url, name, fmt=None):
+    """URL of a single rendition (``fmt`` defaults to the source format), or None."""
+    manifest = rendition_manifest(url)
+    if not manifest or name not in manifest['renditions']:
+        return None
+    filename = manifest['renditions'][name]['formats'].get(fmt or manifest['format'])
+    if not filename:
+        return None
+    return media_url(os.path.join(renditions_dir(media_path(url)), filename))
+
+
+@functools.lru_cache(maxsize=None)
+def avif_supported():
+    """Whether Pillow can write AVIF; checked once per process."""
+    from PIL import features
+    try:
+        if features.check('avif'):
+            return True
+    except ValueError:
+        pass
+    try:
+        # Older Pillow only writes AVIF once the plugin has registered itself on import
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def generate_renditions(source_path, output_dir, renditions=None, formats=('webp', 'avif'), quality=82):
+    """
+    Build every rendition of ``source_path`` into ``output_dir`` and write the manifest.
+
+    Runs inside worker processes, so it only uses its arguments and Pillow -
+    no Django settings or database access.
+    """
+    from PIL import Image, ImageOps
+
+    renditions = renditions or RENDITIONS
+    formats = [fmt for fmt in formats if fmt != 'avif' or avif_supported()]
+    os.makedirs(output_dir, exist_ok=True)
+
+    with Image.open(source_path) as original:
+        source_format = SAVE_FORMATS.get(original.format, 'png')
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if image.mode in ('LA', 'P', 'PA') else 'RGB')
+
+        manifest = {
+            'source': os.path.basename(source_path),
+            'format': source_format,
+            'width': image.width,
+            'height': image.height,
+            'renditions': {},
+        }
+        for name, box in renditions.items():
+            resized = image.copy()
+            resized.thumbnail(box, Image.LANCZOS)
+            entry = {'width': resized.width, 'height': resized.height, 'formats': {}}
+            for fmt in [source_format] + [f for f in formats if f != source_format]:
+                filename = f'{name}.{fmt}'
+                frame = resized.convert('RGB') if fmt == 'jpg' and resized.mode != 'RGB' else resized
+                frame.save(
+                    os.path.join(output_dir, filename),
+                    format={'jpg': 'JPEG'}.get(fmt, fmt.upper()),
+                    quality=quality,
+                    optimize=fmt in ('jpg', 'png'),
+                )
+                entry['formats'][fmt] = filename
+            manifest['renditions'][name] = entry
+
+    tmp_path = os.path.join(output_dir, MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w') as tmp:
+        json.dump(manifest, tmp)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+    return manifest
+
+
+def verify_image(path):
+    """
+    Decode ``path`` completely and return its (width, height).
+
+    Runs inside worker processes like generate_renditions; raises for files
+    Pillow cannot read and for truncated images.
+    """
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.load()
+        return image.size
+
+
+def ingest_image(source, incoming_dir=None):
+    """
+    Check that ``source`` is a complete image and copy it into ``incoming_dir``.
+
+    Returns (temp path, sha256, size) so the copy can be renamed into
+    content-addressed storage without being read again; the temp path is
+    None when ``incoming_dir`` is None (only checking).  Runs in worker
+    processes, for bulk imports.
+    """
+    import hashlib
+    import shutil
+    import tempfile
+
+    verify_image(source)
+    digest = hashlib.sha256()
+    size = 0
+    tmp = None
+    if incoming_dir:
+        fd, tmp_path = tempfile.mkstemp(dir=incoming_dir, suffix='.part')
+        tmp = os.fdopen(fd, 'wb')
+    try:
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(shutil.COPY_BUFSIZE), b''):
+                digest.update(chunk)
+                size += len(chunk)
+                if tmp:
+                    tmp.write(chunk)
+    except BaseException:
+        if tmp:
+            tmp.close()
+            os.unlink(tmp_path)
+        raise
+    if tmp:
+        tmp.close()
+        return tmp_path, digest.hexdigest(), size
+    return None, digest.hexdigest(), size
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: never fork a web worker that holds DB connections and threads
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_RENDITION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def _log_failure(future, url):
+    error = future.exception()
+    if error is not None:
+        logger.warning('Rendition generation failed for %s: %s', url, error)
+
+
+def schedule_renditions(url):
+    """
+    Queue rendition generation for an uploaded image URL and return immediately.
+    Returns the Future (the Job with JOBS_ENABLED), or None when renditions are
+    disabled or the URL is not local.
+    """
+    if not settings.IMAGE_RENDITIONS_ENABLED:
+        return None
+    path = media_path(url)
+    if not path:
+        return None
+    from .storage import BLOBS_DIR  # storage imports this module
+    manifest_path = os.path.join(renditions_dir(path), MANIFEST_NAME)
+    # A blob's content never changes (reuse only refreshes its mtime); other paths may be overwritten
+    content_addressed = url.startswith(f'{UPLOADS_URL}{BLOBS_DIR}/')
+    if os.path.exists(manifest_path) and (
+        content_addressed or os.path.getmtime(manifest_path) >= os.path.getmtime(path)
+    ):
+        return None  # deduplicated upload whose renditions are already built
+    if settings.JOBS_ENABLED:
+        from .jobs import enqueue  # jobs imports this module
+        return enqueue('renditions', url=url, priority=-1)
+    future = get_executor().submit(
+        generate_renditions, path, renditions_dir(path),
+        formats=settings.IMAGE_RENDITION_FORMATS,
+        quality=settings.IMAGE_RENDITION_QUALITY,
+    )
+    future.add_done_callback(lambda done: _log_failure(done, url))
+    return future
+
+
+def media_url_fields():
+    """Yield (model, field name) for every ``*_url`` column that can hold an upload."""
+    from django.apps import apps
+    for model in apps.get_app_config('sda_backend').get_models():
+        for field in model._meta.concrete_fields:
+            if field.name.endswith('_url') and field.name != 'linkedin_url':
+                yield model, field.name
+
+
+def uploaded_media_urls():
+    """Yield every distinct ``/uploads/...`` URL referenced from the database."""
+    seen = set()
+    for model, field_name in media_url_fields():
+        urls = (
+            model.objects.filter(**{f'{field_name}__startswith': UPLOADS_URL})
+            .values_list(field_name, flat=True)
+            .distinct()
+            .iterator()
+        )
+        for url in urls:
+            if url not in seen:
+                seen.add(url)
+                yield url
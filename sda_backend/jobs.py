@@ -0,0 +1,293 @@
+"""
+Background jobs stored in the database.
+
+Work that should not hold up an admin request (image renditions, exports,
+actions on thousands of rows) is queued as a ``Job`` row and run by
+``manage.py run_workers``, so no broker is needed.  Workers claim jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED``: any number of them can poll the
+table without waiting on each other or running a job twice.  A job queued
+inside a transaction only becomes visible to workers when it commits.
+
+A job is a function registered under a name; it gets the ``Job`` and the
+keyword arguments it was queued with (which must be JSON-serializable):
+
+    @register('contacts.update')
+    def update_contacts(job, pks, values):
+        ...
+        job.set_progress(done, total)
+
+    enqueue('contacts.update', pks=[1, 2, 3], values={'status': 'resolved'}, priority=5)
+
+Higher ``priority`` runs first.  A job that raises is retried after
+JOB_RETRY_DELAY_SECONDS, doubling with every attempt, until it has failed
+``max_attempts`` times.  While a job runs, its worker updates
+``heartbeat_at`` every third of JOB_TIMEOUT_SECONDS (as does
+``set_progress``); jobs without a heartbeat for JOB_TIMEOUT_SECONDS, i.e.
+whose worker died, are requeued.  Every write a run makes is conditional on
+the job still being that run (``Job.owned``), so a run that was requeued
+from under its worker cannot overwrite the next run's outcome.
+"""
+import datetime
+import logging
+import os
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import Avg, Count, F
+from django.utils import timezone
+
+from .exports import CONTACT_EXPORT_FIELDS, EXPORT_CHUNK_SIZE, export_chunks
+from .images import generate_renditions, media_path, renditions_dir
+from .models import ContactMessage, Job
+
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+FINISHED = (Job.DONE, Job.FAILED, Job.CANCELLED)
+UPDATE_BATCH_SIZE = 1000
+
+
+def register(name):
+    """Decorator registering a job function under ``name``."""
+    def decorator(func):
+        REGISTRY[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, *, priority=0, delay=0, max_attempts=3, user=None, **kwargs):
+    """Queue ``name`` to run with ``kwargs``; returns the Job."""
+    if name not in REGISTRY:
+        raise KeyError(f'No job registered as {name!r}')
+    return Job.objects.create(
+        name=name, kwargs=kwargs, priority=priority, max_attempts=max_attempts,
+        run_at=timezone.now() + datetime.timedelta(seconds=delay),
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def claim(worker):
+    """Mark the next due job as running by ``worker`` and return it, or None."""
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by('-priority', 'run_at', 'id')
+            .select_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            return None
+        # Without row locks (SQLite) this conditional update decides which worker gets it
+        claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, attempts=F('attempts') + 1, worker=worker,
+            started_at=now, heartbeat_at=now, finished_at=None,
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+class Heartbeat(threading.Thread):
+    """Keeps ``heartbeat_at`` of a running job fresh, for jobs that do not report progress."""
+
+    def __init__(self, job):
+        super().__init__(name=f'heartbeat-{job.pk}', daemon=True)
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        interval = max(1, settings.JOB_TIMEOUT_SECONDS / 3)
+        try:
+            while not self.stopped.wait(interval):
+                try:
+                    if not self.job.owned().update(heartbeat_at=timezone.now()):
+                        return  # requeued: this run is no longer the job's
+                except DatabaseError as e:
+                    logger.warning('Heartbeat of %s failed: %s', self.job, e)
+        finally:
+            connection.close()  # this thread's connection
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run(job):
+    """Run a claimed job and record the outcome; returns whether it succeeded."""
+    func = REGISTRY.get(job.name)
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        if func is None:
+            raise LookupError(f'No job registered as {job.name!r}')
+        result = func(job, **job.kwargs)
+    except Job.Lost as e:
+        logger.warning('Job %s abandoned: %s', job, e)
+        return False
+    except Exception as e:
+        logger.warning('Job %s failed (attempt %s of %s): %s', job, job.attempts, job.max_attempts, e)
+        fail(job, e, retry=func is not None)
+        return False
+    finally:
+        heartbeat.stop()
+    now = timezone.now()
+    if not job.owned().update(status=Job.DONE, result=result, finished_at=now, heartbeat_at=now, last_error=None):
+        logger.warning('Job %s finished after it was requeued; result dropped', job)
+        return False
+    return True
+
+
+def fail(job, error, retry=True):
+    """Queue a failed job again with exponential backoff, or give up after ``max_attempts``."""
+    now = timezone.now()
+    details = ''.join(traceback.format_exception(error))[-4000:]
+    if retry and job.attempts < job.max_attempts:
+        delay = min(settings.JOB_MAX_RETRY_DELAY_SECONDS, settings.JOB_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1))
+        updated = job.owned().update(
+            status=Job.QUEUED, run_at=now + datetime.timedelta(seconds=delay), last_error=details,
+        )
+    else:
+        updated = job.owned().update(status=Job.FAILED, finished_at=now, last_error=details)
+    if not updated:
+        logger.warning('Job %s failed after it was requeued; outcome dropped', job)
+
+
+def work(worker, stop, poll=1.0, burst=False, log=None):
+    """
+    Claim and run jobs until ``stop`` (a threading or multiprocessing Event)
+    is set, or, with ``burst``, until nothing is due.  Returns the number run.
+    """
+    count = 0
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                job = claim(worker)
+            except DatabaseError as e:
+                # e.g. a dropped connection: reconnect on the next round
+                logger.warning('%s could not claim a job: %s', worker, e)
+                connection.close()
+                stop.wait(poll)
+                continue
+            if job is None:
+                if burst:
+                    break
+                stop.wait(poll)
+                continue
+            started = time.monotonic()
+            ok = run(job)
+            count += 1
+            if log:
+                log(f'{worker}: {job} {"done" if ok else "failed"} in {time.monotonic() - started:.1f}s')
+    finally:
+        connection.close()  # this thread's connection
+    return count
+
+
+def requeue_stale():
+    """Give jobs whose worker died (no heartbeat for JOB_TIMEOUT_SECONDS) back to the queue."""
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING, heartbeat_at__lt=now - datetime.timedelta(seconds=settings.JOB_TIMEOUT_SECONDS),
+    )
+    error = 'Worker stopped responding'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(status=Job.FAILED, finished_at=now, last_error=error)
+    requeued = stale.update(status=Job.QUEUED, run_at=now, last_error=error)
+    return requeued + failed
+
+
+def purge_finished():
+    """Delete finished jobs, and the files they wrote, after JOB_RETENTION_DAYS."""
+    old = Job.objects.filter(
+        status__in=FINISHED, finished_at__lt=timezone.now() - datetime.timedelta(days=settings.JOB_RETENTION_DAYS),
+    )
+    for job in old.filter(result__isnull=False).only('result'):
+        path = job_file(job)
+        if path and os.path.exists(path):
+            os.remove(path)
+    deleted, _ = old.delete()
+    return deleted
+
+
+def queue_stats(window=3600):
+    """Queue depth and throughput over the last ``window`` seconds, for the job admin."""
+    now = timezone.now()
+    counts = dict(Job.objects.order_by().values_list('status').annotate(Count('id')))
+    finished = Job.objects.filter(status=Job.DONE, finished_at__gte=now - datetime.timedelta(seconds=window))
+    recent = finished.aggregate(count=Count('id'), duration=Avg(F('finished_at') - F('started_at')))
+    return {
+        'queued': counts.get(Job.QUEUED, 0),
+        'due': Job.objects.filter(status=Job.QUEUED, run_at__lte=now).count(),
+        'running': counts.get(Job.RUNNING, 0),
+        'failed': counts.get(Job.FAILED, 0),
+        'done_recently': recent['count'],
+        'per_minute': recent['count'] * 60 / window,
+        'average_seconds': recent['duration'].total_seconds() if recent['duration'] else None,
+    }
+
+
+def job_file(job):
+    """Absolute path of the file a job wrote (``result['file']``), or None."""
+    name = job.result.get('file') if isinstance(job.result, dict) else None
+    if not name:
+        return None
+    return os.path.join(settings.JOB_FILES_DIR, os.path.basename(name))
+
+
+# ==================== Jobs ====================
+
+@register('renditions')
+def build_renditions(job, url):
+    path = media_path(url)
+    if not path or not os.path.exists(path):
+        return None  # replaced or removed since the upload
+    generate_renditions(
+        path, renditions_dir(path),
+        formats=settings.IMAGE_RENDITION_FORMATS, quality=settings.IMAGE_RENDITION_QUALITY,
+    )
+    return {'url': url}
+
+
+CONTACT_UPDATE_FIELDS = ('status', 'is_read')
+
+
+@register('contacts.update')
+def update_contacts(job, pks, values):
+    """Set ``values`` on the contact messages ``pks``, UPDATE_BATCH_SIZE rows per statement."""
+    if set(values) - set(CONTACT_UPDATE_FIELDS):
+        raise ValueError(f'Only {", ".join(CONTACT_UPDATE_FIELDS)} can be updated')
+    updated = 0
+    for start in range(0, len(pks), UPDATE_BATCH_SIZE):
+        updated += ContactMessage.objects.filter(pk__in=pks[start:start + UPDATE_BATCH_SIZE]).update(**values)
+        job.set_progress(min(start + UPDATE_BATCH_SIZE, len(pks)), len(pks))
+    return {'updated': updated}
+
+
+@register('contacts.export')
+def export_contacts(job, pks, fmt):
+    """Write the contact messages ``pks`` to a file under JOB_FILES_DIR."""
+    os.makedirs(settings.JOB_FILES_DIR, exist_ok=True)
+    name = f'contact-messages-{job.pk}-{timezone.localtime():%Y%m%d-%H%M}.{fmt}'
+    path = os.path.join(settings.JOB_FILES_DIR, name)
+    queryset = ContactMessage.objects.filter(pk__in=pks)
+    job.set_progress(0, len(pks), 'Writing rows')
+    try:
+        with open(path + '.part', 'wb') as out:
+            # csv/jsonl chunks are single rows; xlsx is written out at the end
+            for written, chunk in enumerate(export_chunks(queryset, CONTACT_EXPORT_FIELDS, fmt), 1):
+                out.write(chunk.encode() if isinstance(chunk, str) else chunk)
+                if written % EXPORT_CHUNK_SIZE == 0:
+                    job.set_progress(min(written, len(pks)))
+        # Raises Job.Lost (and the part file is removed) if this run was requeued meanwhile
+        job.set_progress(len(pks), message='')
+        os.replace(path + '.part', path)
+    finally:
+        if os.path.exists(path + '.part'):
+            os.remove(path + '.part')
+    return {'file': name, 'rows': len(pks)}
@@ -0,0 +1,113 @@
+"""
+Summarise the per-request log written by QueryInstrumentationMiddleware.
+
+For every admin view it prints the number of requests, p50/p95/p99 latency,
+SQL time and query counts, and optionally the query fingerprints that ran
+more than once per request most often (likely N+1 patterns).
+
+Usage:
+    python manage.py admin_profile
+    python manage.py admin_profile --since 24h --view changelist
+    python manage.py admin_profile logs/admin_profile.jsonl.1 --duplicates
+"""
+import json
+import math
+import re
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+SINCE_RE = re.compile(r'^(\d+)([mhd])$')
+SINCE_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = 'Report p50/p95/p99 latency and query counts per admin view from the profiling log'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Log files (default: ADMIN_PROFILE_LOG)')
+        parser.add_argument('--since', help='Only requests from the last N minutes/hours/days, e.g. 30m, 24h, 7d')
+        parser.add_argument('--view', help='Only views whose name contains this text')
+        parser.add_argument('--sort', choices=['p50', 'p95', 'p99', 'requests', 'queries'], default='p95')
+        parser.add_argument('--duplicates', action='store_true', help='Show the most repeated query per view')
+
+    def handle(self, *args, **options):
+        cutoff = self.parse_since(options['since'])
+        by_view = defaultdict(list)
+        duplicates = defaultdict(Counter)
+        samples = {}
+
+        for path in options['paths'] or [settings.ADMIN_PROFILE_LOG]:
+            try:
+                log = open(path)
+            except OSError as error:
+                raise CommandError(f'Cannot read {path}: {error}')
+            with log:
+                for line in log:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if cutoff and entry.get('ts', 0) < cutoff:
+                        continue
+                    if options['view'] and options['view'] not in entry['view']:
+                        continue
+                    by_view[entry['view']].append(entry)
+                    for duplicate in entry.get('duplicates', ()):
+                        duplicates[entry['view']][duplicate['fingerprint']] += 1
+                        samples[duplicate['fingerprint']] = (duplicate['count'], duplicate['sql'])
+
+        if not by_view:
+            self.stdout.write('No requests recorded.')
+            return
+
+        rows = []
+        for view, entries in by_view.items():
+            latencies = sorted(entry['ms'] for entry in entries)
+            sql_times = sorted(entry['sql_ms'] for entry in entries)
+            queries = sorted(entry['queries'] for entry in entries)
+            rows.append({
+                'view': view,
+                'requests': len(entries),
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'sql_p95': percentile(sql_times, 95),
+                'queries': sum(queries) / len(queries),
+                'queries_max': queries[-1],
+            })
+        rows.sort(key=lambda row: row[options['sort']], reverse=True)
+
+        width = max(len(row['view']) for row in rows)
+        self.stdout.write(
+            f"{'view':<{width}} {'reqs':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'sql p95':>8} {'queries':>8} {'max q':>6}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['view']:<{width}} {row['requests']:>6} {row['p50']:>8.1f} {row['p95']:>8.1f} "
+                f"{row['p99']:>8.1f} {row['sql_p95']:>8.1f} {row['queries']:>8.1f} {row['queries_max']:>6}"
+            )
+            if options['duplicates'] and duplicates[row['view']]:
+                fingerprint, requests = duplicates[row['view']].most_common(1)[0]
+                count, sql = samples[fingerprint]
+                self.stdout.write(f'    repeated in {requests} request(s), e.g. {count}x: {sql}')
+
+    def parse_since(self, since):
+        if not since:
+            return None
+        match = SINCE_RE.match(since)
+        if not match:
+            raise CommandError('--since must look like 30m, 24h or 7d')
+        return time.time() - int(match.group(1)) * SINCE_UNITS[match.group(2)]
@@ -0,0 +1,163 @@
+"""
+Benchmark every registered ModelAdmin against a synthetic dataset.
+
+Creates a throwaway test database (PostgreSQL, or SQLite with
+DB_ENGINE=sqlite), builds the tables of the unmanaged models in it, loads a
+generated dataset and measures query count, wall time and peak memory of the
+changelist, search, change form and bulk action of each admin.  Results are
+compared with ``sda_backend/benchmarks/budgets.json``.  Query counts are the
+hard gate: the command fails when a page runs more queries than its budget
+or than ``--max-queries``, which also refuses to record such a budget.  Peak
+memory fails above the budget times ``--tolerance``, and a database/dataset
+or page without a recorded budget fails too.  Wall time is noisy on
+shared machines, so a slow page is only reported unless ``--strict-timing``.
+
+Usage:
+    python manage.py bench_admin
+    python manage.py bench_admin --dataset large --models Project ContactMessage
+    python manage.py bench_admin --rows ContactMessage=200000 --update-budgets
+    python manage.py bench_admin --repeat 9 --strict-timing
+"""
+import json
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from sda_backend.benchmarks import scenarios
+from sda_backend.benchmarks.dataset import DATASETS, DatasetBuilder
+from sda_backend.cache import discard_stats
+
+
+DEFAULT_BUDGETS = os.path.join(os.path.dirname(scenarios.__file__), 'budgets.json')
+
+# Absolute ceiling per page: a count growing with the rows on the page (an N+1)
+# is a bug, not a budget to record
+DEFAULT_MAX_QUERIES = 50
+
+
+def parse_rows(values):
+    rows = {}
+    for value in values or ():
+        model, sep, count = value.partition('=')
+        if not sep or not count.isdigit():
+            raise CommandError(f'--rows expects Model=count, got {value!r}')
+        rows[model] = int(count)
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Measure admin pages against a synthetic dataset and fail when a budget regresses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=sorted(DATASETS), default='small')
+        parser.add_argument('--rows', nargs='+', metavar='MODEL=COUNT', help='Override row counts of the dataset')
+        parser.add_argument('--models', nargs='+', help='Only benchmark these models (class names)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per scenario (median is reported)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--budgets', default=DEFAULT_BUDGETS, help='Budget file (default: %(default)s)')
+        parser.add_argument('--update-budgets', action='store_true', help='Write the measured results as the new budgets')
+        parser.add_argument(
+            '--tolerance', type=float, default=1.5,
+            help='Allowed factor over the time and memory budgets (query counts must not grow at all)',
+        )
+        parser.add_argument(
+            '--max-queries', type=int, default=DEFAULT_MAX_QUERIES,
+            help='Fail (and refuse --update-budgets) when any page runs more queries (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--strict-timing', action='store_true',
+            help='Fail on pages slower than their time budget instead of only reporting them',
+        )
+        parser.add_argument(
+            '--slack-ms', type=float, default=25,
+            help='Absolute allowance on top of the time budget, so millisecond pages do not fail on noise',
+        )
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database and its data between runs')
+
+    def handle(self, *args, **options):
+        overrides = parse_rows(options['rows'])
+        budget_key = f"{connection.vendor}:{options['dataset']}"
+        verbosity = options['verbosity']
+
+        with scenarios.benchmark_database(keepdb=options['keepdb'], verbosity=verbosity) as created:
+            if created:
+                self.stdout.write(f"Loading the '{options['dataset']}' dataset...")
+                started = time.monotonic()
+                DatasetBuilder(options['dataset'], overrides, options['seed'], stdout=self.stdout).build()
+                self.stdout.write(f'Loaded in {time.monotonic() - started:.1f}s')
+            else:
+                self.stdout.write('Reusing the dataset of the kept test database')
+
+            self.stdout.write(f'Measuring ({budget_key}, median of {options["repeat"]})...')
+            # Benchmark requests must not show up in the workers' `cache_stats`
+            with tempfile.TemporaryDirectory() as stats_dir, override_settings(CACHE_STATS_DIR=stats_dir):
+                try:
+                    results = scenarios.run(options['models'], options['repeat'], stdout=self.stdout)
+                finally:
+                    discard_stats()
+
+        budgets = self.read_budgets(options['budgets'])
+        too_many = [
+            f"{key}: {result['queries']} queries (ceiling {options['max_queries']})"
+            for key, result in results.items() if result['queries'] > options['max_queries']
+        ]
+        if too_many:
+            for failure in too_many:
+                self.stderr.write(failure)
+            raise CommandError(f'{len(too_many)} page(s) over --max-queries; fix the N+1 before recording budgets')
+
+        if options['update_budgets']:
+            budgets.setdefault(budget_key, {}).update(results)
+            with open(options['budgets'], 'w') as budget_file:
+                json.dump(budgets, budget_file, indent=2, sort_keys=True)
+                budget_file.write('\n')
+            self.stdout.write(self.style.SUCCESS(f'Updated {budget_key} budgets in {options["budgets"]}'))
+            return
+
+        if budget_key not in budgets:
+            raise CommandError(
+                f'No budgets recorded for {budget_key} in {options["budgets"]}; '
+                f'record them on the benchmark host with --update-budgets'
+            )
+        failures, slow = self.check_budgets(
+            budgets[budget_key], results, options['tolerance'], options['slack_ms'],
+        )
+        if options['strict_timing']:
+            failures += slow
+        else:
+            for warning in slow:
+                self.stdout.write(self.style.WARNING(f'{warning} (timing is advisory, see --strict-timing)'))
+        if failures:
+            for failure in failures:
+                self.stderr.write(failure)
+            raise CommandError(f'{len(failures)} budget(s) regressed')
+        self.stdout.write(self.style.SUCCESS(f'All {len(results)} scenarios within budget'))
+
+    def read_budgets(self, path):
+        try:
+            with open(path) as budget_file:
+                return json.load(budget_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Cannot read budgets from {path}: {error}')
+
+    def check_budgets(self, budgets, results, tolerance, slack_ms):
+        failures, slow = [], []
+        for key, result in results.items():
+            budget = budgets.get(key)
+            if budget is None:
+                # An unrecorded page would otherwise pass whatever it costs
+                failures.append(f'{key}: no budget recorded (run with --update-budgets)')
+                continue
+            if result['queries'] > budget['queries']:
+                failures.append(f"{key}: {result['queries']} queries (budget {budget['queries']})")
+            if result['ms'] > budget['ms'] * tolerance + slack_ms:
+                slow.append(f"{key}: {result['ms']} ms (budget {budget['ms']} x {tolerance} + {slack_ms})")
+            if result['peak_kb'] > budget['peak_kb'] * tolerance:
+                failures.append(f"{key}: {result['peak_kb']} KiB peak (budget {budget['peak_kb']} x {tolerance})")
+        return failures, slow
@@ -0,0 +1,97 @@
+"""
+Measure per-request database latency with and without persistent connections.
+
+Each simulated request goes through the same lifecycle as a real one:
+``request_started`` (stale connections are closed), the query, then
+``request_finished`` (the connection is closed unless CONN_MAX_AGE keeps
+it).  The time of the first query therefore includes opening a new
+connection whenever one is needed - TCP, TLS and authentication against
+the shared PostgreSQL server - which is what persistent connections save.
+
+Usage:
+    python manage.py bench_db_connections
+    python manage.py bench_db_connections --requests 500 --sql "SELECT count(*) FROM contact_messages"
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request DB latency for new vs. persistent connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--requests', type=int, default=200, help='Simulated requests per mode (default: 200)')
+        parser.add_argument('--sql', default='SELECT 1', help='Query run once per request (default: SELECT 1)')
+        parser.add_argument(
+            '--max-age', type=int, default=None,
+            help='CONN_MAX_AGE for the persistent run (default: the configured value, or 60 if it is 0)',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        configured = connection.settings_dict['CONN_MAX_AGE']
+        max_age = options['max_age'] or configured or 60
+        self.stdout.write(
+            f"{connection.vendor} {connection.settings_dict.get('HOST') or 'local'}, "
+            f"configured CONN_MAX_AGE={configured}, {options['requests']} request(s) per mode"
+        )
+
+        try:
+            results = [
+                ('per_request', self.run(connection, 0, options)),
+                ('persistent', self.run(connection, max_age, options)),
+            ]
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = configured
+
+        self.stdout.write(f"{'mode':<12} {'connects':>8} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for mode, (timings, connects) in results:
+            p50, p95 = self.percentiles(timings)
+            self.stdout.write(
+                f'{mode:<12} {connects:>8} {statistics.mean(timings):>8.2f} '
+                f'{p50:>8.2f} {p95:>8.2f} {max(timings):>8.2f}'
+            )
+        baseline = statistics.mean(results[0][1][0])
+        persistent = statistics.mean(results[1][1][0])
+        self.stdout.write(self.style.SUCCESS(
+            f'Persistent connections save {baseline - persistent:.2f} ms per request '
+            f'({baseline / persistent:.1f}x faster)'
+        ))
+
+    def run(self, connection, max_age, options):
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        connects = 0
+
+        def count_connect(sender, connection=None, **kwargs):
+            nonlocal connects
+            if connection.alias == options['database']:
+                connects += 1
+
+        connection_created.connect(count_connect)
+        timings = []
+        try:
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    cursor.execute(options['sql'])
+                    cursor.fetchall()
+                request_finished.send(sender=self.__class__)
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection_created.disconnect(count_connect)
+        return timings, connects
+
+    def percentiles(self, timings):
+        if len(timings) < 2:
+            return timings[0], timings[0]
+        cuts = statistics.quantiles(timings, n=100)
+        return cuts[49], cuts[94]
@@ -0,0 +1,63 @@
+"""
+Report cache hit/miss rates per key namespace, summed over all worker processes.
+
+Usage:
+    python manage.py cache_stats
+    python manage.py cache_stats --reset
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from sda_backend.cache import read_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Show cache hit/miss rates collected by the admin cache backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters of every process')
+
+    def handle(self, *args, **options):
+        backend = settings.CACHES['default']['BACKEND']
+        self.stdout.write(f'Backend: {backend} ({settings.CACHES["default"].get("LOCATION", "")})')
+
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS('Cache statistics reset'))
+            return
+
+        stats = read_stats()
+        if not stats:
+            self.stdout.write('No statistics recorded yet (workers flush them every few seconds).')
+        else:
+            self.stdout.write(f"{'namespace':<24} {'hits':>10} {'misses':>10} {'hit rate':>9}")
+            hits = misses = 0
+            for namespace, counts in sorted(stats.items()):
+                hits += counts['hits']
+                misses += counts['misses']
+                self.stdout.write(
+                    f"{namespace:<24} {counts['hits']:>10} {counts['misses']:>10} "
+                    f"{self.rate(counts['hits'], counts['misses']):>9}"
+                )
+            self.stdout.write(f"{'total':<24} {hits:>10} {misses:>10} {self.rate(hits, misses):>9}")
+
+        server = self.server_stats()
+        if server:
+            self.stdout.write(
+                f"Redis server: {server['keyspace_hits']} hits, {server['keyspace_misses']} misses "
+                f"({self.rate(server['keyspace_hits'], server['keyspace_misses'])}), "
+                f"{server.get('used_memory_human', '?')} used"
+            )
+
+    def rate(self, hits, misses):
+        total = hits + misses
+        return f'{hits / total:.1%}' if total else '-'
+
+    def server_stats(self):
+        """Server-wide counters when the default cache is Redis (includes other clients)."""
+        client = getattr(cache, '_cache', None)
+        if not hasattr(client, 'get_client'):
+            return None
+        info = client.get_client(write=False).info()
+        return {key: info[key] for key in ('keyspace_hits', 'keyspace_misses', 'used_memory_human') if key in info}
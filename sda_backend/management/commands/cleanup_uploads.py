@@ -0,0 +1,47 @@
+"""
+Remove abandoned resumable upload sessions.
+
+A session that has not received a chunk for UPLOAD_SESSION_MAX_AGE seconds
+(default 24 hours) was given up on: its partial data and record are deleted.
+The records of finished sessions, whose data was renamed into place when the
+form was saved, are removed after the same delay.
+
+Usage:
+    python manage.py cleanup_uploads
+    python manage.py cleanup_uploads --max-age-hours 6 --dry-run
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sda_backend.resumable import expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Delete resumable upload sessions nobody has written to recently'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-hours', type=float, default=settings.UPLOAD_SESSION_MAX_AGE / 3600,
+            help='Sessions idle for longer than this are removed (default: %(default)s)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only list the sessions that would be removed')
+
+    def handle(self, *args, **options):
+        sessions = freed = 0
+        for upload_id, paths in expired_sessions(options['max_age_hours'] * 3600):
+            sessions += 1
+            for path in paths:
+                try:
+                    freed += os.path.getsize(path)
+                    if not options['dry_run']:
+                        os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            self.stdout.write(f'  {upload_id}')
+
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {sessions} session(s), {freed / 1024 / 1024:.1f} MB'
+        ))
@@ -0,0 +1,43 @@
+"""
+Renumber the ``order`` column of every ordered table (see
+sda_backend/ordering.py) as 1..n within each scope, e.g. the benefits of
+one service: gaps are closed and ties are broken by id, keeping the current
+order.  Each table is rewritten with one statement and only the rows whose
+position changed are written; all tables are done in one transaction.
+
+Usage:
+    python manage.py compact_order
+    python manage.py compact_order --dry-run
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from sda_backend.ordering import ORDER_SCOPES, compact
+from sda_backend.schema import supported
+
+
+class Command(BaseCommand):
+    help = 'Close gaps and duplicates in the order columns of all ordered tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report the rows that would change, then roll back')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        total = 0
+        with transaction.atomic():
+            for model in ORDER_SCOPES:
+                table = model._meta.db_table
+                if not supported(model):
+                    self.stdout.write(f'  {table}: skipped, not available on {connection.vendor}')
+                    continue
+                changed = len(compact(model))
+                total += changed
+                self.stdout.write(f'  {table}: {changed} rows renumbered')
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        verb = 'Would renumber' if options['dry_run'] else 'Renumbered'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} rows in {time.monotonic() - started:.1f}s'))
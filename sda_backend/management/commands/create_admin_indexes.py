@@ -0,0 +1,101 @@
+"""
+Create the PostgreSQL indexes the admin relies on.
+
+The tables belong to the FastAPI backend (all models are managed=False), so
+this command only adds indexes - it never alters tables or columns: the
+full-text and trigram indexes used by admin search and the ordering
+indexes behind keyset-paginated changelists.  Every
+statement uses IF NOT EXISTS and can be re-run safely.
+
+Usage:
+    python manage.py create_admin_indexes
+    python manage.py create_admin_indexes --dry-run
+    python manage.py create_admin_indexes --drop
+"""
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from sda_backend.pagination import KeysetPaginationMixin
+from sda_backend.search import (
+    FullTextSearchMixin, index_name, quote_name, trigram_sql, tsvector_sql,
+)
+
+
+def search_indexes():
+    """Yield (name, table, create_sql) for every full-text and trigram index."""
+    for model, model_admin in admin.site._registry.items():
+        if not isinstance(model_admin, FullTextSearchMixin):
+            continue
+        table = model._meta.db_table
+        for config, columns in model_admin.get_fulltext_search_columns(None).items():
+            name = index_name('fts', table, config)
+            yield name, table, 'CREATE INDEX {concurrently}IF NOT EXISTS %s ON %s USING gin ((%s))' % (
+                quote_name(name), quote_name(table), tsvector_sql(columns, config),
+            )
+        for field_name in model_admin.trigram_search_fields:
+            column = model._meta.get_field(field_name).column
+            name = index_name('trgm', table, column)
+            yield name, table, 'CREATE INDEX {concurrently}IF NOT EXISTS %s ON %s USING gin (%s gin_trgm_ops)' % (
+                quote_name(name), quote_name(table), trigram_sql(column),
+            )
+
+
+def keyset_indexes():
+    """Yield (name, table, create_sql) for the ordering index of every keyset-paginated changelist."""
+    for model, model_admin in admin.site._registry.items():
+        if not isinstance(model_admin, KeysetPaginationMixin):
+            continue
+        table = model._meta.db_table
+        columns = []
+        for name in model_admin.keyset_ordering:
+            field_name = name.lstrip('-')
+            field = model._meta.pk if field_name == 'pk' else model._meta.get_field(field_name)
+            columns.append((field.column, 'DESC' if name.startswith('-') else 'ASC'))
+        name = index_name('keyset', table, '_'.join(column for column, _ in columns))
+        yield name, table, 'CREATE INDEX {concurrently}IF NOT EXISTS %s ON %s (%s)' % (
+            quote_name(name), quote_name(table),
+            ', '.join('%s %s' % (quote_name(column), direction) for column, direction in columns),
+        )
+
+
+class Command(BaseCommand):
+    help = 'Create the search and pagination indexes the admin relies on in the shared database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--dry-run', action='store_true', help='Print the SQL without running it')
+        parser.add_argument('--drop', action='store_true', help='Drop the admin indexes instead of creating them')
+        parser.add_argument(
+            '--no-concurrently', action='store_true',
+            help='Build indexes with a table lock (faster, blocks writes while building)',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError('Admin indexes are only supported on PostgreSQL.')
+
+        concurrently = '' if options['no_concurrently'] else 'CONCURRENTLY '
+        statements = ['CREATE EXTENSION IF NOT EXISTS pg_trgm']
+        for name, table, create_sql in self.get_indexes():
+            if options['drop']:
+                statements.append('DROP INDEX %sIF EXISTS %s' % (concurrently, quote_name(name)))
+            else:
+                statements.append(create_sql.format(concurrently=concurrently))
+        if options['drop']:
+            statements.pop(0)
+
+        for sql in statements:
+            self.stdout.write(sql + ';')
+            if options['dry_run']:
+                continue
+            # CONCURRENTLY cannot run inside a transaction block; Django cursors autocommit
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Applied {len(statements)} statement(s)'))
+
+    def get_indexes(self):
+        return list(search_indexes()) + list(keyset_indexes())
@@ -0,0 +1,36 @@
+"""
+Write all site content (every FastAPI-owned table plus the uploaded media
+it references) to a snapshot archive; see sda_backend/snapshots.py.
+
+Usage:
+    python manage.py dump_content content.tar.gz
+    python manage.py dump_content content.tar --format msgpack --no-media
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sda_backend.snapshots import FORMATS, SnapshotError, dump
+
+
+class Command(BaseCommand):
+    help = 'Export all content tables and media to a snapshot archive for load_content'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archive to write (.tar.gz/.tgz is gzip-compressed)')
+        parser.add_argument('--format', choices=FORMATS, default='jsonl', help='Row encoding (default: %(default)s)')
+        parser.add_argument('--no-media', action='store_true', help='Leave out the uploaded files')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            counts = dump(options['path'], options['format'], not options['no_media'], stdout=self.stdout)
+        except SnapshotError as e:
+            raise CommandError(e)
+        media = counts.pop('media', 0)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {sum(counts.values())} rows from {len(counts)} tables and {media} media files '
+            f'to {options["path"]} ({os.path.getsize(options["path"]) / 1024 / 1024:.1f} MB) in {elapsed:.1f}s'
+        ))
@@ -0,0 +1,79 @@
+"""
+Export contact messages as CSV, XLSX or JSON Lines.
+
+Rows are streamed in chunks in id order, so memory use does not grow with
+the inbox.
+
+Usage:
+    python manage.py export_contacts --format csv --output contacts.csv
+    python manage.py export_contacts --format jsonl --status new --is-read false
+    python manage.py export_contacts --format xlsx --since 2024-01-01 --output leads.xlsx
+"""
+import datetime
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from sda_backend.exports import CONTACT_EXPORT_FIELDS, EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_chunks
+from sda_backend.models import ContactMessage
+
+
+def parse_bound(value):
+    """Parse a date or datetime option into an aware datetime (dates mean midnight local time)."""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None and parse_date(value):
+            parsed = datetime.datetime.combine(parse_date(value), datetime.time.min)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise CommandError(f'Invalid date: {value}')
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+class Command(BaseCommand):
+    help = 'Stream contact messages to CSV, XLSX or JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', default='-', help='Output file (default: stdout, not available for xlsx)')
+        parser.add_argument('--status', help='Only messages with this status (new, in_progress, resolved)')
+        parser.add_argument('--is-read', choices=['true', 'false'])
+        parser.add_argument('--property-type')
+        parser.add_argument('--since', help='Created on or after this date/datetime')
+        parser.add_argument('--until', help='Created before this date/datetime')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = ContactMessage.objects.all()
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+        if options['is_read']:
+            queryset = queryset.filter(is_read=options['is_read'] == 'true')
+        if options['property_type']:
+            queryset = queryset.filter(property_type=options['property_type'])
+        if options['since']:
+            queryset = queryset.filter(created_at__gte=parse_bound(options['since']))
+        if options['until']:
+            queryset = queryset.filter(created_at__lt=parse_bound(options['until']))
+
+        fmt = options['format']
+        binary = fmt == 'xlsx'
+        if options['output'] == '-':
+            if binary:
+                raise CommandError('XLSX output needs --output <file>.')
+            stream = sys.stdout
+        else:
+            stream = open(options['output'], 'wb' if binary else 'w', **({} if binary else {'encoding': 'utf-8', 'newline': ''}))
+
+        try:
+            for chunk in export_chunks(queryset, CONTACT_EXPORT_FIELDS, fmt, options['chunk_size']):
+                stream.write(chunk)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        if stream is not sys.stdout:
+            self.stdout.write(self.style.SUCCESS(f"Exported to {options['output']}"))
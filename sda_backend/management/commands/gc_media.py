@@ -0,0 +1,92 @@
+"""
+Reference-count content-addressed blobs and remove the orphaned ones.
+
+Every ``*_url`` column of the sda_backend models is scanned for
+``/uploads/blobs/...`` references.  Blobs nobody points at (and that are
+older than the grace period, so uploads whose form is still being saved
+are kept) are reported, and deleted with ``--delete`` together with
+their renditions.
+
+Usage:
+    python manage.py gc_media
+    python manage.py gc_media --delete --min-age-hours 48
+"""
+import os
+import shutil
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from sda_backend.images import RENDITIONS_DIR, UPLOADS_URL, media_url_fields, renditions_dir
+from sda_backend.storage import BLOBS_DIR, INCOMING_DIR
+
+
+class Command(BaseCommand):
+    help = 'Find (and optionally delete) uploaded blobs no longer referenced by any *_url column'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help='Delete orphaned blobs instead of only listing them')
+        parser.add_argument(
+            '--min-age-hours', type=float, default=24,
+            help='Never touch blobs or temp files younger than this (default: 24)',
+        )
+
+    def handle(self, *args, **options):
+        refcounts = self.count_references()
+        cutoff = time.time() - options['min_age_hours'] * 3600
+        blobs_root = os.path.join(settings.MEDIA_ROOT, BLOBS_DIR)
+
+        blobs = orphans = orphan_bytes = 0
+        for root, dirs, files in os.walk(blobs_root):
+            dirs[:] = [d for d in dirs if d != RENDITIONS_DIR]
+            for filename in files:
+                path = os.path.join(root, filename)
+                blobs += 1
+                url = UPLOADS_URL + os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+                if refcounts[url] or os.path.getmtime(path) > cutoff:
+                    continue
+                orphans += 1
+                orphan_bytes += os.path.getsize(path)
+                self.stdout.write(f'  orphan: {url}')
+                if options['delete']:
+                    os.unlink(path)
+                    shutil.rmtree(renditions_dir(path), ignore_errors=True)
+
+        stale_parts = self.clean_incoming(cutoff, options['delete'])
+
+        references = sum(count for url, count in refcounts.items() if url.startswith(f'{UPLOADS_URL}{BLOBS_DIR}/'))
+        self.stdout.write(f'Blobs: {blobs}, references: {references}')
+        self.stdout.write(f'Stale temp files: {stale_parts}')
+        verb = 'Deleted' if options['delete'] else 'Found'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {orphans} orphaned blob(s), {orphan_bytes / 1024 / 1024:.1f} MB'
+        ))
+
+    def count_references(self):
+        """URL -> number of rows pointing at it, across every *_url column."""
+        refcounts = Counter()
+        for model, field_name in media_url_fields():
+            rows = (
+                model.objects.filter(**{f'{field_name}__startswith': UPLOADS_URL})
+                .values(field_name)
+                .annotate(refs=Count('pk'))
+                .order_by()
+            )
+            for row in rows.iterator():
+                refcounts[row[field_name]] += row['refs']
+        return refcounts
+
+    def clean_incoming(self, cutoff, delete):
+        incoming = os.path.join(settings.MEDIA_ROOT, INCOMING_DIR)
+        stale = 0
+        if not os.path.isdir(incoming):
+            return stale
+        for entry in os.scandir(incoming):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                stale += 1
+                if delete:
+                    os.unlink(entry.path)
+        return stale
@@ -0,0 +1,64 @@
+"""
+Build image renditions for media that was uploaded before the pipeline existed.
+
+Usage:
+    python manage.py generate_renditions
+    python manage.py generate_renditions --force --workers 4
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sda_backend.images import (
+    MANIFEST_NAME, generate_renditions, media_path, renditions_dir, uploaded_media_urls,
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnails, web sizes and WebP/AVIF variants for all uploaded images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.IMAGE_RENDITION_WORKERS)
+        parser.add_argument('--force', action='store_true', help='Rebuild renditions that already exist')
+
+    def handle(self, *args, **options):
+        jobs = []
+        for url in uploaded_media_urls():
+            path = media_path(url)
+            if not path or not os.path.isfile(path):
+                continue
+            output_dir = renditions_dir(path)
+            if not options['force'] and os.path.exists(os.path.join(output_dir, MANIFEST_NAME)):
+                continue
+            jobs.append((url, path, output_dir))
+
+        self.stdout.write(f'Generating renditions for {len(jobs)} image(s)...')
+        started = time.monotonic()
+        done = failed = 0
+        with ProcessPoolExecutor(
+            max_workers=options['workers'], mp_context=multiprocessing.get_context('spawn'),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    generate_renditions, path, output_dir,
+                    formats=settings.IMAGE_RENDITION_FORMATS,
+                    quality=settings.IMAGE_RENDITION_QUALITY,
+                ): url
+                for url, path, output_dir in jobs
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f'  ✗ {futures[future]}: {e}')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {done} generated, {failed} failed in {elapsed:.1f}s'
+        ))
@@ -0,0 +1,237 @@
+"""
+Import contact messages (e.g. historic leads from other channels) from CSV
+or JSON Lines.
+
+Columns are those written by export_contacts (``id`` is ignored);
+``created_at``, and ``email`` or ``phone_number``, are required.  Rows are
+normalised a batch at a time, column by column: emails are trimmed and
+lower-cased, phone numbers reduced to digits with a leading ``+`` (``00``
+becomes ``+``).  A row is skipped when a message with the same
+``(email, phone_number, created_at)`` already exists or appears earlier
+in the file, so the same file can be imported twice.  Stored messages are
+normalised the same way for that comparison, so leads saved by the web
+form as ``+994 50 ...`` or ``Name@Example.com`` are recognised too.
+
+On PostgreSQL the rows are streamed with ``COPY FROM STDIN`` into a
+temporary table and inserted with a single ``INSERT ... SELECT`` that
+anti-joins against ``contact_messages``; other databases dedupe in Python.
+Everything happens in one transaction.
+
+Usage:
+    python manage.py import_contacts leads.csv
+    python manage.py import_contacts leads.jsonl --dry-run
+    cat leads.csv | python manage.py import_contacts - --format csv
+"""
+import csv
+import io
+import json
+import re
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from sda_backend.exports import CONTACT_EXPORT_FIELDS
+from sda_backend.models import ContactMessage
+from sda_backend.pgcopy import copy_rows, load_rows
+
+
+BATCH_SIZE = 5000
+STAGING_TABLE = 'contact_messages_import'
+IMPORT_FIELDS = [name for name in CONTACT_EXPORT_FIELDS if name != 'id'] + ['updated_at']
+DEDUPE_KEY = ('email', 'phone_number', 'created_at')
+PHONE_JUNK_RE = re.compile(r'[^\d+]')
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+
+
+def normalise_emails(values):
+    return ['' if value is None else str(value).strip().lower() for value in values]
+
+
+def normalise_phones(values):
+    phones = [PHONE_JUNK_RE.sub('', '' if value is None else str(value)) for value in values]
+    # Keep a single leading '+'; the international '00' prefix means the same
+    phones = [phone[0] + phone[1:].replace('+', '') if phone else phone for phone in phones]
+    return ['+' + phone[2:] if phone.startswith('00') else phone for phone in phones]
+
+
+# The same normalisation in SQL, for comparing with stored messages on PostgreSQL
+EMAIL_SQL = "lower(btrim(coalesce({0}, ''), E' \\t\\r\\n'))"
+PHONE_DIGITS_SQL = "regexp_replace(coalesce({0}, ''), '[^0-9+]', '', 'g')"
+PHONE_SQL = "regexp_replace(left({0}, 1) || replace(substr({0}, 2), '+', ''), '^00', '+')"
+
+
+def stored_key_sql(alias):
+    """SQL expressions for DEDUPE_KEY of a stored contact_messages row, normalised like the imported rows."""
+    quote = connection.ops.quote_name
+    digits = PHONE_DIGITS_SQL.format(f'{alias}.{quote("phone_number")}')
+    return [
+        EMAIL_SQL.format(f'{alias}.{quote("email")}'),
+        PHONE_SQL.format(digits),
+        f'{alias}.{quote("created_at")}',
+    ]
+
+
+def normalise_dates(values):
+    dates = []
+    for value in values:
+        try:
+            parsed = parse_datetime(value.strip()) if isinstance(value, str) else None
+        except ValueError:
+            parsed = None
+        if parsed is not None and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        dates.append(parsed)
+    return dates
+
+
+def normalise_text(values):
+    return [value.strip() or None if isinstance(value, str) else value for value in values]
+
+
+def normalise_booleans(values):
+    return [value if isinstance(value, bool) else str(value or '').strip().lower() in TRUE_VALUES for value in values]
+
+
+class Command(BaseCommand):
+    help = 'Bulk import contact messages from CSV or JSONL, skipping ones that already exist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file ('-' for stdin)")
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help='Input format (default: from the file extension)')
+        parser.add_argument('--dry-run', action='store_true', help='Run the import and roll it back, reporting the counts')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('jsonl' if options['path'].endswith(('.jsonl', '.ndjson')) else 'csv')
+        if options['path'] == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        else:
+            try:
+                stream = open(options['path'], encoding='utf-8-sig', newline='')
+            except OSError as e:
+                raise CommandError(e)
+
+        self.fields = [ContactMessage._meta.get_field(name) for name in IMPORT_FIELDS]
+        self.read = self.rejected = 0
+        self.errors = []
+        started = time.monotonic()
+        with stream, transaction.atomic():
+            records = self.read_records(stream, fmt)
+            rows = (row for batch in self.batches(records) for row in batch)
+            if connection.vendor == 'postgresql':
+                inserted = self.copy_import(rows)
+            else:
+                inserted = self.python_import(rows)
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        for error in self.errors[:20]:
+            self.stderr.write(f'  ✗ {error}')
+        if len(self.errors) > 20:
+            self.stderr.write(f'  ... and {len(self.errors) - 20} more')
+        elapsed = max(time.monotonic() - started, 1e-6)
+        duplicates = self.read - self.rejected - inserted
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {inserted} of {self.read} rows in {elapsed:.1f}s ({self.read / elapsed:.0f} rows/s); '
+            f'{duplicates} duplicates, {self.rejected} rejected'
+        ))
+
+    def read_records(self, stream, fmt):
+        if fmt == 'csv':
+            reader = csv.DictReader(stream)
+            unknown = set(reader.fieldnames or ()) - set(IMPORT_FIELDS) - {'id'}
+            if unknown:
+                raise CommandError(f'Unknown column(s): {", ".join(sorted(unknown))}')
+            yield from reader
+            return
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise CommandError(f'Line {number}: {e}')
+            if not isinstance(record, dict):
+                raise CommandError(f'Line {number}: expected a JSON object')
+            yield record
+
+    def batches(self, records):
+        """Yield lists of rows in IMPORT_FIELDS order, normalised a column at a time."""
+        records = iter(records)
+        while batch := [record for _, record in zip(range(BATCH_SIZE), records)]:
+            self.read += len(batch)
+            columns = {name: [record.get(name) for record in batch] for name in IMPORT_FIELDS}
+            columns['email'] = normalise_emails(columns['email'])
+            columns['phone_number'] = normalise_phones(columns['phone_number'])
+            columns['created_at'] = normalise_dates(columns['created_at'])
+            columns['updated_at'] = columns['created_at']
+            columns['is_read'] = normalise_booleans(columns['is_read'])
+            columns['status'] = [status or 'new' for status in normalise_text(columns['status'])]
+            for name in ('name', 'first_name', 'last_name', 'message', 'cv_url', 'company', 'country', 'property_type'):
+                columns[name] = normalise_text(columns[name])
+
+            rows = []
+            first = self.read - len(batch) + 1
+            for index, row in enumerate(zip(*(columns[name] for name in IMPORT_FIELDS))):
+                if columns['created_at'][index] is None:
+                    self.reject(first + index, 'missing or invalid created_at')
+                elif not columns['email'][index] and not columns['phone_number'][index]:
+                    self.reject(first + index, 'no email or phone number')
+                else:
+                    rows.append(row)
+            yield rows
+
+    def reject(self, number, reason):
+        self.rejected += 1
+        self.errors.append(f'Row {number}: {reason}')
+
+    def copy_import(self, rows):
+        table = connection.ops.quote_name(ContactMessage._meta.db_table)
+        staging = connection.ops.quote_name(STAGING_TABLE)
+        names = ', '.join(connection.ops.quote_name(field.column) for field in self.fields)
+        key = ', '.join(connection.ops.quote_name(name) for name in DEDUPE_KEY)
+        with connection.cursor() as cursor:
+            # Same column types as the real table, but no defaults, constraints or indexes
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS '
+                f'SELECT {names} FROM {table} WITH NO DATA'
+            )
+        copy_rows(connection, STAGING_TABLE, [field.column for field in self.fields], rows)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {staging}')
+            cursor.execute(
+                f'INSERT INTO {table} ({names}) '
+                f'SELECT DISTINCT ON ({key}) {names} FROM {staging} AS s '
+                f'WHERE NOT EXISTS ('
+                f'SELECT 1 FROM {table} AS c WHERE '
+                + ' AND '.join(
+                    f's.{connection.ops.quote_name(name)} = {expression}'
+                    for name, expression in zip(DEDUPE_KEY, stored_key_sql('c'))
+                )
+                + f') ORDER BY {key}'
+            )
+            return cursor.rowcount
+
+    def python_import(self, rows):
+        positions = [IMPORT_FIELDS.index(name) for name in DEDUPE_KEY]
+        seen = set()
+
+        def new_rows():
+            rows_iter = iter(rows)
+            while batch := [row for _, row in zip(range(BATCH_SIZE), rows_iter)]:
+                stored = list(ContactMessage.objects.filter(
+                    created_at__in={row[positions[2]] for row in batch},
+                ).values_list(*DEDUPE_KEY))
+                if stored:
+                    emails, phones, dates = zip(*stored)
+                    seen.update(zip(normalise_emails(emails), normalise_phones(phones), dates))
+                for row in batch:
+                    key = tuple(row[position] for position in positions)
+                    if key not in seen:
+                        seen.add(key)
+                        yield row
+        return load_rows(connection, ContactMessage, self.fields, new_rows())
@@ -0,0 +1,308 @@
+"""
+Bulk import projects, with their photos, services and solutions, from a zip
+file or a directory.
+
+The source holds a manifest plus the images it refers to (paths relative to
+the manifest):
+
+    manifest.json   [{"slug": "baku-tower", "title_en": "...", "year": 2023,
+                      "property_sector": 2, "cover_photo": "baku/cover.jpg",
+                      "photos": ["baku/1.jpg", "baku/2.jpg"],
+                      "services": ["design", 4],
+                      "solutions": [{"title_en": "...", "description_en": "..."}]}, ...]
+
+    manifest.csv    one project per row with the Project columns plus
+                    cover_photo, photos and services ("|"-separated);
+                    solutions need the JSON manifest
+
+Projects are keyed on ``slug``: slugs that already exist are skipped, so an
+interrupted import can simply be run again.  Every image is decoded and
+copied into storage by a pool of worker processes while earlier batches are
+inserted; each batch of projects and all of its rows is written with
+``bulk_create`` in one transaction.  Renditions are queued as for admin
+uploads.
+
+Usage:
+    python manage.py import_projects seed/sector-2.zip
+    python manage.py import_projects seed/sector-2/ --dry-run
+    python manage.py import_projects seed.zip --batch-size 100 --workers 8
+"""
+import csv
+import json
+import mimetypes
+import multiprocessing
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from sda_backend.forms import save_uploaded_file
+from sda_backend.images import ingest_image
+from sda_backend.models import Project, ProjectPhoto, ProjectService, ProjectSolution, PropertySector, Service
+from sda_backend.signals import bulk_saved
+from sda_backend.storage import media_storage
+from sda_backend.uploadhandlers import IMAGE_EXTENSIONS, StreamedUploadedFile
+
+
+MANIFEST_NAMES = ('manifest.json', 'manifest.csv')
+LIST_SEPARATOR = '|'
+PROJECT_FIELDS = {
+    field.name for field in Project._meta.concrete_fields
+    if not field.primary_key and field.name not in ('property_sector', 'cover_photo_url', 'created_at', 'updated_at')
+}
+SOLUTION_FIELDS = {
+    field.name for field in ProjectSolution._meta.concrete_fields
+    if not field.primary_key and field.name not in ('project', 'created_at', 'updated_at')
+}
+IMAGE_PREFIXES = {'cover_photo': 'projects/covers', 'photos': 'projects/photos'}
+
+
+class ManifestError(ValueError):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Import projects with photos, services and solutions from a zip file or directory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Zip file or directory containing the manifest and images')
+        parser.add_argument('--manifest', help='Manifest path inside the source (default: manifest.json or manifest.csv)')
+        parser.add_argument('--batch-size', type=int, default=200, help='Projects per transaction (default: %(default)s)')
+        parser.add_argument('--workers', type=int, default=settings.IMAGE_RENDITION_WORKERS)
+        parser.add_argument('--dry-run', action='store_true', help='Validate the manifest and images without writing anything')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if os.path.isdir(source):
+            self.import_from(source, options)
+        elif zipfile.is_zipfile(source):
+            with tempfile.TemporaryDirectory() as root:
+                with zipfile.ZipFile(source) as archive:
+                    # extractall() drops absolute paths and '..' components
+                    archive.extractall(root)
+                self.import_from(root, options)
+        else:
+            raise CommandError(f'{source} is neither a directory nor a zip file')
+
+    def import_from(self, root, options):
+        started = time.monotonic()
+        items = self.read_manifest(root, options['manifest'])
+        self.stdout.write(f'Manifest: {len(items)} project(s)')
+
+        slugs = [item['slug'] for item in items]
+        existing = set(Project.objects.filter(slug__in=slugs).values_list('slug', flat=True))
+        sectors = set(PropertySector.objects.values_list('pk', flat=True))
+        services = dict(Service.objects.values_list('slug', 'pk'))
+        services.update({pk: pk for pk in services.values()})
+
+        todo, errors = [], []
+        for item in items:
+            if item['slug'] in existing:
+                continue
+            try:
+                todo.append(self.resolve(root, item, sectors, services))
+            except ManifestError as e:
+                errors.append(f"{item['slug']}: {e}")
+        self.stdout.write(f'  {len(existing)} already imported, {len(todo)} to import, {len(errors)} invalid')
+
+        incoming = None if options['dry_run'] else media_storage.incoming_dir()
+        created = {'projects': 0, 'photos': 0, 'services': 0, 'solutions': 0}
+        images = image_bytes = 0
+        with ProcessPoolExecutor(
+            max_workers=options['workers'], mp_context=multiprocessing.get_context('spawn'),
+        ) as executor:
+            # Submit every image up front: the pool keeps working while batches are inserted
+            for project in todo:
+                project['images'] = [
+                    (key, path, executor.submit(ingest_image, path, incoming))
+                    for key, path in project['image_paths']
+                ]
+            for start in range(0, len(todo), options['batch_size']):
+                batch = []
+                for project in todo[start:start + options['batch_size']]:
+                    try:
+                        stored = self.store_images(project['images'], options['dry_run'])
+                    except Exception as e:
+                        errors.append(f"{project['slug']}: {e}")
+                        continue
+                    project['urls'] = stored
+                    images += len(stored)
+                    image_bytes += sum(size for _, _, size in stored)
+                    batch.append(project)
+                if batch and not options['dry_run']:
+                    counts = self.insert(batch)
+                    for key, count in counts.items():
+                        created[key] += count
+                elif batch:
+                    created['projects'] += len(batch)
+                    created['photos'] += sum(len(p['photos']) for p in batch)
+                    created['services'] += sum(len(p['services']) for p in batch)
+                    created['solutions'] += sum(len(p['solutions']) for p in batch)
+                self.stdout.write(f'  {min(start + options["batch_size"], len(todo))}/{len(todo)}')
+
+        for error in errors:
+            self.stderr.write(f'  ✗ {error}')
+        elapsed = max(time.monotonic() - started, 1e-6)
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {created['projects']} project(s), {created['photos']} photo(s), "
+            f"{created['services']} service link(s), {created['solutions']} solution(s) in {elapsed:.1f}s "
+            f"({created['projects'] / elapsed:.1f} projects/s, {images / elapsed:.1f} images/s, "
+            f"{image_bytes / 1024 / 1024 / elapsed:.1f} MB/s); {len(errors)} failed"
+        ))
+
+    def read_manifest(self, root, name):
+        names = [name] if name else MANIFEST_NAMES
+        for candidate in names:
+            path = os.path.join(root, candidate)
+            if os.path.isfile(path):
+                break
+        else:
+            raise CommandError(f'No manifest found (looked for {", ".join(names)})')
+
+        try:
+            if path.endswith('.csv'):
+                with open(path, newline='', encoding='utf-8-sig') as f:
+                    items = [self.csv_item(row) for row in csv.DictReader(f)]
+            else:
+                with open(path, encoding='utf-8') as f:
+                    items = json.load(f)
+                if isinstance(items, dict):
+                    items = items.get('projects', [])
+        except (ValueError, OSError) as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+        seen = set()
+        for number, item in enumerate(items, 1):
+            if not isinstance(item, dict) or not item.get('slug'):
+                raise CommandError(f'Project #{number} has no slug')
+            if item['slug'] in seen:
+                raise CommandError(f"Slug {item['slug']!r} appears more than once")
+            seen.add(item['slug'])
+        return items
+
+    @staticmethod
+    def csv_item(row):
+        item = {key: value for key, value in row.items() if key and value not in (None, '')}
+        for key in ('photos', 'services'):
+            if key in item:
+                item[key] = [value.strip() for value in item[key].split(LIST_SEPARATOR) if value.strip()]
+        return item
+
+    def resolve(self, root, item, sectors, services):
+        """Validate a manifest entry and turn it into the values to insert."""
+        unknown = set(item) - PROJECT_FIELDS - {'property_sector', 'cover_photo', 'photos', 'services', 'solutions'}
+        if unknown:
+            raise ManifestError(f'unknown field(s) {", ".join(sorted(unknown))}')
+
+        fields = {key: item[key] for key in PROJECT_FIELDS if key in item}
+        for key in ('year', 'year_end'):
+            if fields.get(key) is not None:
+                try:
+                    fields[key] = int(fields[key])
+                except (TypeError, ValueError):
+                    raise ManifestError(f'{key} must be a number')
+        if item.get('property_sector') is not None:
+            try:
+                fields['property_sector_id'] = int(item['property_sector'])
+            except (TypeError, ValueError):
+                fields['property_sector_id'] = None
+            if fields['property_sector_id'] not in sectors:
+                raise ManifestError(f"unknown property sector {item['property_sector']!r}")
+
+        service_ids = []
+        for value in item.get('services', []):
+            key = int(value) if str(value).isdigit() else value
+            if key not in services:
+                raise ManifestError(f'unknown service {value!r}')
+            service_ids.append(services[key])
+
+        solutions = item.get('solutions', [])
+        for solution in solutions:
+            if not isinstance(solution, dict) or set(solution) - SOLUTION_FIELDS:
+                raise ManifestError(f'solutions may only contain {", ".join(sorted(SOLUTION_FIELDS))}')
+
+        image_paths = []
+        if item.get('cover_photo'):
+            image_paths.append(('cover_photo', self.image_path(root, item['cover_photo'])))
+        for photo in item.get('photos', []):
+            image_paths.append(('photos', self.image_path(root, photo)))
+
+        return {
+            'slug': item['slug'],
+            'fields': fields,
+            'image_paths': image_paths,
+            'photos': [path for key, path in image_paths if key == 'photos'],
+            'services': service_ids,
+            'solutions': solutions,
+        }
+
+    @staticmethod
+    def image_path(root, relative):
+        path = os.path.realpath(os.path.join(root, relative))
+        if not path.startswith(os.path.realpath(root) + os.sep):
+            raise ManifestError(f'{relative} is outside the import source')
+        if not os.path.isfile(path):
+            raise ManifestError(f'{relative} does not exist')
+        if os.path.splitext(path)[1].lower() not in IMAGE_EXTENSIONS:
+            raise ManifestError(f'{relative} is not an image')
+        return path
+
+    @staticmethod
+    def store_images(images, dry_run):
+        """Wait for a project's images and move them into storage; returns [(key, url, size)]."""
+        results = []
+        try:
+            for key, path, future in images:
+                try:
+                    results.append((key, path, future.result()))
+                except Exception as e:
+                    raise ManifestError(f'{os.path.basename(path)} is not a valid image ({e})')
+        except ManifestError:
+            # Drop the copies of this project's other images
+            for future in (future for _, _, future in images):
+                if not future.exception() and future.result()[0]:
+                    os.unlink(future.result()[0])
+            raise
+
+        stored = []
+        for key, path, (tmp_path, digest, size) in results:
+            if dry_run:
+                stored.append((key, None, size))
+                continue
+            name = os.path.basename(path)
+            upload = StreamedUploadedFile(
+                tmp_path, name, mimetypes.guess_type(name)[0], size, None, sha256=digest,
+            )
+            try:
+                stored.append((key, save_uploaded_file(upload, IMAGE_PREFIXES[key]), size))
+            finally:
+                upload.close()
+        return stored
+
+    @staticmethod
+    def insert(batch):
+        with transaction.atomic():
+            projects = []
+            for item in batch:
+                cover = [url for key, url, _ in item['urls'] if key == 'cover_photo']
+                projects.append(Project(**item['fields'], cover_photo_url=cover[0] if cover else None))
+            Project.objects.bulk_create(projects)
+
+            photos, links, solutions = [], [], []
+            for project, item in zip(projects, batch):
+                urls = [url for key, url, _ in item['urls'] if key == 'photos']
+                photos.extend(ProjectPhoto(project=project, image_url=url, order=order) for order, url in enumerate(urls, 1))
+                links.extend(ProjectService(project=project, service_id=pk, order=order) for order, pk in enumerate(item['services'], 1))
+                solutions.extend(ProjectSolution(project=project, order=order, **values) for order, values in enumerate(item['solutions'], 1))
+            ProjectPhoto.objects.bulk_create(photos)
+            ProjectService.objects.bulk_create(links)
+            ProjectSolution.objects.bulk_create(solutions)
+            # Each project's document covers its photos, services and solutions
+            bulk_saved.send(sender=Project, objs=projects)
+        return {'projects': len(projects), 'photos': len(photos), 'services': len(links), 'solutions': len(solutions)}
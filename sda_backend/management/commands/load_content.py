@@ -0,0 +1,50 @@
+"""
+Load a snapshot written by dump_content, in one transaction.
+
+The content tables must be empty unless --replace is given, which empties
+them first (TRUNCATE on PostgreSQL).  Media files that already exist are
+kept.  The load records an outbox event for every public document and then
+rebuilds the read models (rebuild_read_models).  Renditions are not part of
+the snapshot; build them afterwards with generate_renditions.
+
+Usage:
+    python manage.py load_content content.tar.gz --replace
+    python manage.py load_content content.tar.gz --no-media
+    python manage.py load_content content.tar.gz --no-read-models
+"""
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from sda_backend.snapshots import SnapshotError, load
+
+
+class Command(BaseCommand):
+    help = 'Import a content snapshot written by dump_content'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archive written by dump_content')
+        parser.add_argument('--replace', action='store_true', help='Delete the existing content first')
+        parser.add_argument('--no-media', action='store_true', help='Do not unpack the uploaded files')
+        parser.add_argument(
+            '--no-read-models', action='store_true',
+            help='Do not rebuild the read models (run rebuild_read_models before the site uses them)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            counts = load(options['path'], options['replace'], not options['no_media'], stdout=self.stdout)
+        except SnapshotError as e:
+            raise CommandError(e)
+        media = counts.pop('media', 0)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {sum(counts.values())} rows into {len(counts)} tables and {media} new media files in {elapsed:.1f}s'
+        ))
+        if options['no_read_models']:
+            self.stdout.write('Run `python manage.py rebuild_read_models` before the public site reads the new content.')
+        else:
+            call_command('rebuild_read_models', stdout=self.stdout)
+        self.stdout.write('Run `python manage.py generate_renditions` to build thumbnails for new media.')
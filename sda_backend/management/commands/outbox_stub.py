@@ -0,0 +1,44 @@
+"""
+Local stand-in for the public backend's invalidation endpoint, for trying
+out relay_outbox: prints every batch it receives.
+
+Usage:
+    python manage.py outbox_stub --port 8765
+    python manage.py outbox_stub --status 503     # make deliveries fail
+    OUTBOX_ENDPOINT=http://127.0.0.1:8765/ python manage.py relay_outbox
+"""
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Serve a local endpoint that prints the invalidations relay_outbox sends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--status', type=int, default=204, help='HTTP status to answer with (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        stdout, status = self.stdout, options['status']
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                for item in body.get('invalidations', []):
+                    stdout.write(f"  {item['entity']} {item['id']} ({item['changes']} change(s), last {item['changed_at']})")
+                self.send_response(status)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                stdout.write(format % args)
+
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(f'Listening on http://127.0.0.1:{options["port"]}/ (answering {status})')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
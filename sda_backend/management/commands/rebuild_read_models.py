@@ -0,0 +1,66 @@
+"""
+Rebuild the public site's read models (see sda_backend/read_models.py) from
+scratch, e.g. after load_content, a direct database import or a change to
+the document layout.
+
+Objects are split into batches that are built and written by a pool of
+threads, each with its own database connection; documents of deleted
+objects are removed at the end.
+
+Usage:
+    python manage.py rebuild_read_models
+    python manage.py rebuild_read_models --entity project --batch-size 200 --workers 8
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from sda_backend.models import ReadModel
+from sda_backend.read_models import BUILDERS, publish
+from sda_backend.schema import supported
+
+
+def publish_batch(entity, pks):
+    try:
+        return publish(entity, pks)
+    finally:
+        connection.close()  # this thread's connection
+
+
+class Command(BaseCommand):
+    help = 'Rebuild all denormalized read models for the public site'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entity', action='append', choices=sorted(BUILDERS), help='Only these entities (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Objects per batch (default: %(default)s)')
+        parser.add_argument('--workers', type=int, default=4, help='Parallel batches (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        total = 0
+        for entity in options['entity'] or BUILDERS:
+            builder = BUILDERS[entity]
+            if not supported(builder.model):
+                self.stdout.write(f'  {entity}: skipped, not available on {connection.vendor}')
+                continue
+            entity_started = time.monotonic()
+            pks = list(builder.model._base_manager.order_by('pk').values_list('pk', flat=True))
+            batches = [pks[start:start + options['batch_size']] for start in range(0, len(pks), options['batch_size'])]
+            documents = 0
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                futures = [executor.submit(publish_batch, entity, batch) for batch in batches]
+                for future in as_completed(futures):
+                    documents += future.result()
+
+            stale, _ = ReadModel.objects.filter(entity=entity).exclude(
+                object_id__in=builder.model._base_manager.values('pk'),
+            ).delete()
+            total += documents
+            self.stdout.write(
+                f'  {entity}: {documents} documents for {len(pks)} objects, {stale} stale removed '
+                f'in {time.monotonic() - entity_started:.1f}s'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} documents in {time.monotonic() - started:.1f}s'))
@@ -0,0 +1,79 @@
+"""
+Deliver content change notifications from the outbox to the public backend
+(see sda_backend/outbox.py).
+
+Runs until stopped, polling for due changes; run one relay per database
+(on PostgreSQL a second one exits).  Failed deliveries are retried with
+exponential backoff, up to a minute apart, in batches halved after every
+failure and doubled again after every success.  Delivered events are
+removed after OUTBOX_RETENTION_HOURS.
+
+Usage:
+    python manage.py relay_outbox
+    python manage.py relay_outbox --once --endpoint http://127.0.0.1:8765/
+    python manage.py relay_outbox --retry-failed
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sda_backend import outbox
+
+
+MAX_BACKOFF_SECONDS = 60
+PURGE_INTERVAL_SECONDS = 300
+
+
+class Command(BaseCommand):
+    help = 'Send batched, coalesced content invalidations to the public backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', help='Override OUTBOX_ENDPOINT')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls (default: %(default)s)')
+        parser.add_argument('--timeout', type=float, default=10.0, help='HTTP timeout in seconds (default: %(default)s)')
+        parser.add_argument('--once', action='store_true', help='Deliver everything that is due, then exit')
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Queue the events moved aside after OUTBOX_MAX_ATTEMPTS again, then exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            self.stdout.write(f'Queued {outbox.retry_failed()} moved-aside event(s) again')
+            return
+        endpoint = options['endpoint'] or settings.OUTBOX_ENDPOINT
+        if not endpoint:
+            raise CommandError('Set OUTBOX_ENDPOINT (or pass --endpoint)')
+        if not outbox.acquire_relay_lock():
+            raise CommandError('Another relay_outbox is already running for this database')
+
+        failures = 0
+        last_purge = 0
+        limit = settings.OUTBOX_BATCH_SIZE
+        while True:
+            batch = outbox.ready_batch(limit=limit)
+            if batch:
+                if outbox.deliver(batch, endpoint, options['timeout']):
+                    failures = 0
+                    limit = min(settings.OUTBOX_BATCH_SIZE, limit * 2)
+                    self.stdout.write(f'Delivered {len(batch)} invalidation(s), {sum(item["changes"] for item in batch)} change(s)')
+                    continue  # more may be due
+                failures += 1
+                # Narrows a rejected entity down to a batch of its own, where it can be moved aside
+                limit = max(1, len(batch) // 2)
+                delay = min(MAX_BACKOFF_SECONDS, 2 ** failures)
+                self.stderr.write(f'Delivery of {len(batch)} invalidation(s) failed, retrying in {delay}s')
+                if options['once']:
+                    raise CommandError('Delivery failed')
+                time.sleep(delay)
+                continue
+
+            if time.monotonic() - last_purge > PURGE_INTERVAL_SECONDS:
+                purged = outbox.purge_delivered()
+                if purged:
+                    self.stdout.write(f'Removed {purged} delivered event(s)')
+                last_purge = time.monotonic()
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,95 @@
+"""
+Run background jobs (see sda_backend/jobs.py).
+
+Starts ``--concurrency`` workers that each claim and run one job at a time:
+threads by default (enough for jobs that mostly wait on the database or
+disk), or ``--pool process`` for CPU-heavy work such as image renditions.
+SIGTERM or Ctrl-C lets running jobs finish, then exits.  Jobs whose worker
+died are requeued, and finished jobs removed after JOB_RETENTION_DAYS.
+
+Usage:
+    python manage.py run_workers --concurrency 4
+    python manage.py run_workers --concurrency 2 --pool process
+    python manage.py run_workers --burst     # run what is due, then exit
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from django.core.management.base import BaseCommand, OutputWrapper
+
+
+MAINTENANCE_INTERVAL_SECONDS = 60
+
+
+def process_main(worker, stop, poll, burst):
+    # A spawned process: set up Django before importing anything that touches models
+    import django
+    django.setup()
+    from sda_backend.jobs import work
+
+    # The parent decides when to stop; a job in progress is never interrupted
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    work(worker, stop, poll, burst, log=OutputWrapper(sys.stdout).write)
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Jobs run at once (default: %(default)s)')
+        parser.add_argument('--pool', choices=('thread', 'process'), default='thread')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds between polls of an empty queue (default: %(default)s)')
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due')
+
+    def handle(self, *args, **options):
+        # Imported here: spawned worker processes import this module before django.setup()
+        from sda_backend import jobs
+
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        workers = [f'{prefix}:{number}' for number in range(1, options['concurrency'] + 1)]
+        if options['pool'] == 'process':
+            context = multiprocessing.get_context('spawn')
+            stop = context.Event()
+            pool = [
+                context.Process(target=process_main, args=(worker, stop, options['poll'], options['burst']), name=worker)
+                for worker in workers
+            ]
+        else:
+            stop = threading.Event()
+            pool = [
+                threading.Thread(
+                    target=jobs.work, args=(worker, stop, options['poll'], options['burst']),
+                    kwargs={'log': self.stdout.write}, name=worker,
+                )
+                for worker in workers
+            ]
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+
+        requeued = jobs.requeue_stale()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} job(s) of workers that stopped responding')
+        self.stdout.write(f'Starting {len(pool)} {options["pool"]} worker(s)')
+        for worker in pool:
+            worker.start()
+
+        last_maintenance = time.monotonic()
+        try:
+            while any(worker.is_alive() for worker in pool):
+                for worker in pool:
+                    worker.join(timeout=1)
+                if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL_SECONDS:
+                    jobs.requeue_stale()
+                    jobs.purge_finished()
+                    last_maintenance = time.monotonic()
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping once running jobs finish...')
+            stop.set()
+            for worker in pool:
+                worker.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped'))
@@ -0,0 +1,166 @@
+"""
+Per-request database instrumentation for the admin.
+
+``QueryInstrumentationMiddleware`` wraps every connection with
+``connection.execute_wrapper`` for the duration of a request and records:
+
+- the number of queries and the total time spent in the database;
+- query fingerprints (the SQL with ``IN (%s, %s, ...)`` lists collapsed)
+  that ran more than once - the signature of an N+1 pattern;
+- the slowest statements.
+
+Only requests under ADMIN_PROFILE_PATH_PREFIX are profiled, and only with
+ADMIN_PROFILING on.  Totals are sent back as a ``Server-Timing`` header
+(shown in the browser's network panel) for staff users, and every request
+is logged as one JSON line on the ``sda_backend.profile`` logger, keyed by
+the URL name of the view (``sda_backend_project_changelist``, ...), to a
+size-rotated file (``SharedRotatingFileHandler``).  ``manage.py
+admin_profile`` turns that log into a per-view latency report.
+
+Queries run while a streaming response is consumed (exports) happen after
+the middleware has returned and are not counted.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('sda_backend.profile')
+
+IN_LIST_RE = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+SQL_PREVIEW_LENGTH = 300
+
+
+def fingerprint(sql):
+    """Normalise SQL so queries that differ only in IN-list length group together."""
+    return IN_LIST_RE.sub('(...)', sql)
+
+
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler for a file several worker processes append to.
+    Rotation is serialised with a lock file, and a process whose file was
+    rotated by another one reopens it (as WatchedFileHandler does) instead
+    of writing to the renamed backup.
+    """
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+    def reopen_if_rotated(self):
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            self.stream.close()
+            self.stream = self._open()
+
+    def emit(self, record):
+        try:
+            self.reopen_if_rotated()
+            if self.shouldRollover(record):
+                with open(self.baseFilename + '.lock', 'a') as lock:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                    # Another process may have rotated while this one waited
+                    self.reopen_if_rotated()
+                    if self.shouldRollover(record):
+                        self.doRollover()
+            logging.FileHandler.emit(self, record)
+        except Exception:
+            self.handleError(record)
+
+
+class QueryRecorder:
+    """``execute_wrapper`` callable collecting timings for one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.exact = Counter()
+        self.statements = []  # (duration, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            self.fingerprints[fingerprint(sql)] += 1
+            self.exact[sql, repr(params)] += 1
+            self.statements.append((duration, sql))
+
+    def duplicates(self, limit):
+        return [
+            {
+                'fingerprint': hashlib.sha1(sql.encode()).hexdigest()[:12],
+                'count': count,
+                'sql': sql[:SQL_PREVIEW_LENGTH],
+            }
+            for sql, count in self.fingerprints.most_common(limit)
+            if count > 1
+        ]
+
+    def slowest(self, limit):
+        return [
+            {'ms': round(duration * 1000, 2), 'sql': sql[:SQL_PREVIEW_LENGTH]}
+            for duration, sql in sorted(self.statements, key=lambda item: item[0], reverse=True)[:limit]
+        ]
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not (settings.ADMIN_PROFILING and request.path.startswith(settings.ADMIN_PROFILE_PATH_PREFIX)):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+                f'total;dur={duration * 1000:.1f}'
+            )
+
+        match = request.resolver_match
+        limit = settings.ADMIN_PROFILE_TOP_QUERIES
+        logger.info(json.dumps({
+            'ts': round(time.time(), 3),
+            'view': (match.url_name or match.view_name) if match else 'unresolved',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'ms': round(duration * 1000, 2),
+            'queries': recorder.count,
+            'sql_ms': round(recorder.duration * 1000, 2),
+            'exact_duplicates': sum(count - 1 for count in recorder.exact.values()),
+            'duplicates': recorder.duplicates(limit),
+            'slowest': recorder.slowest(limit),
+        }))
+        return response
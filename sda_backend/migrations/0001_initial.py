@@ -0,0 +1,518 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:38
+
+import django.contrib.postgres.fields
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='About',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('years_experience', models.IntegerField(default=0)),
+                ('ongoing_projects', models.IntegerField(default=0)),
+                ('team_members', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'About Section',
+                'verbose_name_plural': 'About Sections',
+                'db_table': 'about',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Approach',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title_en', models.TextField(blank=True, null=True)),
+                ('title_az', models.TextField(blank=True, null=True)),
+                ('title_ru', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('description_az', models.TextField(blank=True, null=True)),
+                ('description_ru', models.TextField(blank=True, null=True)),
+                ('title', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Approach',
+                'verbose_name_plural': 'Approaches',
+                'db_table': 'approaches',
+                'ordering': ['order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ContactMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.TextField(blank=True, null=True)),
+                ('first_name', models.TextField(blank=True, null=True)),
+                ('last_name', models.TextField(blank=True, null=True)),
+                ('phone_number', models.TextField()),
+                ('email', models.TextField()),
+                ('message', models.TextField(blank=True, null=True)),
+                ('cv_url', models.TextField(blank=True, null=True)),
+                ('company', models.TextField(blank=True, null=True)),
+                ('country', models.TextField(blank=True, null=True)),
+                ('property_type', models.TextField(blank=True, null=True)),
+                ('is_read', models.BooleanField(default=False)),
+                ('status', models.CharField(default='new', max_length=50)),
+            ],
+            options={
+                'verbose_name': 'Contact Message',
+                'verbose_name_plural': 'Contact Messages',
+                'db_table': 'contact_messages',
+                'ordering': ['-created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='News',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('photo_url', models.TextField(blank=True, null=True)),
+                ('tags', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=list, size=None)),
+                ('tag_en', models.TextField(blank=True, null=True)),
+                ('tag_az', models.TextField(blank=True, null=True)),
+                ('tag_ru', models.TextField(blank=True, null=True)),
+                ('title', models.TextField()),
+                ('title_en', models.TextField(blank=True, null=True)),
+                ('title_az', models.TextField(blank=True, null=True)),
+                ('title_ru', models.TextField(blank=True, null=True)),
+                ('summary', models.TextField(blank=True, null=True)),
+                ('summary_en', models.TextField(blank=True, null=True)),
+                ('summary_az', models.TextField(blank=True, null=True)),
+                ('summary_ru', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'News Article',
+                'verbose_name_plural': 'News Articles',
+                'db_table': 'news',
+                'ordering': ['-created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='NewsSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.IntegerField(default=0)),
+                ('heading', models.TextField(blank=True, null=True)),
+                ('heading_en', models.TextField(blank=True, null=True)),
+                ('heading_az', models.TextField(blank=True, null=True)),
+                ('heading_ru', models.TextField(blank=True, null=True)),
+                ('content', models.TextField(blank=True, null=True)),
+                ('content_en', models.TextField(blank=True, null=True)),
+                ('content_az', models.TextField(blank=True, null=True)),
+                ('content_ru', models.TextField(blank=True, null=True)),
+                ('image_url', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'News Section',
+                'verbose_name_plural': 'News Sections',
+                'db_table': 'news_sections',
+                'ordering': ['news', 'order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Partner',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Partner',
+                'verbose_name_plural': 'Partners',
+                'db_table': 'partners',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PartnerLogo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('image_url', models.TextField()),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Partner Logo',
+                'verbose_name_plural': 'Partner Logos',
+                'db_table': 'partner_logos',
+                'ordering': ['partner', 'order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title_en', models.TextField(blank=True, null=True)),
+                ('title_az', models.TextField(blank=True, null=True)),
+                ('title_ru', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('description_az', models.TextField(blank=True, null=True)),
+                ('description_ru', models.TextField(blank=True, null=True)),
+                ('about_project_en', models.TextField(blank=True, null=True)),
+                ('about_project_az', models.TextField(blank=True, null=True)),
+                ('about_project_ru', models.TextField(blank=True, null=True)),
+                ('title', models.TextField(blank=True, null=True)),
+                ('slug', models.TextField(blank=True, null=True, unique=True)),
+                ('client', models.TextField(blank=True, null=True)),
+                ('year', models.IntegerField(blank=True, null=True)),
+                ('year_end', models.IntegerField(blank=True, null=True)),
+                ('cover_photo_url', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Project',
+                'verbose_name_plural': 'Projects',
+                'db_table': 'projects',
+                'ordering': ['-year', '-created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectPhoto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('image_url', models.TextField()),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Project Photo',
+                'verbose_name_plural': 'Project Photos',
+                'db_table': 'project_photos',
+                'ordering': ['project', 'order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectService',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'project_services',
+                'ordering': ['order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectSolution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title_en', models.TextField(blank=True, null=True)),
+                ('title_az', models.TextField(blank=True, null=True)),
+                ('title_ru', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('description_az', models.TextField(blank=True, null=True)),
+                ('description_ru', models.TextField(blank=True, null=True)),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Project Delivered Solution',
+                'verbose_name_plural': 'Project Delivered Solutions',
+                'db_table': 'project_solutions',
+                'ordering': ['project', 'order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PropertySector',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title_en', models.TextField(blank=True, null=True)),
+                ('title_az', models.TextField(blank=True, null=True)),
+                ('title_ru', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('description_az', models.TextField(blank=True, null=True)),
+                ('description_ru', models.TextField(blank=True, null=True)),
+                ('title', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Property Sector',
+                'verbose_name_plural': 'Property Sectors',
+                'db_table': 'property_sectors',
+                'ordering': ['order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PropertySectorProcess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title_en', models.TextField(blank=True, null=True)),
+                ('title_az', models.TextField(blank=True, null=True)),
+                ('title_ru', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('description_az', models.TextField(blank=True, null=True)),
+                ('description_ru', models.TextField(blank=True, null=True)),
+                ('title', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Property Sectors Service',
+                'verbose_name_plural': 'Property Sectors Services',
+                'db_table': 'property_sector_processes',
+                'ordering': ['property_sector', 'order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Service',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name_en', models.TextField(blank=True, null=True)),
+                ('name_az', models.TextField(blank=True, null=True)),
+                ('name_ru', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('description_az', models.TextField(blank=True, null=True)),
+                ('description_ru', models.TextField(blank=True, null=True)),
+                ('meta_title_en', models.TextField(blank=True, null=True)),
+                ('meta_title_az', models.TextField(blank=True, null=True)),
+                ('meta_title_ru', models.TextField(blank=True, null=True)),
+                ('meta_description_en', models.TextField(blank=True, null=True)),
+                ('meta_description_az', models.TextField(blank=True, null=True)),
+                ('meta_description_ru', models.TextField(blank=True, null=True)),
+                ('name', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('meta_title', models.TextField(blank=True, null=True)),
+                ('meta_description', models.TextField(blank=True, null=True)),
+                ('slug', models.CharField(max_length=255, unique=True)),
+                ('image_url', models.TextField(blank=True, null=True)),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Service',
+                'verbose_name_plural': 'Services',
+                'db_table': 'services',
+                'ordering': ['order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ServiceBenefit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title_en', models.TextField(blank=True, null=True)),
+                ('title_az', models.TextField(blank=True, null=True)),
+                ('title_ru', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('description_az', models.TextField(blank=True, null=True)),
+                ('description_ru', models.TextField(blank=True, null=True)),
+                ('title', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Service Benefit',
+                'verbose_name_plural': 'Service Benefits',
+                'db_table': 'service_benefits',
+                'ordering': ['order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ServiceProcess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title_en', models.TextField(blank=True, null=True)),
+                ('title_az', models.TextField(blank=True, null=True)),
+                ('title_ru', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('description_az', models.TextField(blank=True, null=True)),
+                ('description_ru', models.TextField(blank=True, null=True)),
+                ('title', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('icon_url', models.TextField(blank=True, null=True)),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Service What We Do Item',
+                'verbose_name_plural': 'Service What We Do Items',
+                'db_table': 'service_processes',
+                'ordering': ['order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ServiceWorkProcess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title_en', models.TextField(blank=True, null=True)),
+                ('title_az', models.TextField(blank=True, null=True)),
+                ('title_ru', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('description_az', models.TextField(blank=True, null=True)),
+                ('description_ru', models.TextField(blank=True, null=True)),
+                ('title', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Service Process Step',
+                'verbose_name_plural': 'Service Process Steps',
+                'db_table': 'service_work_processes',
+                'ordering': ['order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TeamMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('full_name_en', models.TextField(blank=True, null=True)),
+                ('full_name_az', models.TextField(blank=True, null=True)),
+                ('full_name_ru', models.TextField(blank=True, null=True)),
+                ('role_en', models.TextField(blank=True, null=True)),
+                ('role_az', models.TextField(blank=True, null=True)),
+                ('role_ru', models.TextField(blank=True, null=True)),
+                ('bio_en', models.TextField(blank=True, null=True)),
+                ('bio_az', models.TextField(blank=True, null=True)),
+                ('bio_ru', models.TextField(blank=True, null=True)),
+                ('photo_url', models.TextField(blank=True, null=True)),
+                ('linkedin_url', models.TextField(blank=True, null=True)),
+                ('full_name', models.TextField(blank=True, null=True)),
+                ('role', models.TextField(blank=True, null=True)),
+                ('bio', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Team Member',
+                'verbose_name_plural': 'Team Members',
+                'db_table': 'team_members',
+                'ordering': ['id'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TeamSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title', models.TextField()),
+                ('button_text', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Team Section',
+                'verbose_name_plural': 'Team Sections',
+                'db_table': 'team_sections',
+                'ordering': ['id'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TeamSectionItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.TextField()),
+                ('description', models.TextField(blank=True, null=True)),
+                ('photo_url', models.TextField(blank=True, null=True)),
+                ('button_text', models.TextField(blank=True, null=True)),
+                ('order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Team Section Item',
+                'verbose_name_plural': 'Team Section Items',
+                'db_table': 'team_section_items',
+                'ordering': ['team_section', 'order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkProcess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('title_en', models.TextField(blank=True, null=True)),
+                ('title_az', models.TextField(blank=True, null=True)),
+                ('title_ru', models.TextField(blank=True, null=True)),
+                ('description_en', models.TextField(blank=True, null=True)),
+                ('description_az', models.TextField(blank=True, null=True)),
+                ('description_ru', models.TextField(blank=True, null=True)),
+                ('title', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('order', models.IntegerField(default=0)),
+                ('image_url', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Work Process',
+                'verbose_name_plural': 'Work Processes',
+                'db_table': 'work_processes',
+                'ordering': ['order'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ReadModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('language', models.CharField(max_length=5)),
+                ('slug', models.TextField(blank=True, null=True)),
+                ('document', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Read Model',
+                'verbose_name_plural': 'Read Models',
+                'db_table': 'content_read_models',
+                'indexes': [models.Index(fields=['entity', 'language', 'slug'], name='read_model_entity_lang_slug')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='readmodel',
+            constraint=models.UniqueConstraint(fields=('entity', 'language', 'object_id'), name='read_model_entity_language_id'),
+        ),
+    ]
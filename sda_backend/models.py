@@ -2,7 +2,10 @@
 Django models that mirror the FastAPI SQLAlchemy models.
 These models use managed=False to avoid Django trying to create tables.
 """
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 from django.contrib.postgres.fields import ArrayField
 
 
@@ -679,3 +682,142 @@ class Approach(TimestampMixin):
 
     def __str__(self):
         return self.title_en or self.title or f"Approach {self.id}"
+
+
+# ==================== Read Models (owned by the admin) ====================
+
+class ReadModel(models.Model):
+    """
+    Denormalized JSON document for one entity in one language, written by
+    the admin (see read_models.py) and read by the public site with a
+    single indexed lookup by id or slug.
+    """
+    entity = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    language = models.CharField(max_length=5)
+    slug = models.TextField(null=True, blank=True)
+    document = models.JSONField(encoder=DjangoJSONEncoder)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'content_read_models'
+        constraints = [
+            models.UniqueConstraint(fields=['entity', 'language', 'object_id'], name='read_model_entity_language_id'),
+        ]
+        indexes = [
+            models.Index(fields=['entity', 'language', 'slug'], name='read_model_entity_lang_slug'),
+        ]
+        verbose_name = 'Read Model'
+        verbose_name_plural = 'Read Models'
+
+    def __str__(self):
+        return f"{self.entity} {self.object_id} ({self.language})"
+
+
+class OutboxEvent(models.Model):
+    """
+    A change to one public entity, written in the transaction that made it
+    and delivered to the public backend by ``manage.py relay_outbox``.
+    Events the endpoint keeps rejecting are moved aside (``failed_at``).
+    """
+    entity = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'content_outbox'
+        indexes = [
+            models.Index(
+                fields=['entity', 'object_id', 'created_at'], name='outbox_pending',
+                condition=models.Q(delivered_at__isnull=True, failed_at__isnull=True),
+            ),
+            models.Index(fields=['delivered_at'], name='outbox_delivered_at'),
+        ]
+        verbose_name = 'Outbox Event'
+        verbose_name_plural = 'Outbox Events'
+
+    def __str__(self):
+        return f"{self.entity} {self.object_id} at {self.created_at:%Y-%m-%d %H:%M:%S}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work (see sda_backend/jobs.py), run by
+    ``manage.py run_workers``.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+        (CANCELLED, 'Cancelled'),
+    ]
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.SmallIntegerField(default=0, help_text='Higher runs first')
+    run_at = models.DateTimeField(help_text='Not started before this time (retries are pushed back)')
+    attempts = models.SmallIntegerField(default=0)
+    max_attempts = models.SmallIntegerField(default=3)
+    progress = models.IntegerField(default=0)
+    total = models.IntegerField(null=True, blank=True)
+    message = models.TextField(blank=True, default='')
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    last_error = models.TextField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'admin_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            # What workers scan for the next job
+            models.Index(
+                fields=['-priority', 'run_at', 'id'], name='job_queued',
+                condition=models.Q(status='queued'),
+            ),
+            models.Index(fields=['status', 'finished_at'], name='job_status_finished'),
+        ]
+        verbose_name = 'Background Job'
+        verbose_name_plural = 'Background Jobs'
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}"
+
+    class Lost(Exception):
+        """The job was requeued (its heartbeat went stale) while this worker was still running it."""
+
+    def owned(self):
+        """This job's row while it is still the run this instance claimed."""
+        return Job.objects.filter(pk=self.pk, status=Job.RUNNING, worker=self.worker, attempts=self.attempts)
+
+    def set_progress(self, progress, total=None, message=None):
+        """
+        Report progress from inside the job; doubles as the worker's
+        heartbeat.  Raises Job.Lost when the job is no longer this run's.
+        """
+        self.progress = progress
+        self.heartbeat_at = timezone.now()
+        fields = {'progress': progress, 'heartbeat_at': self.heartbeat_at}
+        if total is not None:
+            self.total = fields['total'] = total
+        if message is not None:
+            self.message = fields['message'] = message
+        if not self.owned().update(**fields):
+            raise Job.Lost(f'{self} is no longer run by {self.worker} (attempt {self.attempts})')
@@ -0,0 +1,240 @@
+"""
+Drag-and-drop ordering and set-based renumbering of ``order`` columns.
+
+Most content tables carry an ``order`` integer that editors used to type
+in by hand, which leaves gaps and ties behind.  With ``DragOrderMixin``
+rows are dragged into place on the changelist (when it is sorted by
+``order``) and in ordered inlines (drag_order.js).  The browser posts only
+the moved row and the row it was dropped next to.  ``move`` then renumbers
+the row's scope, e.g. the benefits of one service, as 1..n with a single
+``UPDATE`` driven by ``ROW_NUMBER()``, and writes only the rows whose
+position changed.  ``compact`` renumbers every scope of a table with one
+statement (``manage.py compact_order``).
+
+Renumbered rows are announced with ``bulk_saved``, so read models and the
+change outbox follow.
+"""
+from django.contrib.admin.utils import unquote
+from django.contrib.admin.views.main import ORDER_VAR
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import connection, transaction
+from django.http import Http404, HttpResponseBadRequest, HttpResponseNotAllowed, JsonResponse
+from django.urls import path, reverse
+from django.utils import timezone
+
+from .models import (
+    Approach, NewsSection, PartnerLogo, ProjectPhoto, ProjectService, ProjectSolution, PropertySector,
+    PropertySectorProcess, Service, ServiceBenefit, ServiceProcess, ServiceWorkProcess, TeamSectionItem,
+    WorkProcess,
+)
+from .signals import bulk_saved
+
+
+ORDER_FIELD = 'order'
+
+# Models with an order column, and the foreign key that scopes it (None: the whole table)
+ORDER_SCOPES = {
+    PropertySector: None,
+    PropertySectorProcess: 'property_sector',
+    ProjectPhoto: 'project',
+    ProjectService: 'project',
+    ProjectSolution: 'project',
+    NewsSection: 'news',
+    TeamSectionItem: 'team_section',
+    Service: None,
+    ServiceBenefit: 'service',
+    ServiceProcess: 'service',
+    ServiceWorkProcess: 'service',
+    PartnerLogo: 'partner',
+    WorkProcess: None,
+    Approach: None,
+}
+
+
+def scope_attname(model):
+    scope = ORDER_SCOPES[model]
+    return model._meta.get_field(scope).attname if scope else None
+
+
+def renumber(model, numbered_sql, params, ctes=''):
+    """
+    Apply ``numbered_sql`` (a query of ``row_id, new_order`` pairs, which may
+    read the comma-separated ``ctes``) to the table; returns {pk: order} for
+    the rows that changed.
+    """
+    opts = model._meta
+    quote = connection.ops.quote_name
+    table, pk, order = quote(opts.db_table), quote(opts.pk.column), quote(opts.get_field(ORDER_FIELD).column)
+    assignments = f'{order} = numbered.new_order'
+    fields = {field.name for field in opts.concrete_fields}
+    if 'updated_at' in fields:
+        assignments += f', {quote(opts.get_field("updated_at").column)} = %s'
+        params = [*params, timezone.now()]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH {ctes + ", " if ctes else ""}numbered AS ({numbered_sql}) '
+            f'UPDATE {table} SET {assignments} FROM numbered '
+            f'WHERE {table}.{pk} = numbered.row_id AND {table}.{order} <> numbered.new_order '
+            f'RETURNING {pk}, {order}',
+            params,
+        )
+        changed = dict(cursor.fetchall())
+    if changed:
+        scope = scope_attname(model)
+        objs = model._base_manager.filter(pk__in=changed).only(*(['pk', scope] if scope else ['pk']))
+        bulk_saved.send(sender=model, objs=list(objs))
+    return changed
+
+
+def move(model, pk, anchor, after=False):
+    """
+    Put row ``pk`` just before (or ``after``) row ``anchor``, which must be in
+    the same scope, and renumber the scope 1..n.  Returns {pk: order} of the
+    rows that changed.
+    """
+    opts = model._meta
+    quote = connection.ops.quote_name
+    table, pk_column, order = quote(opts.db_table), quote(opts.pk.column), quote(opts.get_field(ORDER_FIELD).column)
+    scope = ORDER_SCOPES[model]
+    where, params = f'{pk_column} <> %s', [pk]
+    if scope:
+        column = quote(opts.get_field(scope).column)
+        where += f' AND {column} = (SELECT {column} FROM {table} WHERE {pk_column} = %s)'
+        params.append(pk)
+    # The other rows keep their relative order; ``slot`` is the number of rows before the moved one
+    ctes = (
+        f'others AS ('
+        f'SELECT {pk_column} AS row_id, ROW_NUMBER() OVER (ORDER BY {order}, {pk_column}) AS position '
+        f'FROM {table} WHERE {where}'
+        f'), slot AS (SELECT position - %s AS value FROM others WHERE row_id = %s)'
+    )
+    numbered_sql = (
+        f'SELECT row_id, position + CASE WHEN position > (SELECT value FROM slot) THEN 1 ELSE 0 END AS new_order FROM others '
+        f'UNION ALL SELECT %s, (SELECT value FROM slot) + 1'
+    )
+    return renumber(model, numbered_sql, [*params, 0 if after else 1, anchor, pk], ctes)
+
+
+def compact(model):
+    """Renumber every scope of ``model`` 1..n, closing gaps and breaking ties by id."""
+    opts = model._meta
+    quote = connection.ops.quote_name
+    scope = ORDER_SCOPES[model]
+    partition = f'PARTITION BY {quote(opts.get_field(scope).column)} ' if scope else ''
+    numbered_sql = (
+        f'SELECT {quote(opts.pk.column)} AS row_id, ROW_NUMBER() OVER ('
+        f'{partition}ORDER BY {quote(opts.get_field(ORDER_FIELD).column)}, {quote(opts.pk.column)}'
+        f') AS new_order FROM {quote(opts.db_table)}'
+    )
+    return renumber(model, numbered_sql, [])
+
+
+class DragOrderMixin:
+    """
+    ModelAdmin mixin adding drag-and-drop ordering to the changelist (for
+    models in ORDER_SCOPES) and to inlines of such models, through the
+    ``reorder/`` endpoint.
+    """
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        urls = [
+            path('reorder/', self.admin_site.admin_view(self.reorder_view), name='%s_%s_reorder' % info),
+        ]
+        return urls + super().get_urls()
+
+    def changelist_drag_order(self, request):
+        """Rows can be dragged when the changelist shows the stored order."""
+        if self.model not in ORDER_SCOPES or ORDER_VAR in request.GET or not self.has_change_permission(request):
+            return False
+        scope = ORDER_SCOPES[self.model]
+        ordering = [name for name in self.get_ordering(request) if name.split('__')[0] != scope]
+        return ordering[:1] == [ORDER_FIELD]
+
+    def ordered_inlines(self, request, obj=None):
+        """{formset prefix: inline} of this admin's inlines for models in ORDER_SCOPES."""
+        return {
+            inline.get_formset(request, obj).get_default_prefix(): inline
+            for inline in self.get_inline_instances(request, obj)
+            if inline.model in ORDER_SCOPES
+        }
+
+    def changelist_view(self, request, extra_context=None):
+        if self.changelist_drag_order(request):
+            extra_context = {
+                'drag_order': {'url': reverse(f'{self.admin_site.name}:{self.reorder_url_name()}'), 'changelist': True},
+                **(extra_context or {}),
+            }
+        return super().changelist_view(request, extra_context)
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        inlines = self.ordered_inlines(request) if request.method == 'GET' else {}
+        if inlines:
+            extra_context = {
+                'drag_order': {
+                    'url': reverse(f'{self.admin_site.name}:{self.reorder_url_name()}'),
+                    'object_id': unquote(object_id),
+                    'inlines': sorted(inlines),
+                },
+                **(extra_context or {}),
+            }
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def reorder_url_name(self):
+        return '%s_%s_reorder' % (self.model._meta.app_label, self.model._meta.model_name)
+
+    @staticmethod
+    def reorder_error(message):
+        return HttpResponseBadRequest(message, content_type='text/plain')
+
+    def reorder_view(self, request):
+        """
+        POST ``id`` and ``before`` or ``after`` (the row it was dropped next
+        to); for an inline also ``inline`` (the formset prefix) and
+        ``object_id`` (this admin's object).  Answers {"orders": {pk: order}}.
+        """
+        if request.method != 'POST':
+            return HttpResponseNotAllowed(['POST'])
+        parent = None
+        if request.POST.get('inline'):
+            parent = self.get_object(request, unquote(request.POST.get('object_id', '')))
+            if parent is None:
+                raise Http404
+            inline = self.ordered_inlines(request, parent).get(request.POST['inline'])
+            if inline is None:
+                raise Http404
+            if not (self.has_change_permission(request, parent) and inline.has_change_permission(request, parent)):
+                raise PermissionDenied
+            model = inline.model
+        else:
+            if not self.changelist_drag_order(request):
+                raise PermissionDenied
+            model = self.model
+
+        after = 'after' in request.POST
+        try:
+            pk = model._meta.pk.to_python(request.POST['id'])
+            anchor = model._meta.pk.to_python(request.POST['after' if after else 'before'])
+        except (KeyError, ValidationError):
+            return self.reorder_error('Send the moved row as "id" and its new neighbour as "before" or "after".')
+        rows = model._base_manager.in_bulk([pk, anchor])
+        if pk == anchor or len(rows) != 2:
+            return self.reorder_error('Unknown rows.')
+        scope = scope_attname(model)
+        if scope and getattr(rows[pk], scope) != getattr(rows[anchor], scope):
+            return self.reorder_error(
+                f'Rows can only be moved within the same {model._meta.get_field(ORDER_SCOPES[model]).verbose_name}.'
+            )
+        if parent is not None and getattr(rows[pk], scope) != parent.pk:
+            raise Http404
+
+        with transaction.atomic():
+            orders = move(model, pk, anchor, after=after)
+            if orders:
+                if parent is None:
+                    self.log_change(request, rows[pk], [{'changed': {'fields': [ORDER_FIELD]}}])
+                else:
+                    self.log_change(request, parent, [{'changed': {
+                        'name': str(model._meta.verbose_name), 'object': str(rows[pk]), 'fields': [ORDER_FIELD],
+                    }}])
+        return JsonResponse({'orders': {str(key): value for key, value in orders.items()}})
@@ -0,0 +1,140 @@
+"""
+Transactional outbox of content changes for the public backend.
+
+With OUTBOX_ENABLED, every admin save or delete that touches a public
+entity (a project, sector, service or news item, including their inline
+rows) writes an ``OutboxEvent`` in the same transaction, so a notification
+exists exactly when the change was committed.  ``manage.py relay_outbox``
+delivers them to OUTBOX_ENDPOINT, which only the relay needs:
+
+- changes are coalesced per entity: an entity is sent once it has had no
+  new change for OUTBOX_COALESCE_SECONDS, or once its oldest undelivered
+  change has waited OUTBOX_MAX_DELAY_SECONDS, so a burst of edits becomes
+  one invalidation;
+- up to OUTBOX_BATCH_SIZE entities are POSTed to OUTBOX_ENDPOINT in one
+  request:
+
+    {"sent_at": "...", "invalidations": [
+        {"entity": "news", "id": 12, "changed_at": "...", "changes": 3}, ...]}
+
+- a 2xx response marks the events delivered; anything else leaves them
+  pending, counts the attempt and the relay retries with backoff, halving
+  its batches so an entity the endpoint rejects ends up in a batch of its
+  own;
+- once such a single entity has been rejected with a 4xx status
+  (other than 408 and 429) and has OUTBOX_MAX_ATTEMPTS attempts, its
+  events are moved aside (``failed_at``) so they stop blocking the rest.
+  5xx, 408 and 429 responses and connection errors mean the endpoint is
+  down or busy, not that the entity is bad: those are retried forever.
+"""
+import datetime
+import logging
+
+import requests
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, F, Max, Min, Q
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+
+# Only one relay delivers at a time (PostgreSQL advisory lock id)
+RELAY_LOCK_ID = 0x5DA0B0
+
+# Client errors that still say nothing about the payload: request timeout, rate limiting
+RETRY_STATUSES = {408, 429}
+
+logger = logging.getLogger(__name__)
+
+
+def record(keys):
+    """Write one event per (entity, pk); called from the signal handlers inside the saving transaction."""
+    if settings.OUTBOX_ENABLED and keys:
+        OutboxEvent.objects.bulk_create([OutboxEvent(entity=entity, object_id=pk) for entity, pk in sorted(keys)])
+
+
+def pending():
+    return OutboxEvent.objects.filter(delivered_at__isnull=True, failed_at__isnull=True)
+
+
+def ready_batch(now=None, limit=None):
+    """Entities whose pending changes are due, as dicts with entity, object_id, last, last_id, changes."""
+    now = now or timezone.now()
+    quiet_since = now - datetime.timedelta(seconds=settings.OUTBOX_COALESCE_SECONDS)
+    waiting_since = now - datetime.timedelta(seconds=settings.OUTBOX_MAX_DELAY_SECONDS)
+    return list(
+        pending()
+        .values('entity', 'object_id')
+        .annotate(first=Min('created_at'), last=Max('created_at'), last_id=Max('id'), changes=Count('id'))
+        .filter(Q(last__lte=quiet_since) | Q(first__lte=waiting_since))
+        .order_by('last_id')[:limit or settings.OUTBOX_BATCH_SIZE]
+    )
+
+
+def batch_events(batch):
+    """Pending events covered by ``batch``; later changes to the same entity stay pending."""
+    condition = Q()
+    for item in batch:
+        condition |= Q(entity=item['entity'], object_id=item['object_id'], id__lte=item['last_id'])
+    return pending().filter(condition)
+
+
+def payload(batch):
+    return {
+        'sent_at': timezone.now().isoformat(),
+        'invalidations': [
+            {'entity': item['entity'], 'id': item['object_id'], 'changed_at': item['last'].isoformat(), 'changes': item['changes']}
+            for item in batch
+        ],
+    }
+
+
+def rejected(response):
+    """Whether ``response`` refuses the payload itself, so sending it again cannot help."""
+    return response is not None and 400 <= response.status_code < 500 and response.status_code not in RETRY_STATUSES
+
+
+def deliver(batch, endpoint=None, timeout=10):
+    """POST one batch; marks its events delivered on success, records the error otherwise. Returns success."""
+    headers = {}
+    if settings.OUTBOX_TOKEN:
+        headers['Authorization'] = f'Bearer {settings.OUTBOX_TOKEN}'
+    events = batch_events(batch)
+    try:
+        response = requests.post(endpoint or settings.OUTBOX_ENDPOINT, json=payload(batch), headers=headers, timeout=timeout)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        events.update(attempts=F('attempts') + 1, last_error=str(e)[:1000])
+        if len(batch) == 1 and rejected(e.response):
+            moved = events.filter(attempts__gte=settings.OUTBOX_MAX_ATTEMPTS).update(failed_at=timezone.now())
+            if moved:
+                logger.warning(
+                    'Moved aside %d outbox event(s) of %s %s: %s',
+                    moved, batch[0]['entity'], batch[0]['object_id'], e,
+                )
+        return False
+    events.update(delivered_at=timezone.now(), attempts=F('attempts') + 1, last_error=None)
+    return True
+
+
+def retry_failed():
+    """Put the moved-aside events back in the queue with a fresh attempt count."""
+    return OutboxEvent.objects.filter(delivered_at__isnull=True, failed_at__isnull=False).update(
+        failed_at=None, attempts=0,
+    )
+
+
+def purge_delivered():
+    cutoff = timezone.now() - datetime.timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+    deleted, _ = OutboxEvent.objects.filter(delivered_at__lt=cutoff).delete()
+    return deleted
+
+
+def acquire_relay_lock():
+    """True when this process may relay; PostgreSQL only allows one relay per database."""
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [RELAY_LOCK_ID])
+        return cursor.fetchone()[0]
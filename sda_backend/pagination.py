@@ -0,0 +1,213 @@
+"""
+Constant-cost pagination for large admin changelists.
+
+Django's changelist runs ``SELECT COUNT(*)`` on every page load and pages
+with ``OFFSET``, so both get slower as ``contact_messages`` and ``news``
+grow and the deeper the page the slower it is.  ``KeysetPaginationMixin``
+replaces both:
+
+- counts above ``ADMIN_COUNT_ESTIMATE_THRESHOLD`` come from the planner
+  (``pg_class.reltuples`` for the whole table, the ``EXPLAIN`` row
+  estimate for a filtered list) and are shown as approximate;
+- pages are fetched by seeking past the last row shown, i.e.
+  ``WHERE (created_at, id) < (c, i) ORDER BY created_at DESC, id DESC LIMIT n``,
+  an index range scan (``create_admin_indexes`` adds the index) that costs
+  the same on page 1 and page 10 000.
+
+Keyset pages are used while the list is in its default order; sorting by
+another column, ``?p=N`` links and "Show all" keep the regular paginator.
+"""
+import functools
+import json
+
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+
+CURSOR_AFTER_VAR = 'after'
+CURSOR_BEFORE_VAR = 'before'
+CURSOR_VARS = (CURSOR_AFTER_VAR, CURSOR_BEFORE_VAR)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts PostgreSQL's row estimates for large result sets.
+
+    Below the threshold (and on other databases) the exact ``COUNT(*)`` is
+    used; ``estimated`` tells templates whether ``count`` is approximate.
+    """
+    estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate_count()
+        if estimate is not None and estimate >= settings.ADMIN_COUNT_ESTIMATE_THRESHOLD:
+            self.estimated = True
+            return estimate
+        return super().count
+
+    def estimate_count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or connections[queryset.db].vendor != 'postgresql':
+            return None
+        with connections[queryset.db].cursor() as cursor:
+            if not queryset.query.where and not queryset.query.distinct:
+                # Unfiltered list: the table size kept up to date by (auto)vacuum/analyze
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                # -1 (or 0 on older servers) means the table was never analyzed
+                return row[0] if row and row[0] > 0 else None
+
+            sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+def seek_filter(ordering, values, forward=True, inclusive=False):
+    """
+    Q selecting the rows after (``forward``) or before the row with ``values``
+    in ``ordering``, e.g. for ``('-created_at', '-pk')``::
+
+        created_at <= c AND (created_at < c OR (created_at = c AND id < i))
+
+    The redundant leading bound is what lets the planner start the index
+    scan at the cursor instead of filtering from the top of the index.
+    """
+    fields = [(name.lstrip('-'), value, 'lt' if name.startswith('-') == forward else 'gt')
+              for name, value in zip(ordering, values)]
+    condition = Q()
+    for position, (name, value, operator) in enumerate(fields):
+        if inclusive and position == len(fields) - 1:
+            operator += 'e'
+        equal = {prefix_name: prefix_value for prefix_name, prefix_value, _ in fields[:position]}
+        condition |= Q(**equal, **{'%s__%s' % (name, operator): value})
+    first_name, first_value, first_operator = fields[0]
+    return Q(**{'%s__%se' % (first_name, first_operator): first_value}) & condition
+
+
+def encode_cursor(values):
+    return ','.join(value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in values)
+
+
+class KeysetPage:
+    """One keyset page: the rows to show and the links around them."""
+
+    def __init__(self, changelist, object_list, first_key, last_key, has_previous, has_next):
+        self.object_list = object_list
+        self.has_previous = has_previous
+        self.has_next = has_next
+        remove = list(CURSOR_VARS)
+        self.first_url = changelist.get_query_string(remove=remove)
+        self.previous_url = changelist.get_query_string({CURSOR_BEFORE_VAR: encode_cursor(first_key)}, remove)
+        self.next_url = changelist.get_query_string({CURSOR_AFTER_VAR: encode_cursor(last_key)}, remove)
+
+
+class KeysetChangeListMixin:
+    """ChangeList mixin that pages the default ordering with a seek instead of OFFSET."""
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        for name in CURSOR_VARS:
+            lookup_params.pop(name, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Filter, sort and search links always start again from the first page
+        remove = [*(remove or ()), *CURSOR_VARS]
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.keyset_page = None
+
+        ordering = tuple(self.model_admin.keyset_ordering)
+        cursor_given = any(name in request.GET for name in CURSOR_VARS)
+        # ChangeList.get_ordering() repeats the ModelAdmin ordering already on the queryset
+        current_ordering = tuple(dict.fromkeys(self.queryset.query.order_by))
+        if (
+            current_ordering != ordering
+            or not self.multi_page
+            or (self.show_all and self.can_show_all)
+            or (PAGE_VAR in request.GET and not cursor_given)
+        ):
+            return
+        self.keyset_page = self.get_keyset_page(request, ordering)
+        self.result_list = self.keyset_page.object_list
+
+    def decode_cursor(self, raw, ordering):
+        parts = raw.split(',', len(ordering) - 1)
+        if len(parts) != len(ordering):
+            raise IncorrectLookupParameters('Invalid cursor: %s' % raw)
+        values = []
+        for name, part in zip(ordering, parts):
+            name = name.lstrip('-')
+            field = self.opts.pk if name == 'pk' else self.opts.get_field(name)
+            try:
+                values.append(field.to_python(part))
+            except ValidationError:
+                raise IncorrectLookupParameters('Invalid cursor: %s' % raw)
+        return values
+
+    def get_keyset_page(self, request, ordering):
+        per_page = self.list_per_page
+        key_names = [name.lstrip('-') for name in ordering]
+        after = request.GET.get(CURSOR_AFTER_VAR)
+        before = request.GET.get(CURSOR_BEFORE_VAR)
+
+        if before:
+            # Walk backwards from the cursor, then show that page in the normal order
+            cursor = self.decode_cursor(before, ordering)
+            keys = list(
+                self.queryset.filter(seek_filter(ordering, cursor, forward=False))
+                .reverse().values_list(*key_names)[:per_page + 1]
+            )
+            if len(keys) >= per_page:
+                page_keys = keys[:per_page][::-1]
+                object_list = self.queryset.filter(
+                    seek_filter(ordering, page_keys[0], inclusive=True)
+                )[:per_page]
+                return KeysetPage(self, object_list, page_keys[0], page_keys[-1], len(keys) > per_page, True)
+            after = None  # fewer rows than a page before the cursor: back at the start
+
+        queryset = self.queryset
+        if after:
+            queryset = queryset.filter(seek_filter(ordering, self.decode_cursor(after, ordering)))
+        keys = list(queryset.values_list(*key_names)[:per_page + 1])
+        page_keys = keys[:per_page] or [[None] * len(ordering)]
+        return KeysetPage(
+            self, queryset[:per_page], page_keys[0], page_keys[-1],
+            has_previous=bool(after), has_next=len(keys) > per_page,
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def keyset_changelist(changelist_class):
+    return type('Keyset%s' % changelist_class.__name__, (KeysetChangeListMixin, changelist_class), {})
+
+
+class KeysetPaginationMixin:
+    """
+    ModelAdmin mixin for large, append-mostly tables ordered by ``keyset_ordering``.
+
+    ``keyset_ordering`` must match the changelist's default ordering including
+    the ``-pk`` tie-breaker Django appends, and be backed by an index
+    (``manage.py create_admin_indexes`` creates it).
+    """
+    keyset_ordering = ('-created_at', '-pk')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return keyset_changelist(super().get_changelist(request, **kwargs))
@@ -0,0 +1,270 @@
+"""
+Denormalized per-language read models for the public site.
+
+Rendering a project page means joining ``projects``, ``project_photos``,
+``project_services``, ``project_solutions`` and ``property_sectors`` and
+resolving ``title_az`` -> ``title_en`` -> legacy ``title`` for every text
+field.  The admin does that work once, when content changes, and stores
+the result in ``content_read_models``: one JSON document per entity and
+language, found by ``(entity, language, object_id)`` or
+``(entity, language, slug)``.
+
+Saves and deletes are tracked by the signal handlers in ``signals.py``.
+Every change marks the documents that include the changed row: a photo
+marks its project, a sector marks itself and its projects, and so on.
+The marked documents are rebuilt once, when the transaction commits, so
+saving a project with twenty inline photos rebuilds it a single time.
+``manage.py rebuild_read_models`` rebuilds everything.
+"""
+import logging
+import threading
+
+from django.db import transaction
+from django.db.models import Prefetch, Q
+
+from .models import (
+    News, NewsSection, Project, ProjectPhoto, ProjectService, ProjectSolution, PropertySector,
+    PropertySectorProcess, ReadModel, Service, ServiceBenefit, ServiceProcess, ServiceWorkProcess,
+)
+
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = ('en', 'az', 'ru')
+FALLBACK_LANGUAGE = 'en'
+LANGUAGE_SUFFIXES = tuple(f'_{language}' for language in LANGUAGES)
+
+
+def localize(obj, language):
+    """
+    Plain fields of ``obj`` as a dict, with every ``<name>_<lang>`` group
+    collapsed into ``<name>``: the requested language, then English, then
+    the legacy unsuffixed column.
+    """
+    fields = [field for field in obj._meta.concrete_fields if not field.is_relation]
+    document = {
+        field.name: field.value_from_object(obj)
+        for field in fields if not field.name.endswith(LANGUAGE_SUFFIXES)
+    }
+    for base in {field.name[:-3] for field in fields if field.name.endswith(LANGUAGE_SUFFIXES)}:
+        document[base] = (
+            getattr(obj, f'{base}_{language}', None)
+            or getattr(obj, f'{base}_{FALLBACK_LANGUAGE}', None)
+            or getattr(obj, base, None)
+        )
+    return document
+
+
+def project_summary(project, language):
+    if project is None:
+        return None
+    document = localize(project, language)
+    return {key: document[key] for key in ('id', 'slug', 'title', 'cover_photo_url', 'year')}
+
+
+class Builder:
+    """Builds the documents of one entity; subclasses add related rows."""
+    entity = None
+    model = None
+
+    def queryset(self):
+        return self.model._base_manager.all()
+
+    def document(self, obj, language):
+        return localize(obj, language)
+
+    def build(self, pks):
+        """ReadModel rows (not saved) for the objects among ``pks`` that exist."""
+        rows = []
+        for obj in self.queryset().filter(pk__in=pks):
+            for language in LANGUAGES:
+                rows.append(ReadModel(
+                    entity=self.entity, object_id=obj.pk, language=language,
+                    slug=getattr(obj, 'slug', None), document=self.document(obj, language),
+                ))
+        return rows
+
+
+class ProjectBuilder(Builder):
+    entity = 'project'
+    model = Project
+
+    def queryset(self):
+        return super().queryset().select_related('property_sector').prefetch_related(
+            Prefetch('photos', queryset=ProjectPhoto.objects.order_by('order', 'pk')),
+            Prefetch('solutions', queryset=ProjectSolution.objects.order_by('order', 'pk')),
+            Prefetch('projectservice_set', queryset=ProjectService.objects.select_related('service').order_by('order', 'pk')),
+        )
+
+    def document(self, project, language):
+        document = super().document(project, language)
+        sector = project.property_sector
+        document['property_sector'] = sector and {
+            key: value for key, value in localize(sector, language).items() if key in ('id', 'title', 'order')
+        }
+        document['photos'] = [{'image_url': photo.image_url, 'order': photo.order} for photo in project.photos.all()]
+        document['solutions'] = [localize(solution, language) for solution in project.solutions.all()]
+        document['services'] = [
+            {key: value for key, value in localize(link.service, language).items() if key in ('id', 'slug', 'name', 'image_url')}
+            for link in project.projectservice_set.all()
+        ]
+        return document
+
+
+class PropertySectorBuilder(Builder):
+    entity = 'property_sector'
+    model = PropertySector
+
+    def queryset(self):
+        return super().queryset().select_related(
+            'featured_project_1', 'featured_project_2', 'featured_project_3',
+        ).prefetch_related(
+            Prefetch('process_steps', queryset=PropertySectorProcess.objects.order_by('order', 'pk')),
+        )
+
+    def document(self, sector, language):
+        document = super().document(sector, language)
+        document['process_steps'] = [localize(step, language) for step in sector.process_steps.all()]
+        document['featured_projects'] = [
+            project_summary(project, language)
+            for project in (sector.featured_project_1, sector.featured_project_2, sector.featured_project_3)
+            if project is not None
+        ]
+        return document
+
+
+class ServiceBuilder(Builder):
+    entity = 'service'
+    model = Service
+
+    def queryset(self):
+        return super().queryset().select_related('featured_project_1', 'featured_project_2').prefetch_related(
+            Prefetch('benefits', queryset=ServiceBenefit.objects.order_by('order', 'pk')),
+            Prefetch('process_steps', queryset=ServiceProcess.objects.order_by('order', 'pk')),
+            Prefetch('work_process_steps', queryset=ServiceWorkProcess.objects.order_by('order', 'pk')),
+        )
+
+    def document(self, service, language):
+        document = super().document(service, language)
+        for name in ('benefits', 'process_steps', 'work_process_steps'):
+            document[name] = [localize(item, language) for item in getattr(service, name).all()]
+        document['featured_projects'] = [
+            project_summary(project, language)
+            for project in (service.featured_project_1, service.featured_project_2)
+            if project is not None
+        ]
+        return document
+
+
+class NewsBuilder(Builder):
+    entity = 'news'
+    model = News
+
+    def queryset(self):
+        return super().queryset().prefetch_related(
+            Prefetch('sections', queryset=NewsSection.objects.order_by('order', 'pk')),
+        )
+
+    def document(self, news, language):
+        document = super().document(news, language)
+        document['sections'] = [localize(section, language) for section in news.sections.all()]
+        return document
+
+
+BUILDERS = {builder.entity: builder for builder in (ProjectBuilder(), PropertySectorBuilder(), ServiceBuilder(), NewsBuilder())}
+
+
+# Models whose rows appear in some document
+TRACKED_MODELS = (
+    Project, ProjectPhoto, ProjectSolution, ProjectService, PropertySector, PropertySectorProcess,
+    Service, ServiceBenefit, ServiceProcess, ServiceWorkProcess, News, NewsSection,
+)
+
+
+def affected_documents(model, instances):
+    """(entity, pk) pairs whose documents include one of ``instances``, all of ``model``."""
+    pks = [instance.pk for instance in instances]
+    if issubclass(model, Project):
+        featured = Q(featured_project_1__in=pks) | Q(featured_project_2__in=pks)
+        return [
+            *(('project', pk) for pk in pks),
+            *(('property_sector', pk) for pk in PropertySector._base_manager.filter(
+                featured | Q(featured_project_3__in=pks)).values_list('pk', flat=True)),
+            *(('service', pk) for pk in Service._base_manager.filter(featured).values_list('pk', flat=True)),
+        ]
+    if issubclass(model, (ProjectPhoto, ProjectSolution, ProjectService)):
+        return [('project', instance.project_id) for instance in instances]
+    if issubclass(model, PropertySector):
+        return [*(('property_sector', pk) for pk in pks), *(
+            ('project', pk) for pk in Project._base_manager.filter(property_sector__in=pks).values_list('pk', flat=True)
+        )]
+    if issubclass(model, PropertySectorProcess):
+        return [('property_sector', instance.property_sector_id) for instance in instances]
+    if issubclass(model, Service):
+        return [*(('service', pk) for pk in pks), *(
+            ('project', pk) for pk in ProjectService._base_manager.filter(service__in=pks).values_list('project_id', flat=True)
+        )]
+    if issubclass(model, (ServiceBenefit, ServiceProcess, ServiceWorkProcess)):
+        return [('service', instance.service_id) for instance in instances]
+    if issubclass(model, News):
+        return [('news', pk) for pk in pks]
+    if issubclass(model, NewsSection):
+        return [('news', instance.news_id) for instance in instances]
+    return []
+
+
+# Documents marked in the current thread, rebuilt when the transaction commits
+_pending = threading.local()
+
+
+def document_keys(instances):
+    """Every (entity, pk) whose document includes one of ``instances``, with one query per model and relation."""
+    by_model = {}
+    for instance in instances:
+        by_model.setdefault(type(instance), []).append(instance)
+    return {
+        key for model, group in by_model.items()
+        for key in affected_documents(model, group) if key[1] is not None
+    }
+
+
+def mark(keys):
+    """Schedule a rebuild of the documents ``keys`` (see ``document_keys``)."""
+    if not keys:
+        return
+    if not hasattr(_pending, 'keys'):
+        _pending.keys = set()
+    _pending.keys |= keys
+    # In autocommit mode this runs immediately; a rolled-back transaction leaves
+    # its keys behind, which are simply rebuilt with the next commit
+    transaction.on_commit(publish_pending)
+
+
+def publish_pending():
+    keys = getattr(_pending, 'keys', None)
+    if not keys:
+        return
+    _pending.keys = set()
+    by_entity = {}
+    for entity, pk in keys:
+        by_entity.setdefault(entity, set()).add(pk)
+    try:
+        for entity, pks in by_entity.items():
+            publish(entity, pks)
+    except Exception:
+        # The content is saved either way; rebuild_read_models repairs the documents
+        logger.exception('Updating read models failed for %s', sorted(keys))
+
+
+def publish(entity, pks):
+    """Rebuild the documents of ``pks``, removing those whose object no longer exists."""
+    rows = BUILDERS[entity].build(pks)
+    with transaction.atomic():
+        if rows:
+            ReadModel.objects.bulk_create(
+                rows, update_conflicts=True,
+                unique_fields=['entity', 'language', 'object_id'],
+                update_fields=['slug', 'document', 'updated_at'],
+            )
+        ReadModel.objects.filter(entity=entity, object_id__in=set(pks) - {row.object_id for row in rows}).delete()
+    return len(rows)
@@ -0,0 +1,101 @@
+"""
+Batch resolution of project IDs and slugs for featured-project form fields.
+
+A sector form used to look up each of its three featured projects with a
+separate ``Project.objects.get()`` when it was built and again for each
+slug when it was cleaned.  ``ProjectResolver`` answers all of those
+lookups with at most one ``filter(Q(id__in=...) | Q(slug__in=...))``
+query:
+
+- a per-resolver memo (one resolver per form, i.e. per request) so the
+  same ID or slug is never looked up twice while handling a request;
+- a process-wide LRU shared by all requests in a worker, whose entries
+  carry the project-choices version and are ignored once a project has
+  been saved or deleted (see ``choices.py``).
+
+Lookups that decide what gets saved pass ``fresh=True`` to skip the LRU.
+"""
+import threading
+from collections import OrderedDict
+
+from django.db.models import Q
+
+from .cache import get_version
+from .choices import PROJECT_CHOICES_VERSION_KEY
+from .models import Project
+
+
+LRU_SIZE = 1024
+
+_lru = OrderedDict()  # ('id', pk) / ('slug', slug) -> (version, (pk, slug))
+_lru_lock = threading.Lock()
+
+
+def _lru_get(key, version):
+    with _lru_lock:
+        entry = _lru.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        _lru.move_to_end(key)
+        return entry[1]
+
+
+def _lru_put(key, version, value):
+    with _lru_lock:
+        _lru[key] = (version, value)
+        _lru.move_to_end(key)
+        while len(_lru) > LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+class ProjectResolver:
+    """Resolve project IDs to slugs and slugs to IDs in one query per batch."""
+
+    def __init__(self):
+        self._memo = {}
+        self._version = None
+
+    @property
+    def version(self):
+        if self._version is None:
+            self._version = get_version(PROJECT_CHOICES_VERSION_KEY)
+        return self._version
+
+    def resolve(self, ids=(), slugs=(), fresh=False):
+        """
+        Return ``(slug_by_id, id_by_slug)`` for the given IDs and slugs.
+        Unknown IDs and slugs are left out of the result.
+        """
+        keys = {('id', int(pk)) for pk in ids if pk} | {('slug', slug) for slug in slugs if slug}
+
+        missing = set()
+        for key in keys:
+            if key in self._memo:
+                continue
+            cached = None if fresh else _lru_get(key, self.version)
+            if cached is not None:
+                self._memo[key] = cached
+            else:
+                missing.add(key)
+
+        if missing:
+            for key in missing:
+                self._memo[key] = None  # remembered as not found unless the query returns it
+            query = Q(id__in=[value for kind, value in missing if kind == 'id'])
+            query |= Q(slug__in=[value for kind, value in missing if kind == 'slug'])
+            for pk, slug in Project.objects.filter(query).order_by().values_list('id', 'slug'):
+                for key in (('id', pk), ('slug', slug)):
+                    self._memo[key] = (pk, slug)
+                    _lru_put(key, self.version, (pk, slug))
+
+        slug_by_id, id_by_slug = {}, {}
+        for key in keys:
+            found = self._memo.get(key)
+            if found is None:
+                continue
+            pk, slug = found
+            if key[0] == 'id':
+                slug_by_id[pk] = slug
+            else:
+                id_by_slug[slug] = pk
+        return slug_by_id, id_by_slug
@@ -0,0 +1,269 @@
+"""
+Resumable chunked uploads.
+
+A single multipart POST of a 50 MB gallery photo fails as a whole when the
+connection drops and has to start again from zero.  The upload widget
+(``widgets.ResumableFileInput``) instead sends the file in chunks to
+``views.upload_sessions`` / ``views.upload_session`` before the form is
+submitted:
+
+    POST   /admin/uploads/        {"filename", "size", "field"} -> {"id", "token", "offset", "chunk_size"}
+    GET    /admin/uploads/<id>/   -> {"offset", "complete"}  (where to resume)
+    PUT    /admin/uploads/<id>/   Content-Range: bytes <start>-<end>/<size>
+                                  X-Chunk-SHA256: <hex digest of the chunk>
+    DELETE /admin/uploads/<id>/
+
+A session is two files in ``MEDIA_ROOT/.incoming/sessions/``: the data
+received so far and a JSON record holding the verified offset.  A chunk is
+only counted once its checksum matches, so a chunk cut off mid-way is
+simply sent again.  When the last chunk arrives the content is hashed and
+checked like a streamed upload; the form then submits the signed session
+token instead of the file and ``save_uploaded_file`` renames the data file
+into place.  ``manage.py cleanup_uploads`` removes abandoned sessions.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.template.defaultfilters import filesizeformat
+
+from .storage import INCOMING_DIR
+from .uploadhandlers import IMAGE_EXTENSIONS, NOT_AN_IMAGE, StreamedUploadedFile, field_max_size, image_format
+
+
+SESSIONS_DIR = 'sessions'
+TOKEN_SALT = 'sda_backend.resumable'
+UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """A request the upload endpoint refuses; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def sessions_dir():
+    path = os.path.join(settings.MEDIA_ROOT, INCOMING_DIR, SESSIONS_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class ResumableUploadedFile(StreamedUploadedFile):
+    """A completed session handed to a form; kept on close so a form re-submitted after errors can reuse it."""
+
+    def __init__(self, session):
+        super().__init__(
+            session.data_path, session.meta['filename'], session.meta['content_type'], session.meta['size'],
+            None, sha256=session.meta['sha256'],
+        )
+        self.upload_token = session.token()
+
+    def close(self):
+        return self.file.close()
+
+
+class UploadSession:
+    def __init__(self, upload_id, meta):
+        self.id = upload_id
+        self.meta = meta
+
+    @property
+    def data_path(self):
+        return os.path.join(sessions_dir(), f'{self.id}.part')
+
+    @property
+    def meta_path(self):
+        return os.path.join(sessions_dir(), f'{self.id}.json')
+
+    @property
+    def offset(self):
+        return self.meta['offset']
+
+    @property
+    def complete(self):
+        return self.meta['sha256'] is not None
+
+    @classmethod
+    def create(cls, user, field, filename, size, content_type=''):
+        filename = os.path.basename(filename or '')
+        if not filename:
+            raise UploadError('A file name is required.')
+        if not isinstance(size, int) or size <= 0:
+            raise UploadError('The file size must be a positive number of bytes.')
+        max_size = field_max_size(field or '')
+        if size > max_size:
+            raise UploadError(
+                f'The file is larger than the {filesizeformat(max_size)} allowed for this field.', status=413,
+            )
+        if os.path.splitext(filename)[1].lower() not in IMAGE_EXTENSIONS:
+            raise UploadError(NOT_AN_IMAGE)
+
+        session = cls(uuid.uuid4().hex, {
+            'user': user.pk,
+            'field': field,
+            'filename': filename,
+            'content_type': content_type or 'application/octet-stream',
+            'size': size,
+            'offset': 0,
+            'sha256': None,
+            'created': time.time(),
+        })
+        open(session.data_path, 'xb').close()
+        session.save_meta()
+        return session
+
+    @classmethod
+    def load(cls, upload_id, user=None):
+        if not UPLOAD_ID_RE.match(upload_id or ''):
+            raise UploadError('Unknown upload.', status=404)
+        session = cls(upload_id, None)
+        try:
+            with open(session.meta_path) as meta_file:
+                session.meta = json.load(meta_file)
+        except (OSError, ValueError):
+            raise UploadError('Unknown upload.', status=404)
+        if user is not None and session.meta['user'] != user.pk:
+            raise UploadError('Unknown upload.', status=404)
+        return session
+
+    @classmethod
+    def from_token(cls, token, user, field):
+        """
+        The finished session a form submitted for ``field``.  Only ``user``'s
+        own sessions are accepted, and the size is checked again against the
+        limit of the field the file is used for, not the one the client named.
+        """
+        try:
+            session = cls.load(signing.Signer(salt=TOKEN_SALT).unsign(token))
+        except (signing.BadSignature, UploadError):
+            session = None
+        if session is None or user is None or session.meta['user'] != user.pk:
+            raise UploadError('The upload is not valid, please choose the file again.')
+        if not session.complete or not os.path.exists(session.data_path):
+            raise UploadError('The upload did not finish, please choose the file again.')
+        max_size = field_max_size(field)
+        if session.meta['size'] > max_size:
+            raise UploadError(
+                f'The file is larger than the {filesizeformat(max_size)} allowed for this field.', status=413,
+            )
+        return session
+
+    def token(self):
+        return signing.Signer(salt=TOKEN_SALT).sign(self.id)
+
+    def save_meta(self):
+        self.meta['updated'] = time.time()
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as meta_file:
+            json.dump(self.meta, meta_file)
+        os.replace(tmp_path, self.meta_path)
+
+    def status(self):
+        return {
+            'id': self.id,
+            'offset': self.offset,
+            'size': self.meta['size'],
+            'complete': self.complete,
+            'chunk_size': settings.UPLOAD_CHUNK_SIZE,
+        }
+
+    def receive_chunk(self, stream, content_range, checksum=None):
+        """Append one chunk read from ``stream``; returns the new offset."""
+        match = CONTENT_RANGE_RE.match(content_range or '')
+        if not match:
+            raise UploadError('Content-Range must look like "bytes <start>-<end>/<size>".')
+        start, end, total = (int(value) for value in match.groups())
+        length = end - start + 1
+        if total != self.meta['size'] or end >= total or length <= 0:
+            raise UploadError('Content-Range does not match the upload.', status=416)
+        if length > settings.UPLOAD_CHUNK_SIZE:
+            raise UploadError(f'Chunks may be at most {settings.UPLOAD_CHUNK_SIZE} bytes.', status=413)
+        if self.complete:
+            raise UploadError('The upload is already complete.', status=409)
+
+        with open(self.data_path, 'r+b') as data:
+            try:
+                fcntl.flock(data, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError('Another request is writing this upload.', status=409)
+            # Re-read under the lock: a concurrent request may have moved the offset
+            self.meta = type(self).load(self.id).meta
+            if start != self.offset:
+                raise UploadError(f'Expected the chunk starting at byte {self.offset}.', status=409)
+
+            # Bytes past the verified offset belong to a chunk that was cut off
+            data.truncate(self.offset)
+            data.seek(self.offset)
+            digest = hashlib.sha256()
+            remaining = length
+            while remaining:
+                block = stream.read(min(READ_SIZE, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                data.write(block)
+                remaining -= len(block)
+            if remaining or (checksum and checksum.lower() != digest.hexdigest()):
+                data.truncate(self.offset)
+                raise UploadError('The chunk was incomplete or its checksum did not match; send it again.', status=422)
+            data.flush()
+            os.fsync(data.fileno())
+
+            self.meta['offset'] = end + 1
+            if self.meta['offset'] == self.meta['size']:
+                self.finish(data)
+            self.save_meta()
+        return self.offset
+
+    def finish(self, data):
+        data.seek(0)
+        if image_format(data.read(12)) is None:
+            self.delete()
+            raise UploadError(NOT_AN_IMAGE)
+        data.seek(0)
+        digest = hashlib.sha256()
+        for block in iter(lambda: data.read(READ_SIZE), b''):
+            digest.update(block)
+        self.meta['sha256'] = digest.hexdigest()
+        os.chmod(self.data_path, 0o644)
+
+    def uploaded_file(self):
+        return ResumableUploadedFile(self)
+
+    def delete(self):
+        for path in (self.data_path, self.meta_path):
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def expired_sessions(max_age):
+    """Sessions not written to for ``max_age`` seconds, plus files left without their partner."""
+    cutoff = time.time() - max_age
+    root = sessions_dir()
+    names = os.listdir(root)
+    ids = {name.split('.', 1)[0] for name in names}
+    for upload_id in sorted(ids):
+        meta_path = os.path.join(root, f'{upload_id}.json')
+        data_path = os.path.join(root, f'{upload_id}.part')
+        paths = [os.path.join(root, name) for name in names if name.split('.', 1)[0] == upload_id]
+        if os.path.exists(meta_path) and os.path.exists(data_path):
+            try:
+                with open(meta_path) as meta_file:
+                    updated = json.load(meta_file).get('updated', 0)
+            except (OSError, ValueError):
+                updated = 0
+        else:
+            # Data already renamed into place by a saved form, or a half-created session
+            updated = max(os.path.getmtime(path) for path in paths)
+        if updated < cutoff:
+            yield upload_id, paths
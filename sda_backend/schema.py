@@ -0,0 +1,49 @@
+"""
+The content schema as the maintenance commands see it.
+
+The content tables belong to the FastAPI backend (``managed = False``);
+snapshots, read-model rebuilds, order compaction and the benchmarks all
+walk them through these helpers, which also know which of them exist on
+the current database.
+"""
+from django.apps import apps
+from django.contrib.postgres.fields import ArrayField
+from django.db import connection
+
+
+def sda_models():
+    """The content models; tables the admin manages itself (read models) are derived data."""
+    return [model for model in apps.get_app_config('sda_backend').get_models() if not model._meta.managed]
+
+
+def supported(model):
+    """
+    ArrayField columns (News.tags) only exist on PostgreSQL; elsewhere those
+    models are skipped, along with models that require a row of them.
+    """
+    if connection.vendor == 'postgresql':
+        return True
+    if any(isinstance(field, ArrayField) for field in model._meta.concrete_fields):
+        return False
+    return all(
+        supported(field.related_model) for field in model._meta.concrete_fields
+        if field.is_relation and not field.null and field.related_model is not model
+    )
+
+
+def load_order(models_to_load):
+    """Order models so required foreign keys point at already loaded tables."""
+    ordered, pending = [], list(models_to_load)
+    while pending:
+        for model in pending:
+            required = {
+                field.related_model for field in model._meta.concrete_fields
+                if field.is_relation and not field.null and field.related_model is not model
+            }
+            if required <= set(ordered) | (set(sda_models()) - set(models_to_load)):
+                ordered.append(model)
+                pending.remove(model)
+                break
+        else:
+            raise RuntimeError(f'Circular required foreign keys between {pending}')
+    return ordered
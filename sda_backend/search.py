@@ -0,0 +1,154 @@
+"""
+PostgreSQL full-text and trigram search for the admin changelists.
+
+Multilingual text columns are matched against expression ``tsvector``
+indexes (English and Russian stemming, the ``simple`` configuration for
+Azerbaijani and legacy columns).  Identifier-like columns such as emails,
+phone numbers and slugs keep substring matching, backed by ``pg_trgm``
+indexes.  The indexes are created by ``manage.py create_admin_indexes``;
+the SQL used there and the SQL used here come from the same helpers so
+the planner can match the query against the index expression.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+
+# Column suffix -> PostgreSQL text search configuration
+SEARCH_CONFIGS = {
+    '_en': 'english',
+    '_ru': 'russian',
+}
+# Azerbaijani has no built-in stemmer, so it shares the simple config with legacy columns
+DEFAULT_SEARCH_CONFIG = 'simple'
+
+SEARCH_WORD_RE = re.compile(r'\w+')
+
+
+def quote_name(name):
+    return '"%s"' % name.replace('"', '""')
+
+
+def search_config(column):
+    """Return the text search configuration for a column name."""
+    for suffix, config in SEARCH_CONFIGS.items():
+        if column.endswith(suffix):
+            return config
+    return DEFAULT_SEARCH_CONFIG
+
+
+def group_search_columns(model, field_names):
+    """
+    Group concrete column names by text search configuration.
+    Lookups across relations and prefixed search fields are skipped.
+    """
+    groups = {}
+    for field_name in field_names:
+        if '__' in field_name or field_name[:1] in ('^', '=', '@'):
+            continue
+        column = model._meta.get_field(field_name).column
+        groups.setdefault(search_config(column), []).append(column)
+    return groups
+
+
+def tsvector_sql(columns, config, table=None):
+    """SQL for the tsvector expression shared by queries and indexes."""
+    prefix = '%s.' % quote_name(table) if table else ''
+    document = " || ' ' || ".join(
+        "coalesce(%s%s, '')" % (prefix, quote_name(column)) for column in columns
+    )
+    return "to_tsvector('%s'::regconfig, %s)" % (config, document)
+
+
+def trigram_sql(column, table=None):
+    """SQL for the expression Django's ``icontains`` compares against."""
+    prefix = '%s.' % quote_name(table) if table else ''
+    return 'upper((%s%s)::text)' % (prefix, quote_name(column))
+
+
+def build_tsquery(search_term):
+    """
+    Turn free text into a prefix tsquery, e.g. ``"baku off"`` -> ``"baku:* & off:*"``.
+    Only word characters are kept so user input cannot break the tsquery syntax.
+    """
+    return ' & '.join('%s:*' % word for word in SEARCH_WORD_RE.findall(search_term))
+
+
+def index_name(kind, table, suffix):
+    name = 'sda_admin_%s_%s_%s' % (kind, table, suffix)
+    if len(name) > 63:
+        digest = hashlib.md5(name.encode()).hexdigest()[:8]
+        name = '%s_%s' % (name[:54], digest)
+    return name
+
+
+def fulltext_enabled(using):
+    return (
+        getattr(settings, 'ADMIN_SEARCH_BACKEND', 'fulltext') == 'fulltext'
+        and connections[using].vendor == 'postgresql'
+    )
+
+
+class RankedChangeList(ChangeList):
+    """Order search results by relevance unless a column sort was picked."""
+
+    def get_ordering(self, request, queryset):
+        if self.query and ORDER_VAR not in self.params and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', '-pk']
+        return super().get_ordering(request, queryset)
+
+
+class FullTextSearchMixin:
+    """
+    Replace the ``ILIKE`` chain built from ``search_fields`` with indexed search.
+
+    Fields listed in ``trigram_search_fields`` keep substring matching (and get
+    trigram indexes); every other plain field in ``search_fields`` is matched
+    with full-text search and contributes to the ``search_rank`` annotation.
+    Falls back to Django's default search on other databases or when
+    ``ADMIN_SEARCH_BACKEND`` is not ``fulltext``.
+    """
+    trigram_search_fields = ()
+
+    def get_changelist(self, request, **kwargs):
+        return RankedChangeList
+
+    def get_fulltext_search_columns(self, request):
+        fields = [
+            name for name in self.get_search_fields(request)
+            if name not in self.trigram_search_fields
+        ]
+        return group_search_columns(self.model, fields)
+
+    def get_search_results(self, request, queryset, search_term):
+        tsquery = build_tsquery(search_term)
+        groups = self.get_fulltext_search_columns(request)
+        if not tsquery or not (groups or self.trigram_search_fields) or not fulltext_enabled(queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+
+        table = self.model._meta.db_table
+        match_sql, rank_sql = [], []
+        for config, columns in groups.items():
+            vector = tsvector_sql(columns, config, table)
+            tsquery_sql = "to_tsquery('%s'::regconfig, %%s)" % config
+            match_sql.append('%s @@ %s' % (vector, tsquery_sql))
+            rank_sql.append('ts_rank(%s, %s)' % (vector, tsquery_sql))
+
+        condition = Q()
+        if match_sql:
+            params = [tsquery] * len(match_sql)
+            queryset = queryset.alias(
+                search_match=RawSQL('(%s)' % ' OR '.join(match_sql), params, output_field=BooleanField()),
+            ).annotate(
+                search_rank=RawSQL(' + '.join(rank_sql), params, output_field=FloatField()),
+            )
+            condition |= Q(search_match=True)
+        for field_name in self.trigram_search_fields:
+            condition |= Q(**{'%s__icontains' % field_name: search_term.strip()})
+
+        return queryset.filter(condition), False
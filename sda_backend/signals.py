@@ -0,0 +1,67 @@
+"""
+Signal handlers that keep the admin's cached data, the read models and the
+change outbox in sync with the database.
+"""
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import Signal
+
+from . import outbox, read_models
+from .cache import invalidate_app_lists
+from .choices import invalidate_project_choices
+from .models import Project
+
+
+# Sent by code that writes rows with bulk_create()/bulk_update(), which send no
+# post_save: sender is the model, ``objs`` the saved instances
+bulk_saved = Signal()
+
+
+def connect():
+    # The admin app list depends on the user's staff/superuser flags and permissions
+    for sender in (User, Group):
+        post_save.connect(app_list_changed, sender=sender, dispatch_uid=f'app_list_save_{sender.__name__}')
+        post_delete.connect(app_list_changed, sender=sender, dispatch_uid=f'app_list_delete_{sender.__name__}')
+    for through in (User.groups.through, User.user_permissions.through, Group.permissions.through):
+        m2m_changed.connect(app_list_changed, sender=through, dispatch_uid=f'app_list_m2m_{through.__name__}')
+
+    post_save.connect(project_changed, sender=Project, dispatch_uid='project_choices_save')
+    post_delete.connect(project_changed, sender=Project, dispatch_uid='project_choices_delete')
+    bulk_saved.connect(project_changed, sender=Project, dispatch_uid='project_choices_bulk')
+
+    # Content changes: read model rebuilds and outbox notifications
+    for sender in read_models.TRACKED_MODELS:
+        post_save.connect(content_saved, sender=sender, dispatch_uid=f'content_save_{sender.__name__}')
+        # Before the delete, while the rows that point at the instance can still be found
+        pre_delete.connect(content_deleted, sender=sender, dispatch_uid=f'content_delete_{sender.__name__}')
+        bulk_saved.connect(content_bulk_saved, sender=sender, dispatch_uid=f'content_bulk_{sender.__name__}')
+
+
+def app_list_changed(sender, **kwargs):
+    if sender is User and kwargs.get('update_fields') == frozenset({'last_login'}):
+        return  # every login saves the user
+    invalidate_app_lists()
+
+
+def project_changed(sender, **kwargs):
+    invalidate_project_choices()
+
+
+def content_saved(sender, instance, raw=False, **kwargs):
+    if not raw:  # fixtures are loaded as they are; run rebuild_read_models afterwards
+        content_changed([instance])
+
+
+def content_deleted(sender, instance, **kwargs):
+    content_changed([instance])
+
+
+def content_bulk_saved(sender, objs, **kwargs):
+    content_changed(objs)
+
+
+def content_changed(instances):
+    keys = read_models.document_keys(instances)
+    # Written in the saving transaction: the notification exists exactly when the change does
+    outbox.record(keys)
+    read_models.mark(keys)
@@ -0,0 +1,329 @@
+"""
+Content snapshots for moving the site's content between environments.
+
+A snapshot is a tar archive (gzip-compressed for ``.tar.gz``/``.tgz``)
+holding every FastAPI-owned ``sda_backend`` table plus the uploaded media
+the rows refer to:
+
+    snapshot.json                         format, version and the columns of each model
+    data/sda_backend.propertysector/00000.jsonl
+    data/sda_backend.project/00000.jsonl  rows as JSON arrays, CHUNK_ROWS per file
+    data/sda_backend.project/00001.jsonl
+    ...
+    media/blobs/3f/a2/3fa2...c9.jpg       originals; renditions are rebuilt
+
+Tables are written in foreign-key order (sectors -> projects -> photos,
+solutions and service links; news -> sections; ...) so a snapshot can be
+loaded while it is read as a stream.  Rows are read with server-side
+cursors inside a REPEATABLE READ transaction on PostgreSQL, so the snapshot
+is consistent, and loaded with ``COPY`` (``pgcopy.py``; batched ``INSERT``s
+on other databases).  Nullable foreign keys pointing at a table loaded
+later (a sector's featured projects) are filled in once all rows are in.
+Chunks are JSON Lines, or MessagePack with ``msgpack`` installed.
+
+Loading sends no model signals, so ``load`` records an outbox event for
+every public document, loaded or replaced, in the same transaction; the
+read models are rebuilt afterwards (``load_content`` runs
+``rebuild_read_models``).
+"""
+import datetime
+import decimal
+import filecmp
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import outbox
+from .images import media_path, uploaded_media_urls
+from .models import ReadModel
+from .pgcopy import load_rows
+from .read_models import BUILDERS
+from .schema import load_order, sda_models, supported
+from .storage import BLOBS_DIR
+
+
+SNAPSHOT_VERSION = 1
+MANIFEST_NAME = 'snapshot.json'
+DATA_DIR = 'data'
+MEDIA_DIR = 'media'
+CHUNK_ROWS = 10000
+FORMATS = ('jsonl', 'msgpack')
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def content_models():
+    """Models whose tables belong to the FastAPI backend, in foreign-key load order."""
+    return load_order([model for model in sda_models() if supported(model)])
+
+
+def columns(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
+
+
+def get_codec(fmt):
+    """(encode rows -> bytes, decode file -> rows) for a chunk format."""
+    if fmt == 'jsonl':
+        def encode(rows):
+            return ''.join(json.dumps(row, default=encode_value, ensure_ascii=False) + '\n' for row in rows).encode()
+
+        def decode(f):
+            return (json.loads(line) for line in f)
+        return encode, decode
+    if fmt == 'msgpack':
+        try:
+            import msgpack
+        except ImportError:
+            raise SnapshotError('MessagePack snapshots require msgpack (pip install msgpack)')
+
+        def encode(rows):
+            packer = msgpack.Packer(default=encode_value)
+            return b''.join(packer.pack(row) for row in rows)
+
+        def decode(f):
+            return msgpack.Unpacker(f, raw=False)
+        return encode, decode
+    raise SnapshotError(f'Unknown snapshot format {fmt!r}')
+
+
+def add_bytes(archive, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = time.time()
+    archive.addfile(info, io.BytesIO(data))
+
+
+def write_mode(path, mode):
+    return f'{mode}:gz' if path.endswith(('.gz', '.tgz')) else mode
+
+
+def dump(path, fmt='jsonl', include_media=True, stdout=None):
+    """Write a snapshot of all content tables (and their media) to ``path``; returns row counts."""
+    encode, _ = get_codec(fmt)
+    models = content_models()
+    counts = {}
+    with transaction.atomic(), tarfile.open(path, write_mode(path, 'w')) as archive:
+        if connection.vendor == 'postgresql':
+            # Every table is read from the same snapshot of the database
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'format': fmt,
+            'created_at': timezone.now().isoformat(),
+            'models': [{'model': model._meta.label_lower, 'columns': columns(model)} for model in models],
+        }
+        add_bytes(archive, MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+
+        for model in models:
+            started = time.monotonic()
+            rows = model._base_manager.order_by('pk').values_list(*columns(model)).iterator(chunk_size=CHUNK_ROWS)
+            chunk, number, total = [], 0, 0
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == CHUNK_ROWS:
+                    add_bytes(archive, f'{DATA_DIR}/{model._meta.label_lower}/{number:05d}.{fmt}', encode(chunk))
+                    total += len(chunk)
+                    chunk, number = [], number + 1
+            if chunk or not number:
+                add_bytes(archive, f'{DATA_DIR}/{model._meta.label_lower}/{number:05d}.{fmt}', encode(chunk))
+                total += len(chunk)
+            counts[model._meta.label_lower] = total
+            if stdout:
+                stdout.write(f'  {model.__name__}: {total} rows in {time.monotonic() - started:.1f}s')
+
+        if include_media:
+            media_root = os.path.realpath(settings.MEDIA_ROOT)
+            files = 0
+            for url in uploaded_media_urls():
+                source = media_path(url)
+                if source and os.path.isfile(source):
+                    archive.add(source, arcname=f'{MEDIA_DIR}/{os.path.relpath(source, media_root)}', recursive=False)
+                    files += 1
+            counts['media'] = files
+            if stdout:
+                stdout.write(f'  Media: {files} files')
+    return counts
+
+
+class Loader:
+    """Loads one snapshot's rows model by model as they are read from the archive."""
+
+    def __init__(self, manifest, replace=False):
+        if manifest.get('version') != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {manifest.get('version')!r}")
+        _, self.decode = get_codec(manifest['format'])
+        self.models = []
+        self.columns = {}
+        for entry in manifest['models']:
+            try:
+                model = apps.get_model(entry['model'])
+            except LookupError:
+                raise SnapshotError(f"Unknown model {entry['model']} in snapshot")
+            missing = set(columns(model)) - set(entry['columns'])
+            if missing:
+                raise SnapshotError(f"{entry['model']} is missing column(s) {', '.join(sorted(missing))}")
+            self.models.append(model)
+            self.columns[model] = entry['columns']
+        self.counts = dict.fromkeys(self.models, 0)
+        # Nullable foreign keys to tables that come later are set after everything is loaded
+        self.deferred = {}
+        for position, model in enumerate(self.models):
+            later = set(self.models[position + 1:])
+            self.deferred[model] = [
+                field for field in model._meta.concrete_fields
+                if field.is_relation and field.null and field.related_model in later
+            ]
+        self.deferred_values = {model: [] for model in self.models}
+        self.prepare(replace)
+
+    def prepare(self, replace):
+        if not replace:
+            for model in self.models:
+                if model._base_manager.exists():
+                    raise SnapshotError(f'{model._meta.db_table} is not empty; load with --replace to overwrite it')
+            return
+        tables = [model._meta.db_table for model in self.models]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('TRUNCATE {}'.format(', '.join(map(connection.ops.quote_name, tables))))
+            else:
+                for table in reversed(tables):
+                    cursor.execute(f'DELETE FROM {connection.ops.quote_name(table)}')
+
+    def rows(self, model, f):
+        fields = [self.field(model, name) for name in self.columns[model]]
+        deferred = [index for index, field in enumerate(fields) if field in self.deferred[model]]
+        pk_index = self.columns[model].index(model._meta.pk.attname)
+        for row in self.decode(f):
+            values = [field.to_python(value) for field, value in zip(fields, row)]
+            if deferred:
+                links = {fields[index].attname: values[index] for index in deferred if values[index] is not None}
+                if links:
+                    self.deferred_values[model].append((values[pk_index], links))
+                for index in deferred:
+                    values[index] = None
+            yield values
+
+    @staticmethod
+    def field(model, attname):
+        for field in model._meta.concrete_fields:
+            if field.attname == attname:
+                return field
+        raise SnapshotError(f'{model._meta.label_lower} has no column {attname}')
+
+    def load_chunk(self, model, f):
+        fields = [self.field(model, name) for name in self.columns[model]]
+        self.counts[model] += load_rows(connection, model, fields, self.rows(model, f))
+
+    def finish(self):
+        for model, links in self.deferred_values.items():
+            by_pk = dict(links)
+            fields = [field.name for field in self.deferred[model]]
+            for start in range(0, len(links), CHUNK_ROWS):
+                objects = list(model._base_manager.filter(pk__in=[pk for pk, _ in links[start:start + CHUNK_ROWS]]))
+                for obj in objects:
+                    for attname, value in by_pk[obj.pk].items():
+                        setattr(obj, attname, value)
+                model._base_manager.bulk_update(objects, fields)
+        # Explicit primary keys were inserted: move the sequences past them
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), self.models):
+                cursor.execute(sql)
+
+
+def document_keys():
+    """(entity, pk) of every public document after a load, and of those published before it."""
+    keys = set(ReadModel.objects.values_list('entity', 'object_id'))
+    for entity, builder in BUILDERS.items():
+        if supported(builder.model):
+            keys.update((entity, pk) for pk in builder.model._base_manager.values_list('pk', flat=True))
+    return keys
+
+
+def write_media(source, target):
+    """
+    Write an archived media file to ``target`` unless an identical file is
+    already there; returns whether it was written.  The file is replaced
+    atomically, so the site never serves half of it.
+    """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            shutil.copyfileobj(source, out)
+        if os.path.exists(target) and filecmp.cmp(tmp_path, target, shallow=False):
+            return False
+        os.chmod(tmp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+        os.replace(tmp_path, target)
+        return True
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def load(path, replace=False, include_media=True, stdout=None):
+    """Load a snapshot written by ``dump``; returns row counts per model and the number of media files."""
+    loader = None
+    current = None
+    started = time.monotonic()
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    blobs_root = os.path.join(media_root, BLOBS_DIR)
+    media_files = 0
+    # 'r|*' reads the archive as a stream, so it is never unpacked to disk
+    with transaction.atomic(), tarfile.open(path, 'r|*') as archive:
+        for member in archive:
+            if member.name == MANIFEST_NAME:
+                loader = Loader(json.load(archive.extractfile(member)), replace=replace)
+                continue
+            if loader is None:
+                raise SnapshotError(f'{path} is not a content snapshot ({MANIFEST_NAME} must come first)')
+
+            if member.name.startswith(DATA_DIR + '/') and member.isfile():
+                model = apps.get_model(member.name.split('/')[1])
+                if model not in loader.counts:
+                    raise SnapshotError(f'{member.name} does not belong to a model in the manifest')
+                if stdout and model is not current:
+                    if current is not None:
+                        stdout.write(f'  {current.__name__}: {loader.counts[current]} rows in {time.monotonic() - started:.1f}s')
+                    current, started = model, time.monotonic()
+                loader.load_chunk(model, archive.extractfile(member))
+
+            elif member.name.startswith(MEDIA_DIR + '/') and member.isfile() and include_media:
+                target = os.path.realpath(os.path.join(media_root, member.name[len(MEDIA_DIR) + 1:]))
+                if not target.startswith(media_root + os.sep):
+                    raise SnapshotError(f'{member.name} points outside MEDIA_ROOT')
+                # Content-addressed blobs that already exist are identical; other paths may hold other bytes
+                if not (target.startswith(blobs_root + os.sep) and os.path.exists(target)):
+                    media_files += write_media(archive.extractfile(member), target)
+
+        if loader is None:
+            raise SnapshotError(f'{path} is not a content snapshot')
+        if stdout and current is not None:
+            stdout.write(f'  {current.__name__}: {loader.counts[current]} rows in {time.monotonic() - started:.1f}s')
+        loader.finish()
+        outbox.record(document_keys())
+    counts = {model._meta.label_lower: count for model, count in loader.counts.items()}
+    counts['media'] = media_files
+    return counts
@@ -0,0 +1,146 @@
+/*
+ * Drag-and-drop ordering (sda_backend/ordering.py).
+ *
+ * Saved rows of the changelist (when it is sorted by order) and of ordered
+ * inlines can be dragged into place.  Only the moved row and the row it was
+ * dropped next to are posted; the server renumbers the whole scope and
+ * answers with the new order values, which are written back into the page.
+ * Needs resumable_upload.js (window.sdaUploads.csrfToken) loaded first.
+ */
+(function () {
+    'use strict';
+
+    function setup(config, rows, rowId, extra) {
+        var dragged = null;
+        var startNext = null;
+
+        function sibling(row, forward) {
+            var node = forward ? row.nextElementSibling : row.previousElementSibling;
+            while (node && !(rows.indexOf(node) !== -1 && rowId(node))) {
+                node = forward ? node.nextElementSibling : node.previousElementSibling;
+            }
+            return node;
+        }
+
+        function showOrders(orders) {
+            rows.forEach(function (row) {
+                var order = orders[rowId(row)];
+                if (order === undefined) {
+                    return;
+                }
+                var input = row.querySelector('input[name$="-order"]');
+                if (input) {
+                    input.value = order;
+                    return;
+                }
+                var cell = row.querySelector('td.field-order, .field-order .readonly');
+                if (cell) {
+                    cell.textContent = order;
+                }
+            });
+        }
+
+        function save(row) {
+            var body = new FormData();
+            var previous = sibling(row, false);
+            var next = sibling(row, true);
+            body.append('id', rowId(row));
+            if (previous) {
+                body.append('after', rowId(previous));
+            } else if (next) {
+                body.append('before', rowId(next));
+            } else {
+                return;
+            }
+            Object.keys(extra).forEach(function (key) {
+                body.append(key, extra[key]);
+            });
+            fetch(config.url, {
+                method: 'POST',
+                credentials: 'same-origin',
+                headers: {'X-CSRFToken': window.sdaUploads.csrfToken(document), 'Accept': 'application/json'},
+                body: body
+            }).then(function (response) {
+                if (!response.ok) {
+                    return response.text().then(function (text) {
+                        throw new Error(text || response.statusText);
+                    });
+                }
+                return response.json();
+            }).then(function (data) {
+                showOrders(data.orders);
+            }).catch(function (error) {
+                window.alert('The new order was not saved: ' + error.message);
+                window.location.reload();
+            });
+        }
+
+        rows.forEach(function (row) {
+            if (!rowId(row)) {
+                return;
+            }
+            row.title = 'Drag to reorder';
+            // Dragging from a field would get in the way of editing it
+            row.addEventListener('mousedown', function (event) {
+                row.draggable = !event.target.closest('input, select, textarea, a, button, label');
+            });
+            row.addEventListener('dragstart', function (event) {
+                dragged = row;
+                startNext = row.nextElementSibling;
+                event.dataTransfer.effectAllowed = 'move';
+                event.dataTransfer.setData('text/plain', rowId(row));
+                row.style.opacity = '0.5';
+            });
+            row.addEventListener('dragover', function (event) {
+                if (!dragged || dragged === row || !rowId(row)) {
+                    return;
+                }
+                event.preventDefault();
+                var box = row.getBoundingClientRect();
+                var below = event.clientY > box.top + box.height / 2;
+                row.parentNode.insertBefore(dragged, below ? row.nextElementSibling : row);
+            });
+            row.addEventListener('drop', function (event) {
+                event.preventDefault();
+            });
+            row.addEventListener('dragend', function () {
+                var moved = dragged;
+                dragged = null;
+                row.style.opacity = '';
+                if (moved && moved.nextElementSibling !== startNext) {
+                    save(moved);
+                }
+            });
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        var element = document.getElementById('drag-order-config');
+        if (!element || !window.fetch || !window.FormData || !window.sdaUploads) {
+            return;
+        }
+        var config = JSON.parse(element.textContent);
+
+        if (config.changelist) {
+            var table = document.querySelector('#result_list tbody');
+            if (table) {
+                setup(config, Array.prototype.slice.call(table.children), function (row) {
+                    var input = row.querySelector('input.action-select, input[type=hidden][name^="form-"][name$="-id"]');
+                    return input ? input.value : '';
+                }, {});
+            }
+        }
+
+        (config.inlines || []).forEach(function (prefix) {
+            var group = document.getElementById(prefix + '-group');
+            if (!group) {
+                return;
+            }
+            var rows = group.querySelectorAll('tr.form-row.has_original, .inline-related.has_original');
+            setup(config, Array.prototype.slice.call(rows), function (row) {
+                var input = row.querySelector('input[type=hidden][name^="' + prefix + '-"][name$="-id"]');
+                return input ? input.value : '';
+            }, {inline: prefix, object_id: config.object_id});
+        });
+    });
+})();
@@ -0,0 +1,128 @@
+/*
+ * Drag-and-drop gallery uploads (sda_backend/gallery.py).
+ *
+ * Dropped or chosen photos are uploaded a few at a time through the resumable
+ * upload endpoint (resumable_upload.js); the finished tokens are then posted
+ * to the gallery view in one request, which creates all the photo rows.
+ * Without JavaScript the form posts the files directly.
+ */
+(function () {
+    'use strict';
+
+    var CONCURRENCY = 3;
+
+    function setup(form) {
+        var drop = form.querySelector('.gallery-drop');
+        var input = form.querySelector('input[type=file]');
+        var queue = form.querySelector('.gallery-queue');
+        var button = form.querySelector('input[type=submit]');
+        var files = [];
+
+        function add(list) {
+            Array.prototype.forEach.call(list, function (file) {
+                if (file.type.indexOf('image/') !== 0) {
+                    return;
+                }
+                var item = document.createElement('li');
+                item.textContent = file.name;
+                queue.appendChild(item);
+                files.push({file: file, item: item});
+            });
+            input.value = '';
+        }
+
+        function uploadAll() {
+            var csrf = window.sdaUploads.csrfToken(form);
+            var tokens = new Array(files.length);
+            var errors = [];
+            var nextIndex = 0;
+
+            function worker() {
+                if (nextIndex >= files.length) {
+                    return Promise.resolve();
+                }
+                var index = nextIndex++;
+                var entry = files[index];
+                return window.sdaUploads.uploadFile(entry.file, {
+                    url: form.dataset.uploadUrl,
+                    field: form.dataset.field,
+                    csrf: csrf,
+                    onProgress: function (fraction) {
+                        entry.item.textContent = entry.file.name + ': ' + Math.floor(100 * fraction) + '%';
+                    }
+                }).then(function (token) {
+                    tokens[index] = token;
+                    entry.item.textContent = entry.file.name + ': uploaded';
+                }).catch(function (error) {
+                    errors.push(entry.file.name + ': ' + error.message);
+                    entry.item.textContent = entry.file.name + ': ' + error.message;
+                }).then(worker);
+            }
+
+            var workers = [];
+            for (var i = 0; i < Math.min(CONCURRENCY, files.length); i++) {
+                workers.push(worker());
+            }
+            return Promise.all(workers).then(function () {
+                var body = new FormData();
+                tokens.forEach(function (token) {
+                    if (token) {
+                        body.append('upload', token);
+                    }
+                });
+                return fetch(form.action || window.location.href, {
+                    method: 'POST',
+                    credentials: 'same-origin',
+                    headers: {'X-CSRFToken': csrf, 'Accept': 'application/json'},
+                    body: body
+                }).then(function (response) {
+                    return response.json();
+                }).then(function (data) {
+                    errors = errors.concat(data.errors || []);
+                    if (errors.length) {
+                        window.alert('Added ' + data.created + ' photo(s).\n\n' + errors.join('\n'));
+                    }
+                    window.location.reload();
+                });
+            });
+        }
+
+        ['dragenter', 'dragover'].forEach(function (name) {
+            drop.addEventListener(name, function (event) {
+                event.preventDefault();
+                drop.classList.add('dragging');
+            });
+        });
+        ['dragleave', 'drop'].forEach(function (name) {
+            drop.addEventListener(name, function () {
+                drop.classList.remove('dragging');
+            });
+        });
+        drop.addEventListener('drop', function (event) {
+            event.preventDefault();
+            add(event.dataTransfer.files);
+        });
+        input.addEventListener('change', function () {
+            add(input.files);
+        });
+
+        form.addEventListener('submit', function (event) {
+            event.preventDefault();
+            if (!files.length) {
+                return;
+            }
+            button.disabled = true;
+            uploadAll().catch(function (error) {
+                window.alert(error.message);
+                button.disabled = false;
+            });
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        if (!window.fetch || !window.sdaUploads) {
+            return;
+        }
+        Array.prototype.forEach.call(document.querySelectorAll('form.gallery-upload'), setup);
+    });
+})();
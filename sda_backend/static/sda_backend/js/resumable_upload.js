@@ -0,0 +1,193 @@
+/*
+ * Resumable chunked uploads for ResumableFileInput (sda_backend/widgets.py).
+ *
+ * When a file is chosen it is sent to the upload endpoint in chunks, each with
+ * its SHA-256, before the form is submitted.  Failed chunks are retried with
+ * backoff; the session id is kept in localStorage so choosing the same file
+ * again after a reload resumes where the last attempt stopped.  When the last
+ * chunk is accepted the signed token goes into the hidden input and the file
+ * input is cleared, so saving the form does not upload the file again.
+ *
+ * Also exposes window.sdaUploads.csrfToken to the other admin scripts.
+ */
+(function () {
+    'use strict';
+
+    // Pages may include this script twice (widget media and a template)
+    if (window.sdaUploads) {
+        return;
+    }
+
+    var MAX_RETRIES = 6;
+    var pending = 0;
+
+    // form: the form (or document) to look for the token in; falls back to the cookie
+    function csrfToken(form) {
+        var input = form && form.querySelector('input[name=csrfmiddlewaretoken]');
+        if (input) {
+            return input.value;
+        }
+        var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+        return match ? decodeURIComponent(match[1]) : '';
+    }
+
+    function sleep(ms) {
+        return new Promise(function (resolve) { setTimeout(resolve, ms); });
+    }
+
+    function sha256Hex(buffer) {
+        // crypto.subtle only exists on HTTPS / localhost; the server treats the checksum as optional
+        if (!window.crypto || !window.crypto.subtle) {
+            return Promise.resolve('');
+        }
+        return window.crypto.subtle.digest('SHA-256', buffer).then(function (digest) {
+            return Array.prototype.map.call(new Uint8Array(digest), function (b) {
+                return ('0' + b.toString(16)).slice(-2);
+            }).join('');
+        });
+    }
+
+    function api(method, url, token, body, headers) {
+        var init = {method: method, credentials: 'same-origin', headers: headers || {}, body: body};
+        init.headers['X-CSRFToken'] = token;
+        return fetch(url, init).then(function (response) {
+            return response.json().catch(function () { return {}; }).then(function (data) {
+                data.status = response.status;
+                return data;
+            });
+        });
+    }
+
+    function storageKey(field, file) {
+        return 'resumable:' + field + ':' + file.name + ':' + file.size + ':' + file.lastModified;
+    }
+
+    function startSession(options, file) {
+        var key = storageKey(options.field, file);
+        var saved = JSON.parse(localStorage.getItem(key) || 'null');
+        var resume = saved
+            ? api('GET', options.url + saved.id + '/', options.csrf).then(function (data) {
+                return data.status === 200 ? Object.assign(data, {token: saved.token}) : null;
+            })
+            : Promise.resolve(null);
+        return resume.then(function (session) {
+            if (session) {
+                return session;
+            }
+            var payload = JSON.stringify({
+                filename: file.name, size: file.size, field: options.field, content_type: file.type
+            });
+            return api('POST', options.url, options.csrf, payload, {'Content-Type': 'application/json'}).then(function (data) {
+                if (data.status !== 201) {
+                    throw new Error(data.error || 'Upload could not be started');
+                }
+                localStorage.setItem(key, JSON.stringify({id: data.id, token: data.token}));
+                return data;
+            });
+        });
+    }
+
+    function sendChunks(options, file, session) {
+        var url = options.url + session.id + '/';
+        var offset = session.offset;
+        var failures = 0;
+
+        function next() {
+            options.onProgress(offset / file.size);
+            if (offset >= file.size) {
+                return Promise.resolve();
+            }
+            var end = Math.min(offset + session.chunk_size, file.size);
+            var blob = file.slice(offset, end);
+            return blob.arrayBuffer().then(function (buffer) {
+                return sha256Hex(buffer).then(function (checksum) {
+                    var headers = {'Content-Range': 'bytes ' + offset + '-' + (end - 1) + '/' + file.size};
+                    if (checksum) {
+                        headers['X-Chunk-SHA256'] = checksum;
+                    }
+                    return api('PUT', url, options.csrf, buffer, headers);
+                });
+            }).catch(function () {
+                return {status: 0};  // network error: retry below
+            }).then(function (data) {
+                if (data.status === 200) {
+                    failures = 0;
+                    offset = data.offset;
+                    return next();
+                }
+                if (data.status === 409 && typeof data.offset === 'number') {
+                    offset = data.offset;  // the server tells us where to continue
+                    return sleep(250).then(next);
+                }
+                // 422: the chunk arrived incomplete or corrupted
+                if ((data.status === 0 || data.status === 422 || data.status >= 500) && failures < MAX_RETRIES) {
+                    failures += 1;
+                    return sleep(Math.min(30000, 500 * Math.pow(2, failures))).then(next);
+                }
+                throw new Error(data.error || 'Upload failed');
+            });
+        }
+        return next();
+    }
+
+    /*
+     * Upload one File; resolves with the signed token to submit instead of the file.
+     * options: {url, field, csrf, onProgress(fraction)}
+     */
+    function uploadFile(file, options) {
+        options = Object.assign({onProgress: function () {}}, options);
+        pending += 1;
+        return startSession(options, file).then(function (session) {
+            return sendChunks(options, file, session).then(function () {
+                localStorage.removeItem(storageKey(options.field, file));
+                return session.token;
+            });
+        }).finally(function () {
+            pending -= 1;
+        });
+    }
+
+    function upload(input) {
+        var file = input.files && input.files[0];
+        var wrapper = input.closest('.resumable-upload');
+        if (!file || !wrapper || !window.fetch) {
+            return;
+        }
+        var hidden = wrapper.querySelector('input[type=hidden]');
+        var status = wrapper.querySelector('.resumable-status');
+
+        hidden.value = '';
+        status.textContent = 'Uploading ' + file.name + '…';
+        uploadFile(file, {
+            url: input.dataset.resumableUrl,
+            field: input.name,
+            csrf: csrfToken(input.form),
+            onProgress: function (fraction) {
+                status.textContent = 'Uploading ' + file.name + ': ' + Math.floor(100 * fraction) + '%';
+            }
+        }).then(function (token) {
+            hidden.value = token;
+            input.value = '';
+            status.textContent = 'Uploaded: ' + file.name;
+        }).catch(function (error) {
+            // Leave the file selected: the form can still send it in one request
+            status.textContent = error.message + ' (the file will be sent with the form instead)';
+        });
+    }
+
+    document.addEventListener('change', function (event) {
+        var input = event.target;
+        if (input.matches && input.matches('input[type=file][data-resumable-url]')) {
+            upload(input);
+        }
+    });
+
+    document.addEventListener('submit', function (event) {
+        if (pending > 0) {
+            event.preventDefault();
+            window.alert('Please wait until the uploads have finished.');
+        }
+    }, true);
+
+    window.sdaUploads = {uploadFile: uploadFile, csrfToken: csrfToken};
+})();
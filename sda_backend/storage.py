@@ -0,0 +1,113 @@
+"""
+Content-addressed storage for admin uploads.
+
+Files are stored under the SHA-256 of their content instead of the name
+they were uploaded with:
+
+    uploads/blobs/3f/a2/3fa2...c9.jpg   ->   /uploads/blobs/3f/a2/3fa2...c9.jpg
+
+Uploading the same logo or photo again (for any model) reuses the
+existing blob, a new file can never overwrite another one that happens
+to share its name, and because a URL always refers to the same bytes it
+can be cached by nginx/Cloudflare forever.  Unreferenced blobs are found
+and removed by ``manage.py gc_media``.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import LazyObject
+
+from .images import UPLOADS_URL
+
+
+BLOBS_DIR = 'blobs'
+# Temporary files live inside MEDIA_ROOT so finished uploads are moved with an atomic rename
+INCOMING_DIR = '.incoming'
+
+
+def blob_name(digest, extension):
+    return f'{BLOBS_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def reuse_blob(path):
+    """
+    Whether the blob at ``path`` exists and can be reused for an identical
+    upload.  Its mtime is refreshed, so gc_media (which spares blobs newer
+    than its cutoff) cannot delete an old orphan before the row that now
+    references it is committed.
+    """
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names every file after the SHA-256 of its content."""
+
+    def __init__(self, location=None, base_url=None, **kwargs):
+        super().__init__(
+            location=location or settings.MEDIA_ROOT,
+            base_url=base_url or UPLOADS_URL,
+            **kwargs,
+        )
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save(), collisions are reuse
+        return name
+
+    def incoming_dir(self):
+        path = self.path(INCOMING_DIR)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        if getattr(content, 'sha256', None) and hasattr(content, 'temporary_file_path'):
+            return self._save_streamed(content, extension)
+        digest = hashlib.sha256()
+
+        # Hash while streaming chunks to a temp file on the same filesystem
+        fd, tmp_path = tempfile.mkstemp(dir=self.incoming_dir(), suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            final_name = blob_name(digest.hexdigest(), extension)
+            final_path = self.path(final_name)
+            if reuse_blob(final_path):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return final_name
+
+    def _save_streamed(self, content, extension):
+        # Already hashed and written to INCOMING_DIR by StreamingUploadHandler: just rename
+        final_name = blob_name(content.sha256, extension)
+        final_path = self.path(final_name)
+        if not reuse_blob(final_path):
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.chmod(content.temporary_file_path(), self.file_permissions_mode or 0o644)
+            os.replace(content.temporary_file_path(), final_path)
+        # Otherwise the existing blob is reused and the temp file removed when the upload is closed
+        return final_name
+
+
+class DefaultMediaStorage(LazyObject):
+    def _setup(self):
+        self._wrapped = ContentAddressedStorage()
+
+
+media_storage = DefaultMediaStorage()
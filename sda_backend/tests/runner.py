@@ -0,0 +1,33 @@
+"""
+Test runner that also creates the tables of the unmanaged models.
+
+The content tables belong to the FastAPI backend, so migrations never create
+them; the test database gets them the way ``bench_admin`` builds its own.
+
+Usage:
+    python manage.py test sda_backend
+    DB_ENGINE=sqlite python manage.py test sda_backend   # News is skipped
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from sda_backend.benchmarks.scenarios import create_content_tables
+
+
+class ContentTablesRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # The static files manifest only exists after collectstatic
+        self.static_override = override_settings(
+            STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        )
+        self.static_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.static_override.disable()
+        super().teardown_test_environment(**kwargs)
+
+    def setup_databases(self, **kwargs):
+        old_config = super().setup_databases(**kwargs)
+        create_content_tables()
+        return old_config
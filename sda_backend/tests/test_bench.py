@@ -0,0 +1,27 @@
+import io
+
+from django.test import SimpleTestCase
+
+from sda_backend.management.commands.bench_admin import Command
+
+
+class CheckBudgetsTests(SimpleTestCase):
+    budgets = {'project:changelist': {'queries': 8, 'ms': 10.0, 'peak_kb': 400}}
+
+    def check(self, results):
+        return Command(stdout=io.StringIO()).check_budgets(self.budgets, results, 1.5, 25)
+
+    def test_within_budget(self):
+        self.assertEqual(self.check({'project:changelist': {'queries': 8, 'ms': 30.0, 'peak_kb': 500}}), ([], []))
+
+    def test_query_count_is_a_hard_gate(self):
+        failures, slow = self.check({'project:changelist': {'queries': 9, 'ms': 50.0, 'peak_kb': 700}})
+        self.assertEqual(failures, [
+            'project:changelist: 9 queries (budget 8)',
+            'project:changelist: 700 KiB peak (budget 400 x 1.5)',
+        ])
+        self.assertEqual(slow, ['project:changelist: 50.0 ms (budget 10.0 x 1.5 + 25)'])
+
+    def test_pages_without_a_budget_fail(self):
+        failures, _ = self.check({'news:changelist': {'queries': 3, 'ms': 1.0, 'peak_kb': 10}})
+        self.assertEqual(failures, ['news:changelist: no budget recorded (run with --update-budgets)'])
@@ -0,0 +1,63 @@
+import datetime
+
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from sda_backend.bulk import update_rows
+from sda_backend.models import OutboxEvent, Service
+
+
+class UpdateRowsTests(TestCase):
+    def setUp(self):
+        self.services = [Service.objects.create(slug=f's{index}', name=f'Service {index}', order=index) for index in range(3)]
+        Service.objects.update(updated_at=timezone.now() - datetime.timedelta(days=1))
+
+    def test_only_the_given_fields_and_auto_now_are_written(self):
+        for service in self.services:
+            service.order += 10
+            service.name = 'not saved'
+        with self.assertNumQueries(1):
+            self.assertEqual(update_rows(Service, self.services, ['order']), 3)
+
+        rows = Service.objects.order_by('pk').values_list('order', 'name', 'updated_at')
+        self.assertEqual([(order, name) for order, name, _ in rows], [(10, 'Service 0'), (11, 'Service 1'), (12, 'Service 2')])
+        self.assertTrue(all(updated_at > timezone.now() - datetime.timedelta(minutes=1) for _, _, updated_at in rows))
+
+    def test_nothing_to_write(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(update_rows(Service, [], ['order']), 0)
+
+
+@override_settings(OUTBOX_ENABLED=True)
+class ChangelistBulkSaveTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.az', 'password'))
+        self.services = [Service.objects.create(slug=f's{index}', name=f'Service {index}', order=index) for index in range(3)]
+        OutboxEvent.objects.all().delete()
+
+    def test_changed_rows_are_saved_with_one_update_and_one_log_insert(self):
+        orders = {self.services[0].pk: 5, self.services[1].pk: 1, self.services[2].pk: 7}
+        data = {'form-TOTAL_FORMS': 3, 'form-INITIAL_FORMS': 3, '_save': 'Save'}
+        for index, (pk, order) in enumerate(orders.items()):
+            data[f'form-{index}-id'] = pk
+            data[f'form-{index}-order'] = order
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('admin:sda_backend_service_changelist'), data)
+        self.assertEqual(response.status_code, 302)
+        statements = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in statements if sql.startswith('UPDATE "services"')]), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('INSERT INTO "django_admin_log"')]), 1)
+
+        self.assertEqual(dict(Service.objects.values_list('pk', 'order')), orders)
+        self.assertEqual(LogEntry.objects.count(), 2)
+        # bulk_saved still reaches the change outbox
+        self.assertEqual(
+            set(OutboxEvent.objects.values_list('entity', 'object_id')),
+            {('service', self.services[0].pk), ('service', self.services[2].pk)},
+        )
@@ -0,0 +1,100 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from sda_backend import cache as cache_stats
+from sda_backend.cache import LocMemCache, RedisCache
+
+
+class FakeRedisClient:
+    """Stands in for Django's RedisCacheClient (same methods, a dict instead of a server)."""
+
+    def __init__(self, servers, **options):
+        self.data = {}
+
+    def get(self, key, default):
+        return self.data.get(key, default)
+
+    def get_many(self, keys):
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    def set(self, key, value, timeout):
+        self.data[key] = value
+
+
+def fake_redis_cache():
+    backend = RedisCache('redis://stand-in:6379/0', {'KEY_PREFIX': 'sda_admin'})
+    backend._class = FakeRedisClient
+    return backend
+
+
+class CacheStatsTests(SimpleTestCase):
+    def setUp(self):
+        stats_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(stats_dir.cleanup)
+        self.stats_dir = stats_dir.name
+        settings_override = override_settings(CACHE_STATS_DIR=self.stats_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache_stats.discard_stats()
+        self.addCleanup(cache_stats.discard_stats)
+
+    def assert_counts(self, backend):
+        backend.set('admin_app_list:1', 'apps')
+        backend.set('sessions:empty', None)
+        self.assertEqual(backend.get('admin_app_list:1'), 'apps')
+        self.assertEqual(backend.get('admin_app_list:2', 'default'), 'default')
+        self.assertIsNone(backend.get('sessions:empty', 'default'))
+        self.assertEqual(backend.get_many(['sessions:empty', 'sessions:gone']), {'sessions:empty': None})
+        cache_stats.flush_stats()
+        self.assertEqual(cache_stats.read_stats(), {
+            'admin_app_list': {'hits': 1, 'misses': 1},
+            'sessions': {'hits': 2, 'misses': 1},
+        })
+
+    def test_locmem_backend_counts_hits_and_misses(self):
+        self.assert_counts(LocMemCache('stats-test', {}))
+
+    def test_redis_backend_counts_hits_and_misses(self):
+        self.assert_counts(fake_redis_cache())
+
+    def test_reset_clears_every_process(self):
+        backend = LocMemCache('stats-test', {})
+        backend.get('admin_app_list:1')
+        cache_stats.flush_stats()
+        time.sleep(0.01)
+        cache_stats.reset_stats()
+        self.assertEqual(cache_stats.read_stats(), {})
+        cache_stats.flush_stats()
+        self.assertEqual(cache_stats.read_stats(), {})
+
+    def write_stats_file(self, name, age=0):
+        path = os.path.join(self.stats_dir, name)
+        with open(path, 'w') as stats_file:
+            stats_file.write('{"sessions": {"hits": 1, "misses": 0}}')
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_prune_removes_exited_and_idle_processes(self):
+        exited = subprocess.Popen([sys.executable, '-c', ''])
+        exited.wait()
+        host = cache_stats._host
+        dead = self.write_stats_file(f'{host}-{exited.pid}-1.json')
+        alive = self.write_stats_file(f'{host}-{os.getppid()}-1.json')
+        other_host = self.write_stats_file(f'other_host-{exited.pid}-1.json')
+        idle = self.write_stats_file('other_host-2-1.json', age=2 * 86400)
+        leftover = self.write_stats_file('tmpabc.tmp', age=2 * 86400)
+
+        with override_settings(CACHE_STATS_TTL_SECONDS=86400):
+            cache_stats.prune_stats()
+
+        self.assertFalse(os.path.exists(dead))
+        self.assertFalse(os.path.exists(idle))
+        self.assertFalse(os.path.exists(leftover))
+        self.assertTrue(os.path.exists(alive))
+        self.assertTrue(os.path.exists(other_host))
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from sda_backend.models import Project, ProjectPhoto, PropertySector, PropertySectorProcess
+
+
+class AnnotatedChangeListTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.az', 'password'))
+        self.add_sectors(2)
+
+    def add_sectors(self, count):
+        for index in range(count):
+            sector = PropertySector.objects.create(title_en=f'Sector {index}')
+            projects = [Project.objects.create(title_en=f'Project {index}.{number}', property_sector=sector) for number in range(2)]
+            for number in range(3):
+                PropertySectorProcess.objects.create(property_sector=sector, title_en=f'Step {number}', order=number)
+                ProjectPhoto.objects.create(project=projects[0], image_url=f'/uploads/{index}-{number}.jpg', order=number)
+            sector.featured_project_1 = projects[0]
+            sector.featured_project_2 = projects[1]
+            sector.save()
+
+    def changelist_queries(self, model_name):
+        # Cached choice lists would make the first request look more expensive
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f'admin:sda_backend_{model_name}_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_counts_are_annotated(self):
+        response, _ = self.changelist_queries('propertysector')
+        rows = {sector.title_en: (sector.process_steps_total, sector.projects_total) for sector in response.context['cl'].result_list}
+        # Two counts on one row do not multiply each other
+        self.assertEqual(rows, {'Sector 0': (3, 2), 'Sector 1': (3, 2)})
+
+    def test_sort_by_count(self):
+        PropertySector.objects.create(title_en='Empty')
+        response = self.client.get(reverse('admin:sda_backend_propertysector_changelist'), {'o': '6'})
+        self.assertEqual(response.context['cl'].result_list[0].title_en, 'Empty')
+
+    def test_queries_do_not_grow_with_rows(self):
+        for model_name in ('propertysector', 'project'):
+            with self.subTest(model_name):
+                _, before = self.changelist_queries(model_name)
+                self.add_sectors(5)
+                _, after = self.changelist_queries(model_name)
+                self.assertEqual(after, before)
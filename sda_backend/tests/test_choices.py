@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from sda_backend.choices import project_choices
+from sda_backend.models import Project, Service
+
+
+class ProjectChoicesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tower = Project.objects.create(title_en='Tower', slug='tower', year=2024)
+        self.bridge = Project.objects.create(slug='bridge', year=2023)
+
+    def test_choices_are_built_once(self):
+        with self.assertNumQueries(1):
+            choices = project_choices()
+        self.assertEqual(choices, [(self.tower.pk, 'Tower (tower)'), (self.bridge.pk, 'bridge')])
+        with self.assertNumQueries(0):
+            self.assertEqual(project_choices(), choices)
+
+    def test_saving_or_deleting_a_project_invalidates_them(self):
+        project_choices()
+        self.bridge.title_en = 'Bridge'
+        self.bridge.save()
+        self.assertEqual(project_choices()[1], (self.bridge.pk, 'Bridge (bridge)'))
+        self.tower.delete()
+        self.assertEqual(project_choices(), [(self.bridge.pk, 'Bridge (bridge)')])
+
+
+class CachedSelectTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.az', 'password'))
+        self.tower = Project.objects.create(title_en='Tower', slug='tower')
+        self.url = reverse('admin:sda_backend_service_add')
+
+    def test_selects_are_rendered_from_the_cache(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertContains(response, f'<option value="{self.tower.pk}">Tower (tower)</option>', count=2, html=True)
+        self.assertEqual([query['sql'] for query in queries.captured_queries if 'FROM "projects"' in query['sql']], [])
+
+    def test_submitted_projects_are_still_checked_against_the_database(self):
+        project_choices()
+        gone = Project.objects.create(slug='gone')
+        Project.objects.filter(pk=gone.pk).delete()  # no signal: the cached list may be stale
+        response = self.client.post(self.url, {'slug': 'design', 'order': 0, 'featured_project_1': gone.pk, **inline_management_data()})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('featured_project_1', response.context['adminform'].form.errors)
+        self.assertFalse(Service.objects.exists())
+
+
+def inline_management_data():
+    data = {}
+    for prefix in ('benefits', 'process_steps', 'work_process_steps'):
+        data.update({f'{prefix}-TOTAL_FORMS': 0, f'{prefix}-INITIAL_FORMS': 0})
+    return data
@@ -0,0 +1,106 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from sda_backend.exports import CONTACT_EXPORT_FIELDS, async_chunks, export_chunks, iter_rows, spreadsheet_safe
+from sda_backend.models import ContactMessage
+
+
+class SpreadsheetSafeTests(TestCase):
+    def test_formulas_are_neutralised(self):
+        self.assertEqual(spreadsheet_safe('=HYPERLINK("http://x")'), '\'=HYPERLINK("http://x")')
+        self.assertEqual(spreadsheet_safe('@SUM(A1)'), "'@SUM(A1)")
+        self.assertEqual(spreadsheet_safe('-2+3'), "'-2+3")
+        self.assertEqual(spreadsheet_safe('\tcmd'), "'\tcmd")
+
+    def test_phone_numbers_and_plain_values_are_kept(self):
+        self.assertEqual(spreadsheet_safe('+994 (12) 555-01-01'), '+994 (12) 555-01-01')
+        self.assertEqual(spreadsheet_safe('Baku'), 'Baku')
+        self.assertEqual(spreadsheet_safe(None), None)
+        self.assertEqual(spreadsheet_safe(3), 3)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.messages = [
+            ContactMessage.objects.create(phone_number=f'+99450{index}', email=f'{index}@example.az', name=f'Lead {index}')
+            for index in range(5)
+        ]
+        ContactMessage.objects.filter(pk=cls.messages[2].pk).update(message='=cmd|"/c calc"!A1', status='resolved')
+
+    def test_rows_are_read_in_key_order_one_query_per_chunk(self):
+        with self.assertNumQueries(3):
+            rows = list(iter_rows(ContactMessage.objects.order_by('-created_at'), ['email'], chunk_size=2))
+        self.assertEqual(rows, [(f'{index}@example.az',) for index in range(5)])
+        with self.assertNumQueries(1):
+            self.assertEqual(list(iter_rows(ContactMessage.objects.filter(status='resolved'), ['email'], chunk_size=2)), [('2@example.az',)])
+
+    def test_csv(self):
+        output = ''.join(export_chunks(ContactMessage.objects.all(), CONTACT_EXPORT_FIELDS, 'csv', chunk_size=2))
+        rows = list(csv.DictReader(io.StringIO(output)))
+        self.assertEqual([row['email'] for row in rows], [f'{index}@example.az' for index in range(5)])
+        self.assertEqual(rows[2]['message'], '\'=cmd|"/c calc"!A1')
+        self.assertEqual(rows[0]['phone_number'], '+994500')
+        self.assertEqual(rows[0]['created_at'], self.messages[0].created_at.isoformat())
+
+    def test_jsonl(self):
+        lines = list(export_chunks(ContactMessage.objects.all(), CONTACT_EXPORT_FIELDS, 'jsonl'))
+        first = json.loads(lines[0])
+        self.assertEqual(len(lines), 5)
+        self.assertEqual((first['id'], first['is_read'], first['status']), (self.messages[0].pk, False, 'new'))
+        # JSON is not opened by spreadsheets; values are exported as stored
+        self.assertEqual(json.loads(lines[2])['message'], '=cmd|"/c calc"!A1')
+
+    def test_xlsx(self):
+        data = b''.join(export_chunks(ContactMessage.objects.all(), CONTACT_EXPORT_FIELDS, 'xlsx'))
+        rows = list(load_workbook(io.BytesIO(data)).active.values)
+        self.assertEqual(rows[0], CONTACT_EXPORT_FIELDS)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[3][CONTACT_EXPORT_FIELDS.index('message')], '\'=cmd|"/c calc"!A1')
+
+    def test_async_chunks_close_the_generator(self):
+        closed = []
+
+        def chunks():
+            try:
+                yield from ('a', 'b', 'c')
+            finally:
+                closed.append(True)
+
+        async def first_two():
+            stream = async_chunks(chunks())
+            received = [await stream.__anext__(), await stream.__anext__()]
+            await stream.aclose()
+            return received
+
+        self.assertEqual(asyncio.run(first_two()), ['a', 'b'])
+        self.assertEqual(closed, [True])
+
+    def test_admin_export_view_follows_the_changelist_filters(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.az', 'password'))
+        url = reverse('admin:sda_backend_contactmessage_export', args=['csv'])
+        response = self.client.get(url, {'status__exact': 'resolved'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertRegex(response['Content-Disposition'], r'attachment; filename="contact-messages-\d{8}-\d{4}\.csv"')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['email'] for row in rows], ['2@example.az'])
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.client.get(reverse('admin:sda_backend_contactmessage_export', args=['pdf'])).status_code, 404)
+
+    def test_export_contacts_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'leads.jsonl')
+            call_command('export_contacts', '--format', 'jsonl', '--status', 'new', '--chunk-size', '2', '--output', path, stdout=io.StringIO())
+            with open(path, encoding='utf-8') as exported:
+                emails = [json.loads(line)['email'] for line in exported]
+        self.assertEqual(emails, ['0@example.az', '1@example.az', '3@example.az', '4@example.az'])
@@ -0,0 +1,76 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from sda_backend.models import Project, ProjectPhoto
+from sda_backend.resumable import UploadSession
+from sda_backend.storage import media_storage
+from sda_backend.tests.test_storage import MediaRootMixin
+
+
+def png(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 30), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_RENDITIONS_ENABLED=False)
+class GalleryUploadTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_superuser('admin', 'admin@example.az', 'password')
+        self.client.force_login(self.user)
+        self.project = Project.objects.create(slug='tower')
+        ProjectPhoto.objects.create(project=self.project, image_url='/uploads/old.jpg', order=4)
+        self.url = reverse('admin:sda_backend_project_gallery', args=[self.project.pk])
+
+    def post(self, data):
+        return self.client.post(self.url, data, headers={'Accept': 'application/json'}).json()
+
+    def test_photos_are_added_after_the_existing_ones(self):
+        result = self.post({'photos': [
+            SimpleUploadedFile('a.png', png('red'), 'image/png'),
+            SimpleUploadedFile('b.png', png('blue'), 'image/png'),
+        ]})
+        self.assertEqual(result, {'created': 2, 'errors': []})
+        photos = list(self.project.photos.order_by('order').values_list('image_url', 'order'))
+        self.assertEqual([order for _, order in photos], [4, 5, 6])
+        with media_storage.open(photos[1][0][len('/uploads/'):]) as stored:
+            self.assertEqual(stored.read(), png('red'))
+
+    def test_broken_files_are_reported_and_the_rest_imported(self):
+        result = self.post({'photos': [
+            SimpleUploadedFile('good.png', png('red'), 'image/png'),
+            SimpleUploadedFile('cut.png', png('blue')[:60], 'image/png'),
+            SimpleUploadedFile('virus.png', b'MZ' + b'\x00' * 100, 'image/png'),
+        ]})
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(len(result['errors']), 2)
+        self.assertTrue(result['errors'][0].startswith('virus.png: '))
+        self.assertTrue(result['errors'][1].startswith('cut.png: not a valid image'))
+        self.assertEqual(self.project.photos.count(), 2)
+
+    def test_finished_resumable_uploads(self):
+        content = png('green')
+        session = UploadSession.create(self.user, 'image', 'c.png', len(content), 'image/png')
+        session.receive_chunk(io.BytesIO(content), f'bytes 0-{len(content) - 1}/{len(content)}')
+        other = get_user_model().objects.create_superuser('other', 'other@example.az', 'password')
+        foreign = UploadSession.create(other, 'image', 'd.png', len(content), 'image/png')
+        foreign.receive_chunk(io.BytesIO(content), f'bytes 0-{len(content) - 1}/{len(content)}')
+
+        result = self.post({'upload': [session.token(), foreign.token()]})
+        self.assertEqual(result, {'created': 1, 'errors': ['The upload is not valid, please choose the file again.']})
+
+    def test_nothing_uploaded(self):
+        self.assertEqual(self.post({}), {'created': 0, 'errors': ['No photos were uploaded.']})
+
+    def test_page_and_permissions(self):
+        self.assertContains(self.client.get(self.url), 'Gallery: ')
+        staff = get_user_model().objects.create_user('staff', 'staff@example.az', 'password', is_staff=True)
+        self.client.force_login(staff)
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.client.get(self.url).status_code, 403)
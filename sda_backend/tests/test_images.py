@@ -0,0 +1,83 @@
+import io
+import json
+import os
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from sda_backend import images
+from sda_backend.models import Service
+from sda_backend.schema import supported
+from sda_backend.tests.test_storage import MediaRootMixin
+
+
+def save_image(path, size=(600, 300), fmt='JPEG'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new('RGB', size, (200, 30, 30)).save(path, format=fmt)
+
+
+class GenerateRenditionsTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.media_root, 'services', 'cover.jpg')
+        save_image(self.path)
+        self.url = '/uploads/services/cover.jpg'
+
+    def test_renditions_and_manifest(self):
+        output_dir = images.renditions_dir(self.path)
+        manifest = images.generate_renditions(self.path, output_dir, formats=('webp',))
+
+        self.assertEqual((manifest['source'], manifest['format'], manifest['width'], manifest['height']), ('cover.jpg', 'jpg', 600, 300))
+        sizes = {name: (entry['width'], entry['height']) for name, entry in manifest['renditions'].items()}
+        # Bounded by the box, never upscaled
+        self.assertEqual(sizes, {'thumb': (160, 80), 'preview': (480, 240), 'web_1x': (600, 300), 'web_2x': (600, 300)})
+        for name, entry in manifest['renditions'].items():
+            self.assertEqual(entry['formats'], {'jpg': f'{name}.jpg', 'webp': f'{name}.webp'})
+            with Image.open(os.path.join(output_dir, entry['formats']['webp'])) as rendition:
+                self.assertEqual((rendition.format, rendition.size), ('WEBP', sizes[name]))
+
+        with open(os.path.join(output_dir, images.MANIFEST_NAME)) as stored:
+            self.assertEqual(json.load(stored), manifest)
+        self.assertEqual(images.rendition_manifest(self.url), manifest)
+        self.assertEqual(images.rendition_url(self.url, 'thumb', 'webp'), '/uploads/services/_renditions/cover.jpg/thumb.webp')
+        self.assertEqual(images.rendition_url(self.url, 'thumb'), '/uploads/services/_renditions/cover.jpg/thumb.jpg')
+        self.assertIsNone(images.rendition_url(self.url, 'thumb', 'avif'))
+
+    def test_no_manifest_before_generation(self):
+        self.assertIsNone(images.rendition_manifest(self.url))
+        self.assertIsNone(images.rendition_manifest('/uploads/../settings.py'))
+
+    def test_avif_is_skipped_without_support(self):
+        with mock.patch.object(images, 'avif_supported', return_value=False):
+            manifest = images.generate_renditions(self.path, images.renditions_dir(self.path), formats=('webp', 'avif'))
+        self.assertEqual(set(manifest['renditions']['thumb']['formats']), {'jpg', 'webp'})
+
+    def test_avif_support_is_checked_once(self):
+        images.avif_supported.cache_clear()
+        self.addCleanup(images.avif_supported.cache_clear)
+        with mock.patch('PIL.features.check', return_value=True) as check:
+            self.assertTrue(images.avif_supported())
+            self.assertTrue(images.avif_supported())
+        check.assert_called_once_with('avif')
+
+    @override_settings(IMAGE_RENDITION_FORMATS=('webp',))
+    def test_command_builds_missing_renditions(self):
+        if connection.vendor != 'postgresql':
+            fields = [(model, name) for model, name in images.media_url_fields() if supported(model)]
+            patcher = mock.patch('sda_backend.images.media_url_fields', return_value=fields)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        Service.objects.create(slug='design', image_url=self.url)
+        Service.objects.create(slug='missing', image_url='/uploads/services/missing.jpg')
+
+        out = io.StringIO()
+        call_command('generate_renditions', '--workers', '1', stdout=out)
+        self.assertIn('Done: 1 generated, 0 failed', out.getvalue())
+        self.assertEqual(images.rendition_manifest(self.url)['renditions']['thumb']['width'], 160)
+
+        out = io.StringIO()
+        call_command('generate_renditions', '--workers', '1', stdout=out)
+        self.assertIn('Generating renditions for 0 image(s)', out.getvalue())
@@ -0,0 +1,102 @@
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from sda_backend.management.commands.import_contacts import (
+    EMAIL_SQL, PHONE_DIGITS_SQL, PHONE_SQL, normalise_emails, normalise_phones,
+)
+from sda_backend.models import ContactMessage
+
+
+EMAILS = [' Name@Example.COM\t', 'plain@example.az', None, '']
+PHONES = ['+994 (50) 123-45-67', '00994501234567', '+994+50', '050 123', None, '']
+
+
+class NormaliseTests(SimpleTestCase):
+    def test_emails(self):
+        self.assertEqual(normalise_emails(EMAILS), ['name@example.com', 'plain@example.az', '', ''])
+
+    def test_phones(self):
+        self.assertEqual(normalise_phones(PHONES), ['+994501234567', '+994501234567', '+99450', '050123', '', ''])
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'the SQL normalisation needs PostgreSQL')
+class NormaliseSqlTests(TestCase):
+    def normalised(self, expression, values):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT %s FROM unnest(%%s::text[]) WITH ORDINALITY AS t(v, n) ORDER BY n' % expression, [values],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_sql_matches_python(self):
+        self.assertEqual(self.normalised(EMAIL_SQL.format('t.v'), EMAILS), normalise_emails(EMAILS))
+        phone_sql = PHONE_SQL.format(PHONE_DIGITS_SQL.format('t.v'))
+        self.assertEqual(self.normalised(phone_sql, PHONES), normalise_phones(PHONES))
+
+
+class ImportContactsTests(TestCase):
+    CSV = (
+        'name,email,phone_number,created_at,is_read,status\n'
+        'Ann,ANN@example.az ,+994 50 111 11 11,2025-01-02T10:00:00+00:00,yes,\n'
+        'Ann again,ann@example.az,00994501111111,2025-01-02T10:00:00+00:00,,\n'
+        'Bob,,050-222,2025-01-03T10:00:00+00:00,0,replied\n'
+        'Stored,Web@Example.az,+994 50 333,2025-01-04T10:00:00+00:00,,\n'
+        'No date,c@example.az,,not a date,,\n'
+        'Nobody,,,2025-01-05T10:00:00+00:00,,\n'
+    )
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'leads.csv')
+        with open(self.path, 'w') as leads:
+            leads.write(self.CSV)
+        # Saved by the web form, not normalised
+        stored = ContactMessage.objects.create(name='Web', email='web@example.AZ ', phone_number='+994 (50) 333')
+        ContactMessage.objects.filter(pk=stored.pk).update(
+            created_at=datetime.datetime(2025, 1, 4, 10, tzinfo=datetime.timezone.utc),
+        )
+
+    def run_import(self, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_contacts', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_rows_are_normalised_and_deduplicated(self):
+        out, err = self.run_import(self.path)
+        self.assertIn('Imported 2 of 6 rows', out)
+        self.assertIn('2 duplicates, 2 rejected', out)
+        self.assertIn('Row 5: missing or invalid created_at', err)
+        self.assertIn('Row 6: no email or phone number', err)
+
+        ann = ContactMessage.objects.get(name='Ann')
+        self.assertEqual((ann.email, ann.phone_number, ann.is_read, ann.status), ('ann@example.az', '+994501111111', True, 'new'))
+        self.assertEqual(ann.updated_at, ann.created_at)
+        bob = ContactMessage.objects.get(name='Bob')
+        self.assertEqual((bob.email, bob.phone_number, bob.is_read, bob.status), ('', '050222', False, 'replied'))
+        self.assertFalse(ContactMessage.objects.filter(name='Stored').exists())
+
+        out, _ = self.run_import(self.path)
+        self.assertIn('Imported 0 of 6 rows', out)
+        self.assertEqual(ContactMessage.objects.count(), 3)
+
+    def test_dry_run_rolls_back(self):
+        out, _ = self.run_import(self.path, '--dry-run')
+        self.assertIn('Would import 2 of 6 rows', out)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_jsonl(self):
+        path = self.path.replace('.csv', '.jsonl')
+        with open(path, 'w') as leads:
+            leads.write('{"email": "J@example.az", "created_at": "2025-02-01T09:00:00"}\n\n')
+            leads.write('{"email": "j@example.az", "created_at": "2025-02-01T09:00:00"}\n')
+        out, _ = self.run_import(path)
+        self.assertIn('Imported 1 of 2 rows', out)
@@ -0,0 +1,100 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from sda_backend.models import Project, PropertySector, Service
+from sda_backend.storage import media_storage
+from sda_backend.tests.test_images import save_image
+from sda_backend.tests.test_storage import MediaRootMixin
+
+
+@override_settings(IMAGE_RENDITIONS_ENABLED=False)
+class ImportProjectsTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source, ignore_errors=True)
+        self.sector = PropertySector.objects.create(title_en='Offices')
+        self.design = Service.objects.create(slug='design')
+        self.build = Service.objects.create(slug='build')
+        for name in ('tower/cover.jpg', 'tower/1.jpg', 'tower/2.png', 'park/1.jpg'):
+            save_image(os.path.join(self.source, name), fmt='PNG' if name.endswith('.png') else 'JPEG')
+        with open(os.path.join(self.source, 'park', 'broken.jpg'), 'wb') as broken:
+            broken.write(b'\xff\xd8\xff' + b'\x00' * 20)
+        self.manifest = [
+            {
+                'slug': 'tower', 'title_en': 'Tower', 'year': '2023', 'property_sector': self.sector.pk,
+                'cover_photo': 'tower/cover.jpg', 'photos': ['tower/1.jpg', 'tower/2.png'],
+                'services': ['build', self.design.pk], 'solutions': [{'title_en': 'Facade'}, {'title_en': 'Lobby'}],
+            },
+            {'slug': 'park', 'photos': ['park/1.jpg', 'park/broken.jpg']},
+            {'slug': 'bridge', 'services': ['paint']},
+            {'slug': 'escape', 'photos': ['../outside.jpg']},
+        ]
+
+    def write_manifest(self):
+        with open(os.path.join(self.source, 'manifest.json'), 'w') as manifest:
+            json.dump(self.manifest, manifest)
+
+    def run_import(self, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_projects', *args, '--workers', '1', stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_and_rerun(self):
+        self.write_manifest()
+        out, err = self.run_import(self.source)
+        self.assertIn('Imported 1 project(s), 2 photo(s), 2 service link(s), 2 solution(s)', out)
+        self.assertIn('3 failed', out)
+        self.assertIn("bridge: unknown service 'paint'", err)
+        self.assertIn('escape: ../outside.jpg is outside the import source', err)
+        self.assertIn('park: broken.jpg is not a valid image', err)
+
+        tower = Project.objects.get(slug='tower')
+        self.assertEqual((tower.title_en, tower.year, tower.property_sector_id), ('Tower', 2023, self.sector.pk))
+        self.assertTrue(tower.cover_photo_url.endswith('.jpg'))
+        self.assertEqual([photo.image_url.rsplit('.', 1)[1] for photo in tower.photos.order_by('order')], ['jpg', 'png'])
+        self.assertEqual(list(tower.projectservice_set.order_by('order').values_list('service__slug', flat=True)), ['build', 'design'])
+        self.assertEqual(list(tower.solutions.order_by('order').values_list('title_en', flat=True)), ['Facade', 'Lobby'])
+        self.assertFalse(Project.objects.filter(slug='park').exists())
+        # The valid photo of the failed project was not left behind
+        self.assertEqual(os.listdir(media_storage.incoming_dir()), [])
+
+        out, _ = self.run_import(self.source)
+        self.assertIn('1 already imported, 1 to import, 2 invalid', out)
+        self.assertEqual(Project.objects.count(), 1)
+
+    def test_zip_with_csv_manifest(self):
+        with open(os.path.join(self.source, 'manifest.csv'), 'w', newline='') as manifest:
+            manifest.write('slug,title_en,photos,services\ntower,Tower,tower/1.jpg|tower/2.png,design|build\n')
+        archive = os.path.join(self.source, 'seed.zip')
+        with zipfile.ZipFile(archive, 'w') as zipped:
+            for name in ('manifest.csv', 'tower/1.jpg', 'tower/2.png'):
+                zipped.write(os.path.join(self.source, name), name)
+
+        out, _ = self.run_import(archive)
+        self.assertIn('Imported 1 project(s), 2 photo(s), 2 service link(s), 0 solution(s)', out)
+        self.assertEqual(Project.objects.get(slug='tower').photos.count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        self.manifest = self.manifest[:1]
+        self.write_manifest()
+        out, _ = self.run_import(self.source, '--dry-run')
+        self.assertIn('Would import 1 project(s), 2 photo(s)', out)
+        self.assertFalse(Project.objects.exists())
+        self.assertEqual([files for _, _, files in os.walk(self.media_root) if files], [])
+
+    def test_invalid_manifests(self):
+        with self.assertRaisesMessage(CommandError, 'No manifest found'):
+            self.run_import(self.source)
+        self.manifest.append({'slug': 'tower'})
+        self.write_manifest()
+        with self.assertRaisesMessage(CommandError, "Slug 'tower' appears more than once"):
+            self.run_import(self.source)
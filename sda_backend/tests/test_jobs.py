@@ -0,0 +1,133 @@
+import datetime
+import threading
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from sda_backend import jobs
+from sda_backend.models import ContactMessage, Job
+
+
+@override_settings(JOB_RETRY_DELAY_SECONDS=10, JOB_MAX_RETRY_DELAY_SECONDS=3600, JOB_TIMEOUT_SECONDS=600)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.register('test.ok', lambda job, value: self.calls.append(value) or {'value': value})
+        self.register('test.broken', self.broken)
+
+    def register(self, name, func):
+        jobs.register(name)(func)
+        self.addCleanup(jobs.REGISTRY.pop, name)
+
+    def broken(self, job, **kwargs):
+        raise RuntimeError('boom')
+
+    def test_claim_order_and_schedule(self):
+        low = jobs.enqueue('test.ok', value=1)
+        high = jobs.enqueue('test.ok', value=2, priority=5)
+        later = jobs.enqueue('test.ok', value=3, priority=9, delay=60)
+
+        claimed = jobs.claim('w1')
+        self.assertEqual(claimed.pk, high.pk)
+        self.assertEqual((claimed.status, claimed.worker, claimed.attempts), (Job.RUNNING, 'w1', 1))
+        self.assertEqual(jobs.claim('w2').pk, low.pk)
+        self.assertIsNone(jobs.claim('w3'))
+        self.assertEqual(Job.objects.get(pk=later.pk).status, Job.QUEUED)
+
+    def test_enqueue_needs_a_registered_job(self):
+        with self.assertRaises(KeyError):
+            jobs.enqueue('test.missing')
+
+    def test_successful_run_records_the_result(self):
+        jobs.enqueue('test.ok', value=7)
+        self.assertTrue(jobs.run(jobs.claim('w1')))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.result, job.last_error), (Job.DONE, {'value': 7}, None))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failures_are_retried_with_backoff_then_given_up(self):
+        jobs.enqueue('test.broken', max_attempts=2)
+        with self.assertLogs('sda_backend.jobs', 'WARNING'):
+            started = timezone.now()
+            self.assertFalse(jobs.run(jobs.claim('w1')))
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('RuntimeError: boom', job.last_error)
+        self.assertGreaterEqual(job.run_at, started + datetime.timedelta(seconds=10))
+        self.assertIsNone(jobs.claim('w1'))
+
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs('sda_backend.jobs', 'WARNING'):
+            jobs.run(jobs.claim('w1'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_unregistered_job_fails_without_retry(self):
+        job = jobs.enqueue('test.ok', value=1)
+        Job.objects.filter(pk=job.pk).update(name='test.removed')
+        with self.assertLogs('sda_backend.jobs', 'WARNING'):
+            jobs.run(jobs.claim('w1'))
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+
+    def test_stale_jobs_are_requeued(self):
+        alive, dead, spent = (jobs.enqueue('test.ok', value=value, max_attempts=1 if value == 3 else 3) for value in (1, 2, 3))
+        for job in (alive, dead, spent):
+            jobs.claim(f'w{job.pk}')
+        Job.objects.filter(pk__in=[dead.pk, spent.pk]).update(heartbeat_at=timezone.now() - datetime.timedelta(hours=1))
+
+        self.assertEqual(jobs.requeue_stale(), 2)
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {alive.pk: Job.RUNNING, dead.pk: Job.QUEUED, spent.pk: Job.FAILED})
+
+    def test_a_requeued_run_cannot_overwrite_the_next_one(self):
+        def requeued_meanwhile(job, value):
+            # The heartbeat went stale and another worker took the job over
+            Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - datetime.timedelta(hours=1))
+            jobs.requeue_stale()
+            self.assertEqual(jobs.claim('w2').attempts, 2)
+            return {'value': value}
+
+        self.register('test.slow', requeued_meanwhile)
+        jobs.enqueue('test.slow', value=1)
+        with self.assertLogs('sda_backend.jobs', 'WARNING') as logs:
+            self.assertFalse(jobs.run(jobs.claim('w1')))
+        self.assertIn('result dropped', logs.output[0])
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.worker, job.result), (Job.RUNNING, 'w2', None))
+
+        stale = Job.objects.get()
+        stale.worker, stale.attempts = 'w1', 1
+        with self.assertRaises(Job.Lost):
+            stale.set_progress(1, 2)
+        with self.assertLogs('sda_backend.jobs', 'WARNING'):
+            jobs.fail(stale, RuntimeError('late'))
+        self.assertEqual(Job.objects.get().status, Job.RUNNING)
+
+    def test_progress_is_saved_while_owned(self):
+        jobs.enqueue('test.ok', value=1)
+        job = jobs.claim('w1')
+        job.set_progress(3, 10, 'Working')
+        job.refresh_from_db()
+        self.assertEqual((job.progress, job.total, job.message), (3, 10, 'Working'))
+
+    def test_contacts_update_job(self):
+        messages = [ContactMessage.objects.create(phone_number='1', email=f'{index}@example.az') for index in range(3)]
+        jobs.enqueue('contacts.update', pks=[message.pk for message in messages[:2]], values={'is_read': True})
+        jobs.run(jobs.claim('w1'))
+        job = Job.objects.get()
+        self.assertEqual((job.result, job.progress, job.total), ({'updated': 2}, 2, 2))
+        self.assertEqual(ContactMessage.objects.filter(is_read=True).count(), 2)
+
+
+class WorkerTests(TransactionTestCase):
+    """work() closes its connection when it returns, which a TestCase transaction would not survive."""
+
+    def test_burst_worker_runs_everything_due(self):
+        calls = []
+        jobs.register('test.ok')(lambda job, value: calls.append(value))
+        self.addCleanup(jobs.REGISTRY.pop, 'test.ok')
+        for value in range(3):
+            jobs.enqueue('test.ok', value=value)
+        self.assertEqual(jobs.work('w1', threading.Event(), burst=True), 3)
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 3)
@@ -0,0 +1,114 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from sda_backend.models import Project, ProjectSolution, Service, ServiceBenefit
+from sda_backend.ordering import compact, move
+
+
+def orders(queryset):
+    return list(queryset.order_by('order', 'pk').values_list('pk', 'order'))
+
+
+class OrderingTests(TestCase):
+    def setUp(self):
+        self.service, self.other = (Service.objects.create(slug=slug, name=slug, order=index) for index, slug in enumerate(['a', 'b']))
+        self.benefits = [ServiceBenefit.objects.create(service=self.service, title=str(index), order=index + 1) for index in range(4)]
+        self.untouched = [ServiceBenefit.objects.create(service=self.other, title=str(index), order=10) for index in range(2)]
+
+    def test_move_before(self):
+        first, second, third, fourth = (benefit.pk for benefit in self.benefits)
+        self.assertEqual(move(ServiceBenefit, fourth, second), {fourth: 2, second: 3, third: 4})
+        self.assertEqual(orders(self.service.benefits.all()), [(first, 1), (fourth, 2), (second, 3), (third, 4)])
+
+    def test_move_after(self):
+        first, second, third, fourth = (benefit.pk for benefit in self.benefits)
+        self.assertEqual(move(ServiceBenefit, first, third, after=True), {second: 1, third: 2, first: 3})
+        self.assertEqual(orders(self.service.benefits.all()), [(second, 1), (third, 2), (first, 3), (fourth, 4)])
+
+    def test_move_leaves_other_scopes_alone(self):
+        move(ServiceBenefit, self.benefits[3].pk, self.benefits[0].pk)
+        self.assertEqual([order for _, order in orders(self.other.benefits.all())], [10, 10])
+
+    def test_move_to_the_same_place_changes_nothing(self):
+        self.assertEqual(move(ServiceBenefit, self.benefits[1].pk, self.benefits[2].pk), {})
+
+    def test_compact_closes_gaps_and_breaks_ties_by_id(self):
+        ServiceBenefit.objects.filter(pk=self.benefits[0].pk).update(order=7)
+        changed = compact(ServiceBenefit)
+        self.assertEqual(orders(self.service.benefits.all()), [
+            (self.benefits[1].pk, 1), (self.benefits[2].pk, 2), (self.benefits[3].pk, 3), (self.benefits[0].pk, 4),
+        ])
+        self.assertEqual(orders(self.other.benefits.all()), [(self.untouched[0].pk, 1), (self.untouched[1].pk, 2)])
+        self.assertEqual(set(changed), {benefit.pk for benefit in self.benefits + self.untouched})
+        self.assertEqual(compact(ServiceBenefit), {})
+
+    def test_compact_unscoped_table(self):
+        Service.objects.filter(pk=self.service.pk).update(order=5)
+        self.assertEqual(compact(Service), {self.service.pk: 2})
+        self.assertEqual(orders(Service.objects.all()), [(self.other.pk, 1), (self.service.pk, 2)])
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'the production database is PostgreSQL')
+class PostgresOrderingTests(TestCase):
+    """The renumbering UPDATE ... FROM ... RETURNING with its CTEs, on the database the admin runs on."""
+
+    def setUp(self):
+        self.project, self.other = (Project.objects.create(slug=slug) for slug in ('a', 'b'))
+        self.solutions = [ProjectSolution.objects.create(project=self.project, title_en=str(index), order=index + 1) for index in range(3)]
+        self.untouched = ProjectSolution.objects.create(project=self.other, title_en='x', order=5)
+
+    def test_move_renumbers_the_scope_and_touches_updated_at(self):
+        first, second, third = (solution.pk for solution in self.solutions)
+        before = ProjectSolution.objects.get(pk=second).updated_at
+        self.assertEqual(move(ProjectSolution, third, first), {third: 1, first: 2, second: 3})
+        self.assertEqual(orders(self.project.solutions.all()), [(third, 1), (first, 2), (second, 3)])
+        self.assertGreater(ProjectSolution.objects.get(pk=second).updated_at, before)
+        self.assertEqual(ProjectSolution.objects.get(pk=self.untouched.pk).order, 5)
+
+    def test_move_after_the_last_row(self):
+        first, second, third = (solution.pk for solution in self.solutions)
+        self.assertEqual(move(ProjectSolution, first, third, after=True), {second: 1, third: 2, first: 3})
+
+    def test_compact(self):
+        self.assertEqual(compact(ProjectSolution), {self.untouched.pk: 1})
+
+
+class ReorderViewTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.az', 'password'))
+        self.url = reverse('admin:sda_backend_service_reorder')
+        self.services = [Service.objects.create(slug=f's{index}', name=f's{index}', order=index + 1) for index in range(3)]
+        self.benefits = [ServiceBenefit.objects.create(service=self.services[0], title=str(index), order=index + 1) for index in range(2)]
+
+    def test_changelist_move(self):
+        first, second, third = (service.pk for service in self.services)
+        response = self.client.post(self.url, {'id': third, 'before': first})
+        self.assertEqual(response.json(), {'orders': {str(third): 1, str(first): 2, str(second): 3}})
+
+    def test_inline_move(self):
+        first, second = (benefit.pk for benefit in self.benefits)
+        response = self.client.post(self.url, {
+            'id': first, 'after': second, 'inline': 'benefits', 'object_id': self.services[0].pk,
+        })
+        self.assertEqual(response.json(), {'orders': {str(second): 1, str(first): 2}})
+
+    def test_rows_of_another_scope_are_rejected(self):
+        other = ServiceBenefit.objects.create(service=self.services[1], title='other', order=1)
+        with self.assertLogs('django.request', 'WARNING'):
+            response = self.client.post(self.url, {
+                'id': other.pk, 'before': self.benefits[0].pk, 'inline': 'benefits', 'object_id': self.services[0].pk,
+            })
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_rows(self):
+        with self.assertLogs('django.request', 'WARNING'):
+            response = self.client.post(self.url, {'id': self.services[0].pk, 'before': 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_post(self):
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.client.get(self.url).status_code, 405)
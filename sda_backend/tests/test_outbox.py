@@ -0,0 +1,100 @@
+import datetime
+from unittest import mock
+
+import requests
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from sda_backend import outbox
+from sda_backend.models import OutboxEvent
+
+
+def response(status):
+    answer = requests.Response()
+    answer.status_code = status
+    return answer
+
+
+@override_settings(
+    OUTBOX_ENABLED=True, OUTBOX_ENDPOINT='http://public.invalid/', OUTBOX_TOKEN='',
+    OUTBOX_COALESCE_SECONDS=2, OUTBOX_MAX_DELAY_SECONDS=30, OUTBOX_BATCH_SIZE=500, OUTBOX_MAX_ATTEMPTS=3,
+)
+class OutboxTests(TestCase):
+    def later(self, seconds):
+        return timezone.now() + datetime.timedelta(seconds=seconds)
+
+    def test_record_needs_outbox_enabled_not_an_endpoint(self):
+        with override_settings(OUTBOX_ENABLED=False):
+            outbox.record({('project', 1)})
+        self.assertFalse(OutboxEvent.objects.exists())
+        with override_settings(OUTBOX_ENDPOINT=''):
+            outbox.record({('project', 1), ('news', 2)})
+        self.assertEqual(OutboxEvent.objects.count(), 2)
+
+    def test_changes_to_one_entity_are_coalesced(self):
+        for _ in range(3):
+            outbox.record({('project', 7)})
+        outbox.record({('service', 1)})
+
+        self.assertEqual(outbox.ready_batch(now=timezone.now()), [])
+        batch = outbox.ready_batch(now=self.later(3))
+        self.assertEqual(
+            [(item['entity'], item['object_id'], item['changes']) for item in batch],
+            [('project', 7, 3), ('service', 1, 1)],
+        )
+
+    def test_busy_entity_is_sent_after_the_max_delay(self):
+        outbox.record({('project', 7)})
+        OutboxEvent.objects.update(created_at=timezone.now() - datetime.timedelta(seconds=31))
+        outbox.record({('project', 7)})
+        self.assertEqual([item['changes'] for item in outbox.ready_batch()], [2])
+
+    def test_delivery_leaves_later_changes_pending(self):
+        outbox.record({('project', 7)})
+        batch = outbox.ready_batch(now=self.later(3))
+        outbox.record({('project', 7)})
+        with mock.patch('sda_backend.outbox.requests.post', return_value=response(204)) as post:
+            self.assertTrue(outbox.deliver(batch))
+        sent = post.call_args.kwargs['json']['invalidations']
+        self.assertEqual([(item['entity'], item['id']) for item in sent], [('project', 7)])
+        self.assertEqual(OutboxEvent.objects.filter(delivered_at__isnull=True).count(), 1)
+
+    def test_rejected_entity_is_moved_aside_after_max_attempts(self):
+        outbox.record({('project', 7)})
+        batch = outbox.ready_batch(now=self.later(3))
+        with mock.patch('sda_backend.outbox.requests.post', return_value=response(422)), \
+                self.assertLogs('sda_backend.outbox', 'WARNING'):
+            for _ in range(3):
+                self.assertFalse(outbox.deliver(batch))
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 3)
+        self.assertIsNotNone(event.failed_at)
+        self.assertEqual(outbox.ready_batch(now=self.later(3)), [])
+
+        self.assertEqual(outbox.retry_failed(), 1)
+        self.assertEqual(len(outbox.ready_batch(now=self.later(3))), 1)
+
+    def test_unavailable_endpoint_never_moves_events_aside(self):
+        outbox.record({('project', 7)})
+        batch = outbox.ready_batch(now=self.later(3))
+        for status in (503, 500, 429, 408):
+            with mock.patch('sda_backend.outbox.requests.post', return_value=response(status)):
+                for _ in range(5):
+                    self.assertFalse(outbox.deliver(batch))
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 20)
+        self.assertIsNone(event.failed_at)
+        self.assertEqual(len(outbox.ready_batch(now=self.later(3))), 1)
+
+    def test_connection_errors_and_shared_batches_are_not_moved_aside(self):
+        outbox.record({('project', 7), ('project', 8)})
+        batch = outbox.ready_batch(now=self.later(3))
+        with mock.patch('sda_backend.outbox.requests.post', return_value=response(500)):
+            for _ in range(3):
+                outbox.deliver(batch)
+        single = [item for item in batch if item['object_id'] == 7]
+        with mock.patch('sda_backend.outbox.requests.post', side_effect=requests.ConnectionError('refused')):
+            for _ in range(3):
+                outbox.deliver(single)
+        self.assertFalse(OutboxEvent.objects.filter(failed_at__isnull=False).exists())
+        self.assertEqual(OutboxEvent.objects.get(object_id=7).attempts, 6)
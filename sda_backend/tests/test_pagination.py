@@ -0,0 +1,96 @@
+import datetime
+from unittest import mock
+from urllib.parse import parse_qs
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from sda_backend.models import ContactMessage
+from sda_backend.pagination import EstimatedCountPaginator, encode_cursor, seek_filter
+
+
+class SeekFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        base = timezone.now().replace(microsecond=0)
+        for minute in (1, 1, 1, 2, 3, 3):
+            message = ContactMessage.objects.create(phone_number='1', email='a@example.az')
+            ContactMessage.objects.filter(pk=message.pk).update(created_at=base + datetime.timedelta(minutes=minute))
+        cls.ordered = list(ContactMessage.objects.order_by('-created_at', '-pk').values_list('created_at', 'pk'))
+
+    def after(self, key, **kwargs):
+        return list(
+            ContactMessage.objects.filter(seek_filter(('-created_at', '-pk'), key, **kwargs))
+            .order_by('-created_at', '-pk').values_list('created_at', 'pk')
+        )
+
+    def test_seek_breaks_ties_on_the_primary_key(self):
+        for position, key in enumerate(self.ordered):
+            self.assertEqual(self.after(key), self.ordered[position + 1:])
+            self.assertEqual(self.after(key, inclusive=True), self.ordered[position:])
+            before = self.after(key, forward=False)
+            self.assertEqual(before, self.ordered[:position])
+
+    def test_cursor_encoding(self):
+        moment = datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        self.assertEqual(encode_cursor([moment, 42]), '2026-01-02T03:04:05+00:00,42')
+
+
+class KeysetChangeListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.az', 'password')
+        base = timezone.now()
+        for index in range(8):
+            message = ContactMessage.objects.create(phone_number=str(index), email=f'{index}@example.az')
+            # Pairs of rows share a timestamp
+            ContactMessage.objects.filter(pk=message.pk).update(created_at=base + datetime.timedelta(minutes=index // 2))
+        cls.expected = list(ContactMessage.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        patcher = mock.patch.object(admin.site._registry[ContactMessage], 'list_per_page', 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse('admin:sda_backend_contactmessage_changelist')
+
+    def page(self, query=''):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        changelist = response.context['cl']
+        return changelist.keyset_page, [message.pk for message in changelist.result_list]
+
+    def test_pages_forward_and_back_without_gaps(self):
+        pages = []
+        keyset_page, rows = self.page()
+        self.assertFalse(keyset_page.has_previous)
+        pages.append((keyset_page, rows))
+        while keyset_page.has_next:
+            keyset_page, rows = self.page(keyset_page.next_url)
+            pages.append((keyset_page, rows))
+        self.assertEqual([pk for _, rows in pages for pk in rows], self.expected)
+        self.assertEqual(len(pages), 3)
+
+        for previous, current in zip(pages, pages[1:]):
+            self.assertIn('before', parse_qs(current[0].previous_url[1:]))
+            _, rows = self.page(current[0].previous_url)
+            self.assertEqual(rows, previous[1])
+
+    def test_offset_pages_and_other_orderings_use_the_regular_paginator(self):
+        keyset_page, rows = self.page('?p=2')
+        self.assertIsNone(keyset_page)
+        self.assertEqual(rows, self.expected[3:6])
+        keyset_page, _ = self.page('?o=3')
+        self.assertIsNone(keyset_page)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url + '?after=yesterday,1')
+        self.assertRedirects(response, self.url + '?e=1', fetch_redirect_response=False)
+
+    def test_small_lists_are_counted_exactly(self):
+        paginator = EstimatedCountPaginator(ContactMessage.objects.all(), 3)
+        self.assertEqual(paginator.count, 8)
+        self.assertFalse(paginator.estimated)
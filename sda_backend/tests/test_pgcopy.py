@@ -0,0 +1,53 @@
+import csv
+import datetime
+import io
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from sda_backend.models import ContactMessage
+from sda_backend.pgcopy import CopyBuffer, array_literal, copy_value, csv_line, load_rows
+
+
+class CopyEncodingTests(SimpleTestCase):
+    def test_values(self):
+        moment = datetime.datetime(2026, 3, 1, 12, 30, tzinfo=datetime.timezone.utc)
+        self.assertIsNone(copy_value(None))
+        self.assertEqual(copy_value(True), 't')
+        self.assertEqual(copy_value(False), 'f')
+        self.assertEqual(copy_value(7), '7')
+        self.assertEqual(copy_value(moment), '2026-03-01T12:30:00+00:00')
+        self.assertEqual(copy_value(['a', 'b "c"', None]), '{"a","b \\"c\\"",NULL}')
+        self.assertEqual(array_literal(['back\\slash']), '{"back\\\\slash"}')
+
+    def test_only_none_is_null(self):
+        self.assertEqual(csv_line([None, '', 'x']), ',"","x"\n')
+
+    def test_quotes_and_newlines_survive(self):
+        row = ['say "hi"', 'two\nlines', 'a,b', '']
+        line = csv_line(row)
+        self.assertEqual(line, '"say ""hi""","two\nlines","a,b",""\n')
+        self.assertEqual(next(csv.reader(io.StringIO(line))), row)
+
+    def test_buffer_streams_rows_in_reads_of_any_size(self):
+        rows = [(index, f'name "{index}"', None) for index in range(100)]
+        expected = ''.join(csv_line(row) for row in rows)
+        for size in (1, 7, 64, -1):
+            buffer = CopyBuffer(rows)
+            chunks = []
+            while data := buffer.read(size):
+                self.assertLessEqual(len(data), len(expected) if size < 0 else size)
+                chunks.append(data)
+            self.assertEqual(''.join(chunks), expected)
+            self.assertEqual(buffer.count, 100)
+
+
+class LoadRowsTests(TestCase):
+    def test_rows_are_inserted_as_given(self):
+        names = ('email', 'phone_number', 'is_read', 'status', 'created_at', 'updated_at')
+        fields = [ContactMessage._meta.get_field(name) for name in names]
+        created = timezone.now() - datetime.timedelta(days=400)
+        rows = ((f'{index}@example.az', '+99450', False, 'new', created, created) for index in range(12))
+        self.assertEqual(load_rows(connection, ContactMessage, fields, rows), 12)
+        self.assertEqual(ContactMessage.objects.filter(created_at=created, updated_at=created).count(), 12)
@@ -0,0 +1,104 @@
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from sda_backend.middleware import QueryRecorder, SharedRotatingFileHandler, fingerprint
+from sda_backend.models import Service
+
+
+class QueryRecorderTests(SimpleTestCase):
+    def test_in_lists_are_collapsed(self):
+        self.assertEqual(fingerprint('SELECT 1 WHERE id IN (%s, %s,%s) AND x IN (%s)'), 'SELECT 1 WHERE id IN (...) AND x IN (%s)')
+
+    def test_repeated_statements(self):
+        recorder = QueryRecorder()
+        for sql, params in [('SELECT a WHERE id = %s', (1,)), ('SELECT a WHERE id = %s', (2,)), ('SELECT b', ())]:
+            recorder(lambda *args: None, sql, params, False, {})
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual([(duplicate['count'], duplicate['sql']) for duplicate in recorder.duplicates(5)], [(2, 'SELECT a WHERE id = %s')])
+        self.assertEqual(len(recorder.slowest(2)), 2)
+
+
+class MiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser('admin', 'admin@example.az', 'password')
+        self.client.force_login(self.user)
+        for index in range(3):
+            Service.objects.create(slug=f's{index}')
+        self.url = reverse('admin:sda_backend_service_changelist')
+
+    def test_off_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+
+    @override_settings(ADMIN_PROFILING=True)
+    def test_admin_requests_are_logged_by_view(self):
+        with self.assertLogs('sda_backend.profile', 'INFO') as logs:
+            response = self.client.get(self.url)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$')
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual((entry['view'], entry['method'], entry['status']), ('sda_backend_service_changelist', 'GET', 200))
+        self.assertGreater(entry['queries'], 0)
+        self.assertIn(f'desc="{entry["queries"]} queries"', response['Server-Timing'])
+
+    @override_settings(ADMIN_PROFILING=True)
+    def test_timing_header_is_for_staff_only(self):
+        self.client.logout()
+        with self.assertLogs('sda_backend.profile', 'INFO'):
+            response = self.client.get(reverse('admin:login'))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(ADMIN_PROFILING=True, ADMIN_PROFILE_PATH_PREFIX='/admin/sda_backend/project/')
+    def test_only_the_profiled_prefix(self):
+        with self.assertNoLogs('sda_backend.profile', 'INFO'):
+            response = self.client.get(self.url)
+        self.assertNotIn('Server-Timing', response)
+
+
+class SharedRotatingFileHandlerTests(SimpleTestCase):
+    def test_a_file_rotated_by_another_process_is_reopened(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'logs', 'profile.jsonl')
+            handlers = [SharedRotatingFileHandler(path, maxBytes=30, backupCount=2) for _ in range(2)]
+            for handler in handlers:
+                handler.setFormatter(logging.Formatter('%(message)s'))
+            record = logging.makeLogRecord({'msg': 'x' * 20})
+            handlers[0].emit(record)
+            handlers[1].emit(record)  # rotates profile.jsonl away from handler 0
+            handlers[0].emit(record)
+            for handler in handlers:
+                handler.close()
+            with open(path) as current, open(path + '.1') as backup:
+                self.assertEqual((current.read(), backup.read()), ('x' * 20 + '\n', 'x' * 20 + '\n'))
+
+
+class AdminProfileCommandTests(SimpleTestCase):
+    def write_log(self, entries):
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        self.addCleanup(os.unlink, path)
+        with os.fdopen(fd, 'w') as log:
+            for entry in entries:
+                log.write(json.dumps(entry) + '\n')
+            log.write('not json\n')
+        return path
+
+    def test_report(self):
+        now = time.time()
+        duplicate = {'fingerprint': 'abc', 'count': 12, 'sql': 'SELECT ... FROM "projects" WHERE id = %s'}
+        path = self.write_log(
+            [{'ts': now, 'view': 'changelist', 'ms': ms, 'sql_ms': 1.0, 'queries': 12, 'duplicates': [duplicate]} for ms in range(1, 101)]
+            + [{'ts': now - 7200, 'view': 'old', 'ms': 5.0, 'sql_ms': 1.0, 'queries': 3, 'duplicates': []}]
+        )
+        out = io.StringIO()
+        call_command('admin_profile', path, '--since', '1h', '--duplicates', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[1].split(), ['changelist', '100', '50.0', '95.0', '99.0', '1.0', '12.0', '12'])
+        self.assertIn('repeated in 100 request(s), e.g. 12x: SELECT', lines[2])
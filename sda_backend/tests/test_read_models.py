@@ -0,0 +1,90 @@
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+from sda_backend import read_models
+from sda_backend.models import Project, ProjectPhoto, ProjectService, PropertySector, ReadModel, Service
+from sda_backend.snapshots import content_models
+
+
+def document(entity, pk, language='en'):
+    return ReadModel.objects.get(entity=entity, object_id=pk, language=language).document
+
+
+class ReadModelTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sector = PropertySector.objects.create(title_en='Offices', title_az='Ofislər')
+            self.service = Service.objects.create(slug='design', name_en='Design')
+            self.project = Project.objects.create(slug='tower', title_en='Tower', property_sector=self.sector)
+
+    def test_save_with_inlines_rebuilds_the_project_once(self):
+        with mock.patch('sda_backend.read_models.publish', wraps=read_models.publish) as publish:
+            with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                self.project.title_az = 'Qüllə'
+                self.project.save()
+                ProjectPhoto.objects.create(project=self.project, image_url='/uploads/2.jpg', order=2)
+                ProjectPhoto.objects.create(project=self.project, image_url='/uploads/1.jpg', order=1)
+                ProjectService.objects.create(project=self.project, service=self.service, order=1)
+        publish.assert_called_once_with('project', {self.project.pk})
+
+        self.assertEqual(ReadModel.objects.filter(entity='project', object_id=self.project.pk).count(), 3)
+        az = document('project', self.project.pk, 'az')
+        self.assertEqual((az['title'], az['slug']), ('Qüllə', 'tower'))
+        self.assertEqual([photo['image_url'] for photo in az['photos']], ['/uploads/1.jpg', '/uploads/2.jpg'])
+        self.assertEqual(az['property_sector']['title'], 'Ofislər')
+        self.assertEqual([service['name'] for service in az['services']], ['Design'])
+        # Untranslated fields fall back to English
+        self.assertEqual(document('project', self.project.pk, 'ru')['title'], 'Tower')
+
+    def test_related_changes_rebuild_the_documents_that_embed_them(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.featured_project_1 = self.project
+            self.service.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sector.title_en = 'Workspaces'
+            self.sector.save()
+            self.project.title_en = 'Baku Tower'
+            self.project.save()
+        self.assertEqual(document('project', self.project.pk)['property_sector']['title'], 'Workspaces')
+        self.assertEqual(document('service', self.service.pk)['featured_projects'][0]['title'], 'Baku Tower')
+
+    def test_delete_removes_the_documents(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()
+        self.assertFalse(ReadModel.objects.filter(entity='project').exists())
+
+    def test_failed_rebuild_does_not_fail_the_save(self):
+        with mock.patch('sda_backend.read_models.publish', side_effect=RuntimeError('boom')):
+            with self.assertLogs('sda_backend.read_models', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+                self.project.title_en = 'Renamed'
+                self.project.save()
+        self.assertEqual(Project.objects.get().title_en, 'Renamed')
+        self.assertEqual(document('project', self.project.pk)['title'], 'Tower')
+
+
+class RebuildReadModelsTests(TransactionTestCase):
+    """The command builds batches in threads with their own connections, which only see committed rows."""
+
+    def tearDown(self):
+        # Only the admin's own tables are flushed between TransactionTestCases
+        for model in reversed(content_models()):
+            model._base_manager.all().delete()
+
+    def test_rebuild_writes_every_document_and_removes_stale_ones(self):
+        sector = PropertySector.objects.create(title_en='Offices')
+        projects = [Project.objects.create(slug=f'p{index}', title_en=f'P{index}', property_sector=sector) for index in range(3)]
+        ReadModel.objects.all().delete()
+        ReadModel.objects.create(entity='project', object_id=999, language='en', document={})
+
+        out = io.StringIO()
+        call_command('rebuild_read_models', '--entity', 'project', '--batch-size', '2', '--workers', '2', stdout=out)
+        self.assertIn('project: 9 documents for 3 objects, 1 stale removed', out.getvalue())
+        self.assertEqual(
+            set(ReadModel.objects.values_list('object_id', flat=True)), {project.pk for project in projects},
+        )
+        self.assertEqual(document('project', projects[0].pk)['property_sector']['title'], 'Offices')
+        self.assertFalse(ReadModel.objects.filter(entity='property_sector').exists())
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from sda_backend import resolvers
+from sda_backend.choices import invalidate_project_choices
+from sda_backend.forms import PropertySectorAdminForm
+from sda_backend.models import Project, PropertySector
+from sda_backend.resolvers import ProjectResolver
+
+
+class ProjectResolverTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        resolvers._lru.clear()
+        self.addCleanup(resolvers._lru.clear)
+        self.tower, self.bridge, self.park = (Project.objects.create(slug=slug) for slug in ('tower', 'bridge', 'park'))
+
+    def test_ids_and_slugs_in_one_query(self):
+        resolver = ProjectResolver()
+        with self.assertNumQueries(1):
+            result = resolver.resolve(ids=[self.tower.pk, 0, None, 999], slugs=['bridge', 'missing', ''])
+        self.assertEqual(result, ({self.tower.pk: 'tower'}, {'bridge': self.bridge.pk}))
+        # Misses are remembered too
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve(ids=[999], slugs=['bridge']), ({}, {'bridge': self.bridge.pk}))
+
+    def test_lru_is_shared_between_resolvers_until_projects_change(self):
+        ProjectResolver().resolve(slugs=['park'])
+        with self.assertNumQueries(0):
+            self.assertEqual(ProjectResolver().resolve(ids=[self.park.pk]), ({self.park.pk: 'park'}, {}))
+
+        invalidate_project_choices()
+        with self.assertNumQueries(1):
+            ProjectResolver().resolve(ids=[self.park.pk])
+
+    def test_fresh_lookups_skip_the_lru(self):
+        ProjectResolver().resolve(slugs=['park'])
+        Project.objects.filter(pk=self.park.pk).update(slug='garden')  # no signal
+        self.assertEqual(ProjectResolver().resolve(slugs=['park']), ({}, {'park': self.park.pk}))
+        self.assertEqual(ProjectResolver().resolve(slugs=['park'], fresh=True), ({}, {}))
+
+
+class FeaturedProjectFormTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tower, self.bridge, self.park = (Project.objects.create(slug=slug) for slug in ('tower', 'bridge', 'park'))
+        self.sector = PropertySector.objects.create(
+            title_en='Offices', featured_project_1=self.tower, featured_project_2=self.bridge, featured_project_3=self.park,
+        )
+
+    def data(self, **values):
+        return {
+            'title_en': 'Offices', 'order': 0,
+            'featured_project_1': self.tower.pk, 'featured_project_2': self.bridge.pk, 'featured_project_3': self.park.pk,
+            'featured_project_1_slug': 'tower', 'featured_project_2_slug': 'bridge', 'featured_project_3_slug': 'park',
+            **values,
+        }
+
+    def test_current_slugs_are_looked_up_together(self):
+        resolvers._lru.clear()
+        with self.assertNumQueries(1):
+            form = PropertySectorAdminForm(instance=self.sector)
+        self.assertEqual([form.fields[f'featured_project_{number}_slug'].initial for number in (1, 2, 3)], ['tower', 'bridge', 'park'])
+
+    def test_edited_slugs_override_the_dropdowns(self):
+        form = PropertySectorAdminForm(
+            self.data(featured_project_1_slug='park', featured_project_3_slug='tower'), instance=self.sector,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        sector = form.save()
+        self.assertEqual(
+            (sector.featured_project_1_id, sector.featured_project_2_id, sector.featured_project_3_id),
+            (self.park.pk, self.bridge.pk, self.tower.pk),
+        )
+
+    def test_unknown_slug(self):
+        form = PropertySectorAdminForm(self.data(featured_project_2_slug='nowhere'), instance=self.sector)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['featured_project_2_slug'], ['Project with slug "nowhere" not found.'])
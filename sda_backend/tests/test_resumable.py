@@ -0,0 +1,151 @@
+import hashlib
+import io
+import os
+import time
+from types import SimpleNamespace
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from sda_backend.models import Service, ServiceProcess
+from sda_backend.resumable import UploadError, UploadSession, expired_sessions
+from sda_backend.storage import media_storage
+from sda_backend.tests.test_storage import MediaRootMixin
+from sda_backend.uploadhandlers import NOT_AN_IMAGE
+from sda_backend.widgets import ResumableFileInput
+
+
+PNG = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 2
+USER = SimpleNamespace(pk=1)
+
+
+@override_settings(UPLOAD_CHUNK_SIZE=200, UPLOAD_MAX_SIZE=10000, UPLOAD_FIELD_MAX_SIZES={'logo': 100})
+class UploadSessionTests(MediaRootMixin, SimpleTestCase):
+    def send(self, session, content, start, end=None, checksum=True, total=None):
+        end = min(len(content), start + 200) if end is None else end
+        chunk = content[start:end]
+        return session.receive_chunk(
+            io.BytesIO(chunk), f'bytes {start}-{end - 1}/{total or len(content)}',
+            hashlib.sha256(chunk).hexdigest() if checksum is True else checksum,
+        )
+
+    def assert_refused(self, status, call, *args, **kwargs):
+        with self.assertRaises(UploadError) as refused:
+            call(*args, **kwargs)
+        self.assertEqual(refused.exception.status, status)
+        return refused.exception
+
+    def test_chunks_are_assembled_into_a_stored_blob(self):
+        session = UploadSession.create(USER, 'image', 'photo.png', len(PNG), 'image/png')
+        offset = 0
+        while offset < len(PNG):
+            offset = self.send(session, PNG, offset)
+        self.assertTrue(session.complete)
+        self.assertEqual(session.meta['sha256'], hashlib.sha256(PNG).hexdigest())
+
+        resumed = UploadSession.from_token(session.token(), USER, 'image')
+        uploaded = resumed.uploaded_file()
+        self.assertEqual((uploaded.name, uploaded.size), ('photo.png', len(PNG)))
+        name = media_storage.save(uploaded.name, uploaded)
+        uploaded.close()
+        self.assertIn(session.meta['sha256'], name)
+        with media_storage.open(name) as stored:
+            self.assertEqual(stored.read(), PNG)
+        self.assert_refused(400, UploadSession.from_token, session.token() + 'x', USER, 'image')
+
+    def test_damaged_chunks_are_discarded_and_sent_again(self):
+        session = UploadSession.create(USER, 'image', 'photo.png', len(PNG))
+        self.send(session, PNG, 0)
+        self.assert_refused(422, self.send, session, PNG, 200, checksum='0' * 64)
+        # Cut off: fewer bytes than Content-Range announces
+        self.assert_refused(422, session.receive_chunk, io.BytesIO(PNG[200:250]), f'bytes 200-399/{len(PNG)}')
+        self.assertEqual(UploadSession.load(session.id, USER).offset, 200)
+        self.assertEqual(os.path.getsize(session.data_path), 200)
+
+        self.assertEqual(self.send(session, PNG, 200), 400)
+        self.assertEqual(self.send(session, PNG, 400), len(PNG))
+
+    def test_chunks_must_continue_at_the_offset(self):
+        session = UploadSession.create(USER, 'image', 'photo.png', len(PNG))
+        self.assert_refused(409, self.send, session, PNG, 200)
+        self.assert_refused(400, session.receive_chunk, io.BytesIO(b''), 'bytes=0-10')
+        self.assert_refused(416, self.send, session, PNG, 0, total=len(PNG) + 1)
+        self.assert_refused(413, self.send, session, PNG, 0, end=300)
+
+    def test_sessions_are_validated_up_front(self):
+        self.assert_refused(400, UploadSession.create, USER, 'image', '', 10)
+        self.assert_refused(400, UploadSession.create, USER, 'image', 'photo.png', 0)
+        self.assert_refused(413, UploadSession.create, USER, 'logo', 'logo.png', 101)
+        self.assertEqual(str(self.assert_refused(400, UploadSession.create, USER, 'image', 'x.exe', 10)), NOT_AN_IMAGE)
+
+    def test_content_that_is_not_an_image_is_dropped_at_the_end(self):
+        content = b'MZ' + b'\x00' * 298
+        session = UploadSession.create(USER, 'image', 'photo.png', len(content))
+        self.send(session, content, 0)
+        self.assert_refused(400, self.send, session, content, 200)
+        self.assertFalse(os.path.exists(session.meta_path))
+        self.assertFalse(os.path.exists(session.data_path))
+
+    def test_sessions_belong_to_their_user(self):
+        session = UploadSession.create(USER, 'image', 'photo.png', len(PNG))
+        self.assertEqual(UploadSession.load(session.id, USER).id, session.id)
+        self.assert_refused(404, UploadSession.load, session.id, SimpleNamespace(pk=2))
+        self.assert_refused(404, UploadSession.load, '../../etc/passwd')
+
+    def complete(self, field='image', user=USER):
+        session = UploadSession.create(user, field, 'photo.png', len(PNG), 'image/png')
+        offset = 0
+        while offset < len(PNG):
+            offset = self.send(session, PNG, offset)
+        return session
+
+    def test_tokens_are_only_accepted_from_their_user(self):
+        token = self.complete().token()
+        self.assert_refused(400, UploadSession.from_token, token, SimpleNamespace(pk=2), 'image')
+        self.assert_refused(400, UploadSession.from_token, token, None, 'image')
+
+    def test_size_is_checked_against_the_field_the_file_is_used_for(self):
+        # The client named a field without a limit of its own
+        token = self.complete(field='').token()
+        self.assertEqual(UploadSession.from_token(token, USER, 'photos-0-image').meta['size'], len(PNG))
+        error = self.assert_refused(413, UploadSession.from_token, token, USER, 'photos-0-logo')
+        self.assertIn('allowed for this field', str(error))
+
+    def test_widget_uses_the_bound_user_and_its_own_field_name(self):
+        token = self.complete(field='').token()
+        widget = ResumableFileInput()
+        data = {'logo_upload': token, 'image_upload': token}
+        self.assertEqual(widget.value_from_datadict(data, {}, 'image').upload_error, 'The upload is not valid, please choose the file again.')
+        widget.user = USER
+        uploaded = widget.value_from_datadict(data, {}, 'image')
+        self.assertEqual((uploaded.name, uploaded.size), ('photo.png', len(PNG)))
+        uploaded.close()
+        self.assertIn('allowed for this field', widget.value_from_datadict(data, {}, 'logo').upload_error)
+
+    def test_abandoned_sessions_expire(self):
+        fresh = UploadSession.create(USER, 'image', 'a.png', len(PNG))
+        stale = UploadSession.create(USER, 'image', 'b.png', len(PNG))
+        with open(stale.meta_path, 'w') as meta_file:
+            meta_file.write('{"updated": 0}')
+        orphan = os.path.join(os.path.dirname(fresh.data_path), 'f' * 32 + '.part')
+        open(orphan, 'w').close()
+        os.utime(orphan, (time.time() - 7200, time.time() - 7200))
+
+        expired = dict(expired_sessions(3600))
+        self.assertEqual(set(expired), {stale.id, 'f' * 32})
+        self.assertEqual(sorted(expired[stale.id]), sorted([stale.data_path, stale.meta_path]))
+
+
+class ResumableUploadAdminMixinTests(TestCase):
+    def test_forms_and_inline_forms_get_the_requesting_user(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.az', 'password')
+        request = RequestFactory().get('/')
+        request.user = user
+        model_admin = admin.site._registry[Service]
+        form = model_admin.get_form(request)()
+        self.assertIs(form.fields['image'].widget.user, user)
+        inline = next(inline for inline in model_admin.get_inline_instances(request) if inline.model is ServiceProcess)
+        formset = inline.get_formset(request)(instance=Service())
+        self.assertIs(formset.forms[0].fields['icon'].widget.user, user)
+        self.assertIsNone(ResumableFileInput.user)
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.contrib import admin
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from sda_backend.management.commands.create_admin_indexes import search_indexes
+from sda_backend.models import ContactMessage, Project
+from sda_backend.search import (
+    build_tsquery, group_search_columns, index_name, search_config, tsvector_sql,
+)
+
+
+class SearchSqlTests(SimpleTestCase):
+    def test_build_tsquery_keeps_only_words(self):
+        self.assertEqual(build_tsquery('baku off'), 'baku:* & off:*')
+        self.assertEqual(build_tsquery("it's (a) | !tower:*"), 'it:* & s:* & a:* & tower:*')
+        self.assertEqual(build_tsquery('  ?! '), '')
+
+    def test_columns_are_grouped_by_language(self):
+        self.assertEqual(search_config('title_en'), 'english')
+        self.assertEqual(search_config('title_ru'), 'russian')
+        self.assertEqual(search_config('title_az'), 'simple')
+        self.assertEqual(
+            group_search_columns(Project, ['title_en', 'title_az', 'title', '=slug', 'client__name']),
+            {'english': ['title_en'], 'simple': ['title_az', 'title']},
+        )
+
+    def test_tsvector_sql(self):
+        self.assertEqual(
+            tsvector_sql(['title_az', 'title'], 'simple', 'projects'),
+            "to_tsvector('simple'::regconfig, coalesce(\"projects\".\"title_az\", '') || ' ' || "
+            "coalesce(\"projects\".\"title\", ''))",
+        )
+
+    def test_index_names_fit_postgresql_identifiers(self):
+        self.assertEqual(index_name('fts', 'projects', 'english'), 'sda_admin_fts_projects_english')
+        long_name = index_name('keyset', 'contact_messages', 'created_at_id_and_more_columns_here')
+        self.assertEqual(len(long_name), 63)
+        self.assertNotEqual(long_name, index_name('keyset', 'contact_messages', 'created_at_id_and_more_columns_else'))
+
+
+class SearchResultsTests(SimpleTestCase):
+    def search_sql(self, model, term):
+        model_admin = admin.site._registry[model]
+        request = RequestFactory().get('/', {'q': term})
+        queryset, may_have_duplicates = model_admin.get_search_results(request, model.objects.all(), term)
+        self.assertFalse(may_have_duplicates)
+        return str(queryset.query)
+
+    def test_query_uses_the_indexed_expressions(self):
+        with mock.patch('sda_backend.search.fulltext_enabled', return_value=True):
+            sql = self.search_sql(Project, 'green tower')
+        table = Project._meta.db_table
+        model_admin = admin.site._registry[Project]
+        for config, columns in model_admin.get_fulltext_search_columns(None).items():
+            self.assertIn('%s @@ to_tsquery(\'%s\'::regconfig, green:* & tower:*)' % (
+                tsvector_sql(columns, config, table), config,
+            ), sql)
+        where = sql.split(' WHERE ', 1)[1]
+        self.assertIn('"projects"."slug"', where)
+        self.assertIn('%green tower%', where)
+        self.assertIn('ts_rank(', sql)
+
+        indexed = {create_sql for _, index_table, create_sql in search_indexes() if index_table == table}
+        for config, columns in model_admin.get_fulltext_search_columns(None).items():
+            self.assertTrue(any(tsvector_sql(columns, config) in create_sql for create_sql in indexed))
+
+    def test_trigram_only_fields_match_substrings(self):
+        with mock.patch('sda_backend.search.fulltext_enabled', return_value=True):
+            sql = self.search_sql(ContactMessage, ' @example.az ')
+        self.assertIn('%@example.az%', sql)
+        self.assertIn('to_tsvector', sql)
+
+    @override_settings(ADMIN_SEARCH_BACKEND='default')
+    def test_falls_back_to_django_search(self):
+        sql = self.search_sql(Project, 'tower')
+        self.assertNotIn('to_tsvector', sql)
+        self.assertIn('%tower%', sql)
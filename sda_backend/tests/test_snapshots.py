@@ -0,0 +1,101 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from sda_backend import images
+from sda_backend.models import OutboxEvent, Project, ProjectPhoto, ProjectService, PropertySector, ReadModel, Service
+from sda_backend.schema import supported
+from sda_backend.snapshots import content_models
+from sda_backend.storage import media_storage
+from sda_backend.tests.test_storage import MediaRootMixin
+
+
+@override_settings(OUTBOX_ENABLED=True)
+class SnapshotTests(MediaRootMixin, TransactionTestCase):
+    """rebuild_read_models works from threads with their own connections, which only see committed rows."""
+
+    def setUp(self):
+        super().setUp()
+        # Only the admin's own tables are flushed between TransactionTestCases
+        self.addCleanup(self.empty_content_tables)
+        if connection.vendor != 'postgresql':
+            fields = [(model, name) for model, name in images.media_url_fields() if supported(model)]
+            patcher = mock.patch('sda_backend.images.media_url_fields', return_value=fields)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        self.archive = os.path.join(self.archive_dir, 'content.tar.gz')
+
+        self.photo_name = media_storage.save('tower.jpg', ContentFile(b'jpeg bytes'))
+        self.sector = PropertySector.objects.create(title_en='Offices')
+        self.project = Project.objects.create(
+            slug='tower', title_en='Tower', title_az='Qüllə', year=2023, property_sector=self.sector,
+        )
+        self.sector.featured_project_1 = self.project
+        self.sector.save()
+        self.service = Service.objects.create(slug='design')
+        ProjectService.objects.create(project=self.project, service=self.service, order=1)
+        ProjectPhoto.objects.create(project=self.project, image_url=media_storage.url(self.photo_name), order=1)
+
+    @staticmethod
+    def empty_content_tables():
+        for model in reversed(content_models()):
+            model._base_manager.all().delete()
+
+    def test_dump_and_load_round_trip(self):
+        call_command('dump_content', self.archive, stdout=io.StringIO())
+        pk = self.project.pk
+        self.project.delete()
+        media_storage.delete(self.photo_name)
+        ReadModel.objects.all().delete()
+        OutboxEvent.objects.all().delete()
+
+        out = io.StringIO()
+        call_command('load_content', self.archive, '--replace', stdout=out)
+        self.assertIn('Rebuilt 9 documents', out.getvalue())
+
+        project = Project.objects.get(pk=pk)
+        self.assertEqual((project.slug, project.title_az, project.year), ('tower', 'Qüllə', 2023))
+        self.assertEqual(PropertySector.objects.get().featured_project_1_id, project.pk)
+        self.assertEqual(list(project.photos.values_list('image_url', flat=True)), [media_storage.url(self.photo_name)])
+        self.assertEqual(list(project.projectservice_set.values_list('service__slug', flat=True)), ['design'])
+        self.assertTrue(media_storage.exists(self.photo_name))
+
+        document = ReadModel.objects.get(entity='project', language='az', object_id=project.pk).document
+        self.assertEqual(document['title'], 'Qüllə')
+        self.assertEqual(
+            set(OutboxEvent.objects.values_list('entity', 'object_id')),
+            {('project', project.pk), ('property_sector', self.sector.pk), ('service', self.service.pk)},
+        )
+
+    def test_replaced_entities_are_invalidated(self):
+        call_command('dump_content', self.archive, stdout=io.StringIO())
+        extra = Service.objects.create(slug='build')
+        self.assertTrue(ReadModel.objects.filter(entity='service', object_id=extra.pk).exists())
+
+        call_command('load_content', self.archive, '--replace', stdout=io.StringIO())
+        self.assertFalse(Service.objects.filter(pk=extra.pk).exists())
+        self.assertFalse(ReadModel.objects.filter(entity='service', object_id=extra.pk).exists())
+        self.assertTrue(OutboxEvent.objects.filter(entity='service', object_id=extra.pk).exists())
+
+    def test_load_without_read_models(self):
+        call_command('dump_content', self.archive, '--no-media', stdout=io.StringIO())
+        ReadModel.objects.all().delete()
+        out = io.StringIO()
+        call_command('load_content', self.archive, '--replace', '--no-read-models', stdout=out)
+        self.assertIn('Run `python manage.py rebuild_read_models`', out.getvalue())
+        self.assertFalse(ReadModel.objects.exists())
+
+    def test_load_needs_replace_for_existing_content(self):
+        call_command('dump_content', self.archive, '--no-media', stdout=io.StringIO())
+        with self.assertRaisesMessage(CommandError, 'is not empty; load with --replace'):
+            call_command('load_content', self.archive, stdout=io.StringIO())
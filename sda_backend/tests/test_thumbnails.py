@@ -0,0 +1,106 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from sda_backend import thumbnails
+from sda_backend.tests.test_images import save_image
+from sda_backend.tests.test_storage import MediaRootMixin
+
+
+class ThumbnailViewTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(THUMBNAIL_CACHE_DIR=cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.cache_dir = cache_dir
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.az', 'password'))
+        self.path = os.path.join(self.media_root, 'projects', 'cover.png')
+        save_image(self.path, size=(1000, 500), fmt='PNG')
+        self.url = reverse('admin_thumbnail')
+
+    def get(self, headers=None, **params):
+        return self.client.get(self.url, {'src': '/uploads/projects/cover.png', 'w': 100, 'h': 100, **params}, headers=headers)
+
+    def test_renders_a_cached_webp(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as image:
+            self.assertEqual(image.size, (100, 50))
+
+        etag = response['ETag']
+        self.assertEqual(self.get(headers={'If-None-Match': etag}).status_code, 304)
+
+        # Replacing the upload invalidates its thumbnails
+        save_image(self.path, size=(400, 400), fmt='PNG')
+        os.utime(self.path, ns=(1, 1))
+        self.assertNotEqual(self.get()['ETag'], etag)
+
+    def test_bad_requests(self):
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.get(w=0).status_code, 400)
+            self.assertEqual(self.get(w=thumbnails.MAX_THUMBNAIL_SIZE + 1).status_code, 400)
+            self.assertEqual(self.get(w='x').status_code, 400)
+            self.assertEqual(self.get(src='/uploads/missing.png').status_code, 404)
+            self.assertEqual(self.get(src='/uploads/../../etc/passwd').status_code, 404)
+
+    def test_decompression_bombs_are_not_rendered(self):
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000), self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.get().status_code, 404)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_staff_only(self):
+        self.client.logout()
+        self.assertEqual(self.get().status_code, 302)
+
+
+class EvictionTests(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        settings_override = override_settings(THUMBNAIL_CACHE_DIR=self.cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def entry(self, name, size, mtime):
+        path = os.path.join(self.cache_dir, name[:2], name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_least_recently_used_entries_go_first(self):
+        oldest = self.entry('aa1.webp', 100, 1000)
+        older = self.entry('bb1.webp', 100, 2000)
+        newest = self.entry('cc1.webp', 100, 3000)
+        writing = self.entry('aa2.tmp', 500, 0)
+
+        self.assertEqual(thumbnails.evict(300), 0)
+        self.assertEqual(thumbnails.evict(150), 2)
+        self.assertEqual([os.path.exists(path) for path in (oldest, older, newest, writing)], [False, False, True, True])
+
+    def test_eviction_runs_after_a_share_of_the_limit_is_written(self):
+        self.addCleanup(setattr, thumbnails, '_written', 0)
+        thumbnails._written = 0
+        max_bytes = 1000 / thumbnails.EVICT_AFTER_FRACTION
+        self.assertFalse(thumbnails.written(600, max_bytes))
+        self.assertTrue(thumbnails.written(600, max_bytes))
+        self.assertFalse(thumbnails.written(600, max_bytes))
+
+
+class ThumbnailHtmlTests(TestCase):
+    def test_only_local_raster_uploads_are_resized(self):
+        self.assertIn('/admin/thumbnail/?src=%2Fuploads%2Fa.jpg&amp;w=160&amp;h=100', thumbnails.thumbnail_html('/uploads/a.jpg', 80, 50))
+        self.assertIn('src="/uploads/icon.svg"', thumbnails.thumbnail_html('/uploads/icon.svg', 80, 50))
+        self.assertIn('src="https://cdn.example.az/a.jpg"', thumbnails.thumbnail_html('https://cdn.example.az/a.jpg', 80, 50))
@@ -0,0 +1,80 @@
+import hashlib
+import os
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from sda_backend.storage import INCOMING_DIR, media_storage
+from sda_backend.tests.test_storage import MediaRootMixin
+from sda_backend.uploadhandlers import NOT_AN_IMAGE, StreamedUploadedFile, field_max_size, image_format
+
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 200
+
+
+class ImageSignatureTests(SimpleTestCase):
+    def test_known_signatures(self):
+        self.assertEqual(image_format(PNG[:12]), 'png')
+        self.assertEqual(image_format(b'\xff\xd8\xff\xe0' + b'\x00' * 8), 'jpeg')
+        self.assertEqual(image_format(b'GIF89a' + b'\x00' * 6), 'gif')
+        self.assertEqual(image_format(b'RIFF\x00\x00\x00\x00WEBP'), 'webp')
+        self.assertEqual(image_format(b'\x00\x00\x00\x1cftypavif'), 'heif')
+        self.assertIsNone(image_format(b'<html><body>'))
+        self.assertIsNone(image_format(b'%PDF-1.7\n\x00\x00\x00'))
+
+    @override_settings(UPLOAD_MAX_SIZE=100, UPLOAD_FIELD_MAX_SIZES={'image': 10})
+    def test_size_limits_ignore_formset_prefixes(self):
+        self.assertEqual(field_max_size('image'), 10)
+        self.assertEqual(field_max_size('photos-0-image'), 10)
+        self.assertEqual(field_max_size('cv'), 100)
+
+
+@override_settings(
+    FILE_UPLOAD_HANDLERS=['sda_backend.uploadhandlers.StreamingUploadHandler'],
+    UPLOAD_MAX_SIZE=1000, UPLOAD_FIELD_MAX_SIZES={'logo': 100},
+)
+class StreamingUploadHandlerTests(MediaRootMixin, SimpleTestCase):
+    def upload(self, field, name, content, content_type='application/octet-stream'):
+        request = RequestFactory().post('/', {field: SimpleUploadedFile(name, content, content_type)})
+        uploaded = request.FILES[field]
+        self.addCleanup(uploaded.close)
+        self.assertIsInstance(uploaded, StreamedUploadedFile)
+        return uploaded
+
+    def test_image_is_hashed_while_streamed_to_incoming(self):
+        uploaded = self.upload('image', 'photo.png', PNG, 'image/png')
+        self.assertIsNone(uploaded.upload_error)
+        self.assertEqual(uploaded.size, len(PNG))
+        self.assertEqual(uploaded.sha256, hashlib.sha256(PNG).hexdigest())
+        self.assertEqual(os.path.dirname(uploaded.temporary_file_path()), media_storage.path(INCOMING_DIR))
+
+        name = media_storage.save('photo.png', uploaded)
+        self.assertIn(uploaded.sha256, name)
+        self.assertFalse(os.path.exists(uploaded.temporary_file_path()))
+        with media_storage.open(name) as stored:
+            self.assertEqual(stored.read(), PNG)
+
+    def test_image_fields_reject_other_content(self):
+        uploaded = self.upload('image', 'photo.jpg', b'<?php echo "not an image"; ?>')
+        self.assertEqual(uploaded.upload_error, NOT_AN_IMAGE)
+        self.assertEqual(uploaded.size, 0)
+        self.assertEqual(os.path.getsize(uploaded.temporary_file_path()), 0)
+
+    def test_short_files_are_checked_too(self):
+        self.assertEqual(self.upload('image', 'tiny.gif', b'GIF').upload_error, NOT_AN_IMAGE)
+
+    def test_documents_are_not_checked_for_a_signature(self):
+        uploaded = self.upload('cv', 'cv.pdf', b'%PDF-1.7 ...', 'application/pdf')
+        self.assertIsNone(uploaded.upload_error)
+
+    def test_per_field_size_limit(self):
+        uploaded = self.upload('logo', 'logo.png', PNG, 'image/png')
+        self.assertIn('larger than the 100\xa0bytes allowed', uploaded.upload_error)
+        self.assertEqual(os.path.getsize(uploaded.temporary_file_path()), 0)
+        self.assertIsNone(self.upload('image', 'logo.png', PNG, 'image/png').upload_error)
+
+    def test_temp_file_is_removed_when_the_request_ends(self):
+        uploaded = self.upload('cv', 'cv.pdf', b'%PDF-1.7 ...')
+        path = uploaded.temporary_file_path()
+        uploaded.close()
+        self.assertFalse(os.path.exists(path))
@@ -0,0 +1,165 @@
+"""
+On-demand thumbnails for admin previews.
+
+Changelist previews used to embed the full-resolution upload and shrink
+it with CSS.  ``thumbnail_html`` now points them at the admin thumbnail
+endpoint, which renders a small WebP once and keeps it in a disk cache:
+
+- cache keys combine the source path, its mtime and size and the box, so
+  replacing an upload invalidates its thumbnails automatically;
+- every hit refreshes the file's mtime and the oldest entries are evicted
+  once the cache grows past ``THUMBNAIL_CACHE_MAX_BYTES`` (LRU).  Eviction
+  walks the whole cache, so each process only runs it after writing
+  another EVICT_AFTER_FRACTION of the limit, not on every miss.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.html import format_html
+
+from .images import RENDITIONS, media_path, renditions_dir, rendition_manifest
+
+
+# Upper bound for a requested thumbnail edge, keeps the cache from being filled with large images
+MAX_THUMBNAIL_SIZE = 800
+# Share of THUMBNAIL_CACHE_MAX_BYTES a process writes between two evictions
+EVICT_AFTER_FRACTION = 0.05
+
+_written = 0
+_written_lock = threading.Lock()
+
+
+class ThumbnailError(Exception):
+    """The source image cannot be rendered as a thumbnail."""
+
+
+def cache_key(path, stat, width, height):
+    raw = f'{path}:{stat.st_mtime_ns}:{stat.st_size}:{width}x{height}'
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def cache_path(key):
+    return os.path.join(settings.THUMBNAIL_CACHE_DIR, key[:2], key + '.webp')
+
+
+def best_source(url, path, width, height):
+    """Prefer the smallest rendition that still covers the box over the original upload."""
+    manifest = rendition_manifest(url)
+    if not manifest:
+        return path
+    target_width = manifest['width'] * min(width / manifest['width'], height / manifest['height'], 1)
+    for name in sorted(RENDITIONS, key=RENDITIONS.get):
+        entry = manifest['renditions'].get(name)
+        if entry and entry['width'] >= target_width:
+            return os.path.join(renditions_dir(path), entry['formats'][manifest['format']])
+    return path
+
+
+def render_thumbnail(source, destination, width, height):
+    from PIL import Image, ImageOps
+
+    try:
+        original = Image.open(source)
+    except Image.DecompressionBombError as e:
+        raise ThumbnailError(str(e))
+    with original:
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail((width, height), Image.LANCZOS)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        # Write to a temp file first so concurrent workers never serve a partial image
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(destination), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                image.save(tmp, format='WEBP', quality=80)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def evict(max_bytes):
+    """Delete least recently used cache entries until the cache fits in ``max_bytes``."""
+    entries = []
+    total = 0
+    for root, _dirs, files in os.walk(settings.THUMBNAIL_CACHE_DIR):
+        for name in files:
+            if name.endswith('.tmp'):
+                continue  # still being written by another worker
+            file_path = os.path.join(root, name)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+            total += stat.st_size
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    for _mtime, size, file_path in sorted(entries):
+        try:
+            os.unlink(file_path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed += 1
+        if total <= max_bytes:
+            break
+    return removed
+
+
+def written(size, max_bytes):
+    """Count ``size`` new cache bytes; True when this process should evict now."""
+    global _written
+    with _written_lock:
+        _written += size
+        if _written < max_bytes * EVICT_AFTER_FRACTION:
+            return False
+        _written = 0
+    return True
+
+
+def get_thumbnail(url, width, height):
+    """
+    Return (cache file path, cache key) for a thumbnail of an uploaded image.
+    Raises FileNotFoundError when the URL does not point at an existing upload,
+    OSError or ThumbnailError when it cannot be decoded.
+    """
+    path = media_path(url)
+    if not path or not os.path.isfile(path):
+        raise FileNotFoundError(url)
+
+    key = cache_key(path, os.stat(path), width, height)
+    destination = cache_path(key)
+    if os.path.exists(destination):
+        os.utime(destination)  # mark as recently used
+        return destination, key
+
+    render_thumbnail(best_source(url, path, width, height), destination, width, height)
+    if written(os.path.getsize(destination), settings.THUMBNAIL_CACHE_MAX_BYTES):
+        evict(settings.THUMBNAIL_CACHE_MAX_BYTES)
+    return destination, key
+
+
+def thumbnail_url(url, width, height):
+    """Admin thumbnail URL for an upload, rendered at 2x for high-DPI screens."""
+    query = urlencode({'src': url, 'w': min(width * 2, MAX_THUMBNAIL_SIZE), 'h': min(height * 2, MAX_THUMBNAIL_SIZE)})
+    return f"{reverse('admin_thumbnail')}?{query}"
+
+
+def thumbnail_html(url, width, height):
+    """Lazy-loaded <img> for changelist and inline previews."""
+    # External URLs and vector icons are embedded as they are
+    resizable = media_path(url) and not url.lower().endswith('.svg')
+    src = thumbnail_url(url, width, height) if resizable else url
+    return format_html(
+        '<img src="{}" width="{}" height="{}" loading="lazy" decoding="async" style="object-fit: contain;" />',
+        src, width, height,
+    )
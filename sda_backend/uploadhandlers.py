@@ -0,0 +1,156 @@
+"""
+Streaming upload handler for admin image uploads.
+
+Django's default handlers keep uploads of up to FILE_UPLOAD_MAX_MEMORY_SIZE
+in memory, and the form then copies them again into MEDIA_ROOT.
+``StreamingUploadHandler`` instead writes every file part straight to
+``MEDIA_ROOT/.incoming/`` as it arrives, which is on the same filesystem as
+the final location, so saving it is an atomic rename rather than a copy.
+While streaming it:
+
+- hashes the content (SHA-256), so content-addressed storage does not read
+  the file again;
+- checks the first bytes against known image signatures and stops writing
+  as soon as they do not match;
+- enforces a per-field size limit (UPLOAD_FIELD_MAX_SIZES, UPLOAD_MAX_SIZE)
+  and stops writing once it is exceeded.
+
+A rejected file is not dropped silently: the form field receives an empty
+``StreamedUploadedFile`` carrying ``upload_error``, which
+``forms.UploadImageField`` turns into a validation error.  Temp files are
+removed when the request ends (the uploaded file is closed) unless they were
+moved into place; anything left behind by a killed worker is collected by
+``manage.py gc_media``.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+from django.template.defaultfilters import filesizeformat
+
+from .storage import media_storage
+
+
+HEADER_SIZE = 12
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.heic', '.tif', '.tiff', '.bmp', '.ico'}
+HEIF_BRANDS = {b'avif', b'avis', b'heic', b'heix', b'mif1', b'msf1'}
+NOT_AN_IMAGE = 'The file is not a supported image (JPEG, PNG, GIF, WebP, AVIF, TIFF).'
+
+
+def image_format(header):
+    """Return the image format the first bytes of a file belong to, or None."""
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    if header[4:8] == b'ftyp' and header[8:12] in HEIF_BRANDS:
+        return 'heif'
+    if header[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'tiff'
+    if header[:2] == b'BM':
+        return 'bmp'
+    if header[:4] == b'\x00\x00\x01\x00':
+        return 'ico'
+    return None
+
+
+def field_max_size(field_name):
+    """Size limit for a form field; formset prefixes are ignored ('photos-0-image' -> 'image')."""
+    name = field_name.rsplit('-', 1)[-1]
+    return settings.UPLOAD_FIELD_MAX_SIZES.get(name, settings.UPLOAD_MAX_SIZE)
+
+
+class StreamedUploadedFile(UploadedFile):
+    """An upload streamed to MEDIA_ROOT/.incoming/ by StreamingUploadHandler."""
+
+    def __init__(self, path, name, content_type, size, charset, content_type_extra=None,
+                 sha256=None, upload_error=None):
+        super().__init__(open(path, 'rb'), name, content_type, size, charset, content_type_extra)
+        self.path = path
+        self.sha256 = sha256
+        self.upload_error = upload_error
+
+    def temporary_file_path(self):
+        return self.path
+
+    def close(self):
+        try:
+            return self.file.close()
+        finally:
+            # Gone already if the storage renamed it into place
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None,
+                 content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.max_size = field_max_size(field_name)
+        extension = os.path.splitext(file_name)[1].lower()
+        self.check_image = extension in IMAGE_EXTENSIONS or (content_type or '').startswith('image/')
+
+        fd, self.path = tempfile.mkstemp(dir=media_storage.incoming_dir(), suffix='.upload')
+        self.file = os.fdopen(fd, 'wb')
+        self.digest = hashlib.sha256()
+        self.header = b''
+        self.size = 0
+        self.error = None
+        if content_length is not None and content_length > self.max_size:
+            self.reject(self.too_large_message())
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        # Once rejected the rest of the part is read off the socket and discarded
+        if self.error:
+            return None
+        self.size += len(raw_data)
+        if self.size > self.max_size:
+            self.reject(self.too_large_message())
+            return None
+        if self.check_image and len(self.header) < HEADER_SIZE:
+            self.header += raw_data[:HEADER_SIZE - len(self.header)]
+            if len(self.header) >= HEADER_SIZE and image_format(self.header) is None:
+                self.reject(NOT_AN_IMAGE)
+                return None
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.error and self.check_image and image_format(self.header) is None:
+            self.reject(NOT_AN_IMAGE)
+        self.file.close()
+        os.chmod(self.path, 0o644)
+        return StreamedUploadedFile(
+            self.path,
+            self.file_name,
+            self.content_type,
+            0 if self.error else self.size,
+            self.charset,
+            self.content_type_extra,
+            sha256=None if self.error else self.digest.hexdigest(),
+            upload_error=self.error,
+        )
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            self.file.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def reject(self, message):
+        self.error = message
+        # Free the disk space now; file_complete() hands the form an empty file
+        self.file.seek(0)
+        self.file.truncate()
+
+    def too_large_message(self):
+        return f'The file is larger than the {filesizeformat(self.max_size)} allowed for this field.'
@@ -0,0 +1,83 @@
+"""
+Extra admin views that are not tied to a single ModelAdmin.
+"""
+import json
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404, HttpResponseBadRequest, HttpResponseNotModified, JsonResponse
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+
+from .resumable import UploadError, UploadSession
+from .thumbnails import MAX_THUMBNAIL_SIZE, ThumbnailError, get_thumbnail
+
+
+@require_GET
+@staff_member_required
+def thumbnail(request):
+    """Serve a cached WebP thumbnail: /admin/thumbnail/?src=/uploads/...&w=160&h=100"""
+    try:
+        width = int(request.GET.get('w', 160))
+        height = int(request.GET.get('h', 160))
+    except ValueError:
+        return HttpResponseBadRequest('Invalid thumbnail size')
+    if not (0 < width <= MAX_THUMBNAIL_SIZE and 0 < height <= MAX_THUMBNAIL_SIZE):
+        return HttpResponseBadRequest('Invalid thumbnail size')
+
+    try:
+        path, key = get_thumbnail(request.GET.get('src', ''), width, height)
+    except FileNotFoundError:
+        raise Http404('Image not found')
+    except (OSError, ThumbnailError):
+        # Pillow raises OSError subclasses for files it cannot decode; oversized images are ThumbnailError
+        raise Http404('Image cannot be previewed')
+
+    etag = f'"{key}"'
+    if request.headers.get('If-None-Match') == etag:
+        return HttpResponseNotModified(headers={'ETag': etag})
+
+    response = FileResponse(open(path, 'rb'), content_type='image/webp')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+@require_POST
+@staff_member_required
+def upload_sessions(request):
+    """Start a resumable upload: {"filename", "size", "field", "content_type"} -> session status"""
+    try:
+        payload = json.loads(request.body or b'{}')
+        session = UploadSession.create(
+            request.user,
+            payload.get('field'),
+            payload.get('filename'),
+            payload.get('size'),
+            payload.get('content_type'),
+        )
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    except UploadError as error:
+        return JsonResponse({'error': str(error)}, status=error.status)
+    return JsonResponse(dict(session.status(), token=session.token()), status=201)
+
+
+@require_http_methods(['GET', 'HEAD', 'PUT', 'DELETE'])
+@staff_member_required
+def upload_session(request, upload_id):
+    """Report (GET/HEAD), append a chunk to (PUT) or abandon (DELETE) a resumable upload"""
+    try:
+        session = UploadSession.load(upload_id, request.user)
+    except UploadError as error:
+        return JsonResponse({'error': str(error)}, status=error.status)
+    try:
+        if request.method == 'PUT':
+            session.receive_chunk(request, request.headers.get('Content-Range'), request.headers.get('X-Chunk-SHA256'))
+        elif request.method == 'DELETE':
+            session.delete()
+            return JsonResponse({'id': upload_id, 'deleted': True})
+    except UploadError as error:
+        # The offset tells the client where to resume after a 409
+        return JsonResponse({'error': str(error), 'offset': session.offset}, status=error.status)
+    response = JsonResponse(session.status())
+    response['Upload-Offset'] = session.offset
+    return response
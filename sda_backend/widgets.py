@@ -0,0 +1,94 @@
+"""
+Form widgets for the admin.
+"""
+from django import forms
+from django.urls import reverse
+
+from .resumable import UploadError, UploadSession
+
+
+class RejectedUpload:
+    """Stands in for a file whose resumable upload cannot be used; see forms.UploadImageField."""
+
+    name = ''
+    size = 0
+
+    def __init__(self, upload_error):
+        self.upload_error = upload_error
+
+    def __bool__(self):
+        return True
+
+
+class ResumableFileInput(forms.FileInput):
+    """
+    File input that uploads in resumable chunks before the form is submitted.
+
+    The script sends the chosen file to the upload endpoint and puts the
+    signed session token into a hidden ``<name>_upload`` input, and the file
+    input is cleared so the form POST does not send the file a second time.
+    Without JavaScript it behaves like a plain file input.  A token is only
+    accepted from the user who started the upload, set as ``user`` by
+    ``ResumableUploadAdminMixin``.
+    """
+    template_name = 'sda_backend/widgets/resumable_file_input.html'
+    user = None
+
+    class Media:
+        js = ('sda_backend/js/resumable_upload.js',)
+
+    @staticmethod
+    def token_name(name):
+        return f'{name}_upload'
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-resumable-url'] = reverse('admin_upload_sessions')
+        context['widget']['token_name'] = self.token_name(name)
+        # Keep a finished upload across a re-rendered form (validation errors elsewhere)
+        token = getattr(value, 'upload_token', None)
+        context['widget']['token'] = token or ''
+        context['widget']['uploaded_name'] = value.name if token else ''
+        return context
+
+    def value_from_datadict(self, data, files, name):
+        upload = super().value_from_datadict(data, files, name)
+        token = data.get(self.token_name(name))
+        if upload is None and token:
+            try:
+                return UploadSession.from_token(token, self.user, name).uploaded_file()
+            except UploadError as error:
+                return RejectedUpload(str(error))
+        return upload
+
+    def value_omitted_from_data(self, data, files, name):
+        return super().value_omitted_from_data(data, files, name) and self.token_name(name) not in data
+
+
+def bind_upload_user(form_class, user):
+    """Subclass of ``form_class`` whose resumable upload inputs accept ``user``'s uploads."""
+
+    class UploadUserForm(form_class):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            for field in self.fields.values():
+                if isinstance(field.widget, ResumableFileInput):
+                    field.widget.user = user
+
+    UploadUserForm.__name__ = form_class.__name__
+    return UploadUserForm
+
+
+class ResumableUploadAdminMixin:
+    """
+    ModelAdmin and inline mixin for forms with ``ResumableFileInput`` fields:
+    binds the requesting user to them, since widgets never see the request.
+    """
+
+    def get_form(self, request, obj=None, **kwargs):
+        return bind_upload_user(super().get_form(request, obj, **kwargs), request.user)
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.form = bind_upload_user(formset.form, request.user)
+        return formset